@@ -0,0 +1,130 @@
+import functools
+import tracemalloc
+
+import fakeitmakeit as fm
+import numpy as np
+import pandas as pd
+import pytest
+
+import groupster as gr
+
+SIZES = [50, 500, 5_000, 50_000]
+
+# People per group in the synthetic cohorts.
+GROUP_SIZE = 5
+
+
+@functools.cache
+def template():
+    """Generate a cohort with the same shape as ``tests/data/cohort.csv``.
+
+    ``fakeitmakeit`` cannot generate cohorts of tens of thousands of people with unique
+    usernames, so a small cohort is generated once and resampled by ``make_cohort``.
+
+    """
+    cohort = fm.cohort(n=300)
+    marks = fm.assignment(usernames=cohort.index)
+
+    return (
+        cohort.assign(
+            female=lambda df_: df_.gender.eq("female"),
+            edsml=lambda df_: df_.course.eq("edsml"),
+            name=lambda df_: df_.first_name + " " + df_.last_name,
+        )
+        .merge(marks, left_index=True, right_index=True)
+        .loc[:, ["name", "female", "edsml", "mark"]]
+    )
+
+
+def make_data(size, n_bools=2, n_nums=1, seed=0):
+    """Resample the template cohort to ``size`` people.
+
+    The first two bools are ``female`` and ``edsml`` and the first num is ``mark``. The
+    remaining bools and nums are random.
+
+    Returns
+    -------
+    tuple
+        The data, the bools, and the nums.
+
+    """
+    rng = np.random.default_rng(seed)
+    base = template()
+
+    data = base.iloc[rng.integers(len(base), size=size)].set_index(
+        pd.Index([f"u{k:06d}" for k in range(size)], name="username")
+    )
+    data["mark"] = (data.mark + rng.normal(scale=2, size=size)).round(2)
+
+    bools = ["female", "edsml"][:n_bools]
+    for k in range(len(bools), n_bools):
+        bools.append(f"flag{k}")
+        data[bools[-1]] = rng.random(size) < rng.uniform(0.1, 0.5)
+
+    nums = ["mark"][:n_nums]
+    for k in range(len(nums), n_nums):
+        nums.append(f"score{k}")
+        data[nums[-1]] = rng.normal(loc=50, scale=10, size=size).round(2)
+
+    return data, bools, nums
+
+
+def make_groups(size):
+    """Split ``size`` people into groups of ``GROUP_SIZE`` (or one more)."""
+    n_groups = max(size // GROUP_SIZE, 2)
+    counts = np.full(n_groups, size // n_groups)
+    counts[: size % n_groups] += 1
+    return {f"g{k}": int(count) for k, count in enumerate(counts)}
+
+
+def make_constraints(index, n_constraints, seed=0):
+    """Draw ``n_constraints`` random pairs of people to keep together or separate.
+
+    Returns
+    -------
+    dict
+        The ``keep_together`` and ``keep_separate`` keyword arguments of ``Solver``.
+
+    """
+    rng = np.random.default_rng(seed)
+    pairs = [
+        index[rng.choice(len(index), size=2, replace=False)].to_list()
+        for _ in range(n_constraints)
+    ]
+    half = n_constraints // 2
+    return {
+        "keep_together": pairs[:half] or None,
+        "keep_separate": pairs[half:] or None,
+    }
+
+
+@pytest.fixture
+def make_cohort():
+    """Return a factory of synthetic cohorts."""
+
+    def factory(size, n_bools=2, n_nums=1, seed=0):
+        data, bools, nums = make_data(size, n_bools=n_bools, n_nums=n_nums, seed=seed)
+        return gr.Cohort(
+            data=data, groups=make_groups(size), bools=bools, nums=nums, seed=seed
+        )
+
+    return factory
+
+
+def peak_memory(func, *args, **kwargs):
+    """Call ``func`` and measure the peak memory allocated during the call.
+
+    Returns
+    -------
+    tuple
+        The return value of ``func`` and the peak memory in MiB.
+
+    """
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, peak / 2**20
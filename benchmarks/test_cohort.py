@@ -0,0 +1,35 @@
+import pytest
+from conftest import SIZES, make_data, make_groups
+
+import groupster as gr
+from groupster.util import diversity
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_init(benchmark, size):
+    data, bools, nums = make_data(size)
+    groups = make_groups(size)
+
+    benchmark(gr.Cohort, data=data, groups=groups, bools=bools, nums=nums)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("n_bools, n_nums", [(2, 1), (8, 4)])
+def test_diversity(benchmark, make_cohort, size, n_bools, n_nums):
+    cohort = make_cohort(size, n_bools=n_bools, n_nums=n_nums)
+
+    benchmark(diversity, data=cohort.data, bools=cohort.bools, nums=cohort.nums)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_diversity_cost(benchmark, make_cohort, size):
+    cohort = make_cohort(size)
+
+    benchmark(cohort.diversity_cost)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_overview(benchmark, make_cohort, size):
+    cohort = make_cohort(size)
+
+    benchmark(cohort.overview)
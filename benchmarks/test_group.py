@@ -0,0 +1,31 @@
+import pytest
+from conftest import SIZES, make_constraints
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_getitem(benchmark, make_cohort, size):
+    cohort = make_cohort(size)
+
+    benchmark(cohort.__getitem__, "g0")
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("n_bools, n_nums", [(2, 1), (8, 4)])
+def test_diversity_cost(benchmark, make_cohort, size, n_bools, n_nums):
+    cohort = make_cohort(size, n_bools=n_bools, n_nums=n_nums)
+    group = cohort["g0"]
+
+    benchmark(group.diversity_cost, cohort_diversity=cohort.diversity)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("n_constraints", [10, 1_000])
+def test_restriction_cost(benchmark, make_cohort, size, n_constraints):
+    cohort = make_cohort(size)
+    group = cohort["g0"]
+
+    benchmark(
+        group.restriction_cost,
+        **make_constraints(cohort.data.index, n_constraints),
+        bool_min={"female": 1},
+    )
@@ -0,0 +1,180 @@
+import pytest
+from conftest import SIZES, make_constraints, make_data, make_groups, peak_memory
+
+import groupster as gr
+from groupster import kernel
+from groupster.util import diversity_cost
+
+BACKENDS = [
+    "numpy",
+    pytest.param(
+        "numba",
+        marks=pytest.mark.skipif(not kernel.available, reason="numba not installed"),
+    ),
+]
+
+# Steps per benchmark round of each backend.
+STEPS = {"python": 100, "numpy": 1_000, "numba": 100_000}
+
+# Fraction of the initial cost to reach in ``test_time_to_target``.
+TARGET = 0.5
+
+
+def run_steps(solver, engine, cohort, n):
+    """Perform ``n`` steps with the code path ``solver.solve`` would use."""
+    if engine is None:
+        for _ in range(n):
+            solver._step(cohort)
+    elif solver._uses_kernel():
+        solver._kernel_steps(engine, 0, n, n)
+    else:
+        for _ in range(n):
+            solver._engine_step(engine)
+
+
+def bench_steps(benchmark, solver, cohort, n):
+    """Benchmark ``n`` steps and report the number of steps per second."""
+    engine = solver._start(cohort, n)
+    run_steps(solver, engine, cohort, 1)  # compile the kernel
+
+    benchmark(run_steps, solver, engine, cohort, n)
+
+    benchmark.extra_info["steps_per_second"] = n / benchmark.stats.stats.mean
+    benchmark.extra_info["swaps_per_second"] = (
+        solver.batch * n / benchmark.stats.stats.mean
+    )
+
+
+def solve_until(solver, cohort, target, budget, chunk):
+    """Solve ``cohort`` until its cost is at most ``target``.
+
+    Returns
+    -------
+    int or None
+        The number of steps performed, or ``None`` if ``target`` was not reached
+        within ``budget`` steps.
+
+    """
+    engine = solver._start(cohort, budget)
+    for start in range(0, budget, chunk):
+        if solver._uses_kernel():
+            solver._kernel_steps(engine, start, chunk, budget)
+        else:
+            run_steps(solver, engine, cohort, chunk)
+
+        if solver.cost <= target:
+            return start + chunk
+
+    return None
+
+
+@pytest.mark.parametrize("size", [50, 500, 5_000])
+def test_step_custom_cost(benchmark, make_cohort, size):
+    cohort = make_cohort(size)
+    solver = gr.Solver(diversity_cost_fn=diversity_cost, seed=0)
+
+    bench_steps(benchmark, solver, cohort, STEPS["python"])
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_step(benchmark, make_cohort, size, backend):
+    cohort = make_cohort(size)
+    solver = gr.Solver(backend=backend, seed=0)
+
+    bench_steps(benchmark, solver, cohort, STEPS[backend])
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("batch", [8, 64])
+def test_step_batch(benchmark, make_cohort, size, batch):
+    cohort = make_cohort(size)
+    solver = gr.Solver(batch=batch, seed=0)
+
+    bench_steps(benchmark, solver, cohort, STEPS["numpy"])
+
+
+@pytest.mark.parametrize("n_bools, n_nums", [(1, 0), (2, 1), (8, 4), (16, 8)])
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_step_features(benchmark, make_cohort, n_bools, n_nums, backend):
+    cohort = make_cohort(5_000, n_bools=n_bools, n_nums=n_nums)
+    solver = gr.Solver(backend=backend, seed=0)
+
+    bench_steps(benchmark, solver, cohort, STEPS[backend])
+
+
+@pytest.mark.parametrize("n_constraints", [0, 100, 10_000])
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_step_constraints(benchmark, make_cohort, n_constraints, backend):
+    cohort = make_cohort(5_000)
+    solver = gr.Solver(
+        **make_constraints(cohort.data.index, n_constraints),
+        bool_min={"female": 1},
+        backend=backend,
+        seed=0,
+    )
+
+    bench_steps(benchmark, solver, cohort, STEPS[backend])
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_time_to_target(benchmark, size, backend):
+    data, bools, nums = make_data(size)
+    groups = make_groups(size)
+    solver = gr.Solver(backend=backend, seed=0)
+    budget, chunk = 20 * STEPS[backend], STEPS[backend] // 10
+
+    def setup():
+        cohort = gr.Cohort(data=data, groups=groups, bools=bools, nums=nums, seed=0)
+        target = TARGET * cohort.diversity_cost()
+        return (solver, cohort, target, budget, chunk), {}
+
+    steps = benchmark.pedantic(solve_until, setup=setup, rounds=3)
+
+    benchmark.extra_info["target"] = TARGET
+    benchmark.extra_info["steps_to_target"] = steps
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_peak_memory(benchmark, size, backend):
+    data, bools, nums = make_data(size)
+    groups = make_groups(size)
+    gr.Solver(backend=backend).solve(
+        gr.Cohort(data=data, groups=groups, bools=bools, nums=nums), n=1, progress=False
+    )  # compile the kernel outside the measurement
+
+    def solve():
+        cohort = gr.Cohort(data=data, groups=groups, bools=bools, nums=nums)
+        gr.Solver(backend=backend).solve(cohort, n=STEPS[backend], progress=False)
+
+    _, peak = benchmark.pedantic(peak_memory, args=(solve,), rounds=1)
+
+    benchmark.extra_info["peak_memory_mib"] = peak
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("proposals", ["uniform", "targeted"])
+def test_time_to_target_proposals(benchmark, size, proposals):
+    data, bools, nums = make_data(size)
+    groups = make_groups(size)
+    solver = gr.Solver(
+        **make_constraints(data.index, size // 10),
+        backend="numpy",
+        proposals=proposals,
+        seed=0,
+    )
+    budget, chunk = 20 * STEPS["numpy"], STEPS["numpy"] // 10
+
+    def setup():
+        cohort = gr.Cohort(data=data, groups=groups, bools=bools, nums=nums, seed=0)
+        target = TARGET * cohort.diversity_cost()
+        return (solver, cohort, target, budget, chunk), {}
+
+    steps = benchmark.pedantic(solve_until, setup=setup, rounds=3)
+
+    benchmark.extra_info["steps_to_target"] = steps
+    benchmark.extra_info["acceptance_rate"] = (
+        solver.proposals.stats.acceptance_rate.to_dict()
+    )
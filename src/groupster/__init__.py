@@ -1,5 +1,19 @@
 from .cohort import Cohort
 from .group import Group
-from .solver import Solver
+from .proposal import Proposals
+from .solver import Solver, solve_many
+from .stats import SolverStats
+from .strategy import Greedy, LateAcceptance, SimulatedAnnealing, Tabu
 
-__all__ = ["Cohort", "Group", "Solver"]
+__all__ = [
+    "Cohort",
+    "Greedy",
+    "Group",
+    "LateAcceptance",
+    "Proposals",
+    "SimulatedAnnealing",
+    "Solver",
+    "SolverStats",
+    "Tabu",
+    "solve_many",
+]
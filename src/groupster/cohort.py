@@ -1,9 +1,11 @@
 import functools
 
+import numpy as np
 import pandas as pd
 
 from .group import Group
-from .util import diversity
+from .source import read_csv, read_parquet
+from .util import diversity, lower_bound, schema, update_diversity
 
 
 class Cohort:
@@ -11,10 +13,17 @@ class Cohort:
 
     The cohort data is ``pd.DataFrame`` with a ``group`` column, and the groups are
     assigned randomly at initialisation. The number of people in each group is specified
-    by the groups dictionary. For computing the diversity cost, the ``bools`` and
-    ``nums`` columns are specified. The bools columns are boolean columns (e.g.
-    categorical characteristics), and the nums columns are numeric (continuous values)
-    columns.
+    by the groups dictionary, either exactly or as a ``(min, max)`` range. Initially,
+    the sizes are as equal as the ranges allow. For computing the diversity cost, the
+    ``bools`` and ``nums`` columns are specified. The bools columns are boolean columns
+    (e.g. categorical characteristics), and the nums columns are numeric (continuous
+    values) columns.
+
+    The assignment is stored as an array of integer group ``codes`` (positions in
+    ``names``) together with the positions of the members of each group, so that two
+    people can swap groups, or a person can move to another group, in constant time.
+    The ``group`` column of ``data`` is built from the codes when ``data`` is accessed
+    after a change, and ``assignment`` exposes the assignment as ``pd.Categorical``.
 
     Parameters
     ----------
@@ -22,29 +31,427 @@ class Cohort:
         The cohort data. Index must be unique.
     groups : dict
         A dictionary with the group names as keys and the number of people in each group
-        as values.
+        as values. The number can be a ``(min, max)`` tuple for a range of sizes.
     bools : list, optional
         A list of boolean columns in the data. These are categorical characteristics.
     nums : list, optional
         A list of numeric columns in the data. These are continuous values.
+    seed : int, np.random.SeedSequence, or np.random.Generator, optional
+        The seed of the random initial assignment. The default is a fresh random seed.
 
     """
 
-    def __init__(self, data, groups, bools=None, nums=None):
-        self.data = data.assign(
-            group=pd.Series(
-                [group for group, count in groups.items() for _ in range(count)]  # check np.repeat
+    def __init__(self, data, groups, bools=None, nums=None, seed=None):
+        self.min_size, self.max_size = _ranges(groups, len(data))
+
+        self._data = data.drop(columns="group", errors="ignore")
+        self.names = pd.Index(list(groups), name="group")
+        self.version = 0
+        self._data_version = None
+        self.codes = np.random.default_rng(seed).permutation(
+            np.repeat(
+                np.arange(len(groups), dtype=np.int32),
+                _balance(len(data), self.min_size, self.max_size),
             )
-            .sample(frac=1)
-            .to_list()
         )
 
         self.bools = bools
         self.nums = nums
 
+        # Handle to the columns which are not loaded (see ``from_csv``).
+        self.source = None
+        # People added since the last repair (see ``add_people``).
+        self.added = self._data.index[:0]
+        # Views of the groups and the columns they read (see ``__getitem__``).
+        self._groups = {}
+        self._values_cache = None, None
+
+    @classmethod
+    def from_csv(  # noqa: PLR0913
+        cls,
+        path,
+        groups,
+        bools=None,
+        nums=None,
+        *,
+        index_col=0,
+        chunksize=100_000,
+        seed=None,
+        **kwargs,
+    ):
+        """Load a cohort from a CSV file in chunks.
+
+        Only the index and the ``bools`` and ``nums`` columns are loaded, as ``bool``
+        and ``float32`` columns, and the diversity of the cohort is computed while the
+        file is read. The remaining columns can be read later with ``source.load``.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The path of the CSV file.
+        groups : dict
+            A dictionary with the group names as keys and the number of people in each
+            group as values.
+        bools : list, optional
+            A list of boolean columns in the file.
+        nums : list, optional
+            A list of numeric columns in the file.
+        index_col : int or str, optional
+            The position or the name of the index column. The default is 0.
+        chunksize : int, optional
+            The number of rows read at once. The default is 100,000.
+        seed : int, np.random.SeedSequence, or np.random.Generator, optional
+            The seed of the random initial assignment.
+        **kwargs
+            Additional keyword arguments passed to ``pd.read_csv``.
+
+        Returns
+        -------
+        Cohort
+            The cohort.
+
+        """
+        data, diversity, source = read_csv(
+            path,
+            bools=bools,
+            nums=nums,
+            index_col=index_col,
+            chunksize=chunksize,
+            **kwargs,
+        )
+        return cls._from_source(
+            data,
+            diversity,
+            source,
+            groups=groups,
+            bools=bools,
+            nums=nums,
+            seed=seed,
+        )
+
+    @classmethod
+    def from_parquet(  # noqa: PLR0913
+        cls,
+        path,
+        groups,
+        bools=None,
+        nums=None,
+        *,
+        index_col=None,
+        chunksize=100_000,
+        seed=None,
+    ):
+        """Load a cohort from a Parquet file in chunks.
+
+        This is the same as ``from_csv`` for Parquet files, and it requires
+        ``pyarrow``.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The path of the Parquet file.
+        groups : dict
+            A dictionary with the group names as keys and the number of people in each
+            group as values.
+        bools : list, optional
+            A list of boolean columns in the file.
+        nums : list, optional
+            A list of numeric columns in the file.
+        index_col : str, optional
+            The name of the index column. The default is the index stored by pandas.
+        chunksize : int, optional
+            The number of rows read at once. The default is 100,000.
+        seed : int, np.random.SeedSequence, or np.random.Generator, optional
+            The seed of the random initial assignment.
+
+        Returns
+        -------
+        Cohort
+            The cohort.
+
+        """
+        data, diversity, source = read_parquet(
+            path, bools=bools, nums=nums, index_col=index_col, chunksize=chunksize
+        )
+        return cls._from_source(
+            data,
+            diversity,
+            source,
+            groups=groups,
+            bools=bools,
+            nums=nums,
+            seed=seed,
+        )
+
+    @classmethod
+    def _from_source(cls, data, diversity, source, *, groups, bools, nums, seed):  # noqa: PLR0913
+        """Create a cohort from loaded data with a known diversity."""
+        cohort = cls(data=data, groups=groups, bools=bools, nums=nums, seed=seed)
+        cohort.diversity = diversity
+        cohort.source = source
+        return cohort
+
+    @property
+    def codes(self):
+        """The group code of each person, by position in ``data``.
+
+        The array is read-only. Assigning a new array of codes replaces the assignment.
+
+        """
+        codes = self._codes.view()
+        codes.flags.writeable = False
+        return codes
+
+    @codes.setter
+    def codes(self, codes):
+        codes = np.array(codes, dtype=np.int32)
+        sizes = np.bincount(codes, minlength=len(self.names))
+        if ((sizes < self.min_size) | (sizes > self.max_size)).any():
+            raise ValueError("The assignment does not respect the group sizes.")
+
+        # The slot of each person is its position within the members of its group.
+        order = np.argsort(codes, kind="stable")
+        self._codes = codes
+        self._members = [
+            members.tolist() for members in np.split(order, np.cumsum(sizes)[:-1])
+        ]
+        self._slot = np.empty(len(order), dtype=np.intp)
+        self._slot[order] = np.arange(len(order)) - np.repeat(
+            np.cumsum(sizes) - sizes, sizes
+        )
+
+        self.version += 1
+
+    @property
+    def sizes(self):
+        """The number of people in each group, in the order of ``names``."""
+        return np.array([len(members) for members in self._members])
+
+    @property
+    def assignment(self):
+        """The assignment as ``pd.Categorical`` of group names."""
+        return pd.Categorical.from_codes(self._codes, categories=self.names)
+
+    @property
+    def data(self):
+        """The cohort data with the ``group`` column.
+
+        The DataFrame is rebuilt only if the assignment changed since the last access.
+        Modifying it directly does not change the assignment.
+
+        """
+        if self._data_version != self.version:
+            self._cached_data = self._data.assign(
+                group=self.names.take(self._codes).to_numpy()
+            )
+            self._data_version = self.version
+
+        return self._cached_data
+
+    def members(self, group):
+        """Get the positions of the members of a group in ``data``.
+
+        Parameters
+        ----------
+        group : str
+            The name of the group.
+
+        Returns
+        -------
+        np.ndarray
+            The positions of the members, in ascending order.
+
+        """
+        return np.sort(
+            np.array(self._members[self.names.get_loc(group)], dtype=np.intp)
+        )
+
+    def swap(self, i, j):
+        """Swap the groups of the people at positions ``i`` and ``j``.
+
+        Parameters
+        ----------
+        i, j : int
+            The positions of the two people in ``data``.
+
+        """
+        a, b = self._codes[i], self._codes[j]
+        slot_i, slot_j = self._slot[i], self._slot[j]
+
+        self._members[a][slot_i], self._members[b][slot_j] = j, i
+        self._slot[i], self._slot[j] = slot_j, slot_i
+        self._codes[i], self._codes[j] = b, a
+
+        self.version += 1
+
+    def revert(self, i, j):
+        """Revert the swap of the people at positions ``i`` and ``j``.
+
+        A swap is its own inverse, so this is the same as ``swap``.
+
+        """
+        self.swap(i, j)
+
+    def move(self, i, b):
+        """Move the person at position ``i`` to the group with code ``b``.
+
+        Parameters
+        ----------
+        i : int
+            The position of the person in ``data``.
+        b : int
+            The code of the group (position in ``names``).
+
+        Raises
+        ------
+        ValueError
+            If the move leaves a group size outside its range.
+
+        """
+        a = self._codes[i]
+        if a == b:
+            return
+        if len(self._members[a]) <= max(self.min_size[a], 1):
+            raise ValueError(f"Group {self.names[a]!r} cannot have fewer members.")
+        if len(self._members[b]) >= self.max_size[b]:
+            raise ValueError(f"Group {self.names[b]!r} cannot have more members.")
+
+        # The last member of a takes the slot of i.
+        last = self._members[a].pop()
+        if last != i:
+            self._members[a][self._slot[i]] = last
+            self._slot[last] = self._slot[i]
+
+        self._slot[i] = len(self._members[b])
+        self._members[b].append(i)
+        self._codes[i] = b
+
+        self.version += 1
+
+    def add_people(self, data, groups=None):
+        """Add people to the cohort, keeping the assignment of everyone else.
+
+        The newcomers fill the groups below their minimum size first, and then the
+        groups with the most free places. If ``groups`` changes the size ranges, the
+        fewest people needed are moved to respect them. ``diversity`` is updated from
+        the newcomers only, if it was already computed. The newcomers are recorded in
+        ``added``, so that ``Solver.repair`` can place them without counting them as
+        disrupted.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The data of the newcomers, with the ``bools`` and ``nums`` columns. Its
+            index must not overlap the index of the cohort.
+        groups : dict, optional
+            The new size ranges of the groups, in the format of the ``groups``
+            parameter of ``Cohort``, with the same group names. The default is to keep
+            the size ranges.
+
+        Raises
+        ------
+        ValueError
+            If the index overlaps the cohort or the groups have no places for the
+            newcomers.
+
+        """
+        data = data.drop(columns="group", errors="ignore")
+        if not data.index.is_unique or self._data.index.isin(data.index).any():
+            raise ValueError("The newcomers must have new, unique indices.")
+
+        total = len(self._data) + len(data)
+        min_size, max_size = self._ranges(groups, total)
+        data = data.astype(
+            self._data.dtypes.loc[[*(self.bools or []), *(self.nums or [])]].to_dict()
+        )
+
+        sizes = self.sizes
+        placed = np.empty(len(data), dtype=np.int32)
+        for k in range(len(data)):
+            need = min_size - sizes
+            placed[k] = need.argmax() if need.max() > 0 else (max_size - sizes).argmax()
+            sizes[placed[k]] += 1
+        codes = _refill(np.concatenate([self._codes, placed]), min_size, max_size)
+
+        if "diversity" in self.__dict__:
+            self.diversity = update_diversity(
+                self.diversity, len(self._data), data, self.bools, self.nums
+            )
+        self._data = pd.concat([self._data, data])
+        self._values_cache = None, None
+        self.added = self.added.append(data.index)
+        self.min_size, self.max_size = min_size, max_size
+        self.codes = codes
+
+    def remove_people(self, index, groups=None):
+        """Remove people from the cohort, keeping the assignment of everyone else.
+
+        If a group falls below its minimum size (or ``groups`` changes the size
+        ranges), the fewest people needed are moved from the groups with the most
+        people to spare. ``diversity`` is updated from the leavers only, if it was
+        already computed.
+
+        Parameters
+        ----------
+        index : list-like
+            The indices of the leavers in ``data``.
+        groups : dict, optional
+            The new size ranges of the groups, in the format of the ``groups``
+            parameter of ``Cohort``, with the same group names. The default is to keep
+            the size ranges.
+
+        Raises
+        ------
+        KeyError
+            If some of the leavers are not in the cohort.
+        ValueError
+            If the groups have too many places for the remaining people.
+
+        """
+        positions = self._data.index.get_indexer(pd.Index(index).unique())
+        if (positions < 0).any():
+            raise KeyError("Some of the people are not in the cohort.")
+
+        keep = np.ones(len(self._data), dtype=bool)
+        keep[positions] = False
+        min_size, max_size = self._ranges(groups, keep.sum())
+        codes = _refill(self._codes[keep], min_size, max_size)
+
+        if "diversity" in self.__dict__:
+            self.diversity = update_diversity(
+                self.diversity,
+                len(self._data),
+                self._data.iloc[positions],
+                self.bools,
+                self.nums,
+                remove=True,
+            )
+        self._data = self._data[keep]
+        self._values_cache = None, None
+        self.added = self.added.intersection(self._data.index, sort=False)
+        self.min_size, self.max_size = min_size, max_size
+        self.codes = codes
+
+    def _ranges(self, groups, n):
+        """Size ranges of ``groups`` (default: the current ranges) for ``n`` people."""
+        if groups is None:
+            groups = {
+                name: (low, high)
+                for name, low, high in zip(
+                    self.names, self.min_size, self.max_size, strict=True
+                )
+            }
+        elif list(groups) != self.names.to_list():
+            raise ValueError("The groups must have the same names as the cohort.")
+        return _ranges(groups, n)
+
     def __getitem__(self, group):
         """Extract a group from the cohort.
 
+        The group is a view of the cohort, which does not copy the data of the members
+        (see ``Group``). The same view is returned for the same group, so its cached
+        diversity is reused until the assignment changes.
+
         Parameters
         ----------
         group : str
@@ -56,11 +463,27 @@ class Cohort:
             The group object.
 
         """
-        return Group(
-            data=self.data.loc[self.data.group == group, :],
-            bools=self.bools,
-            nums=self.nums,
-        )
+        code = self.names.get_loc(group)
+        view = self._groups.get(code)
+        if (
+            view is None
+            or view._cohort is not self
+            or (view.bools, view.nums) != (self.bools, self.nums)
+        ):
+            view = self._groups[code] = Group._view(self, code)
+        return view
+
+    def _values(self, bools, nums):
+        """Get the ``bools`` and ``nums`` columns of ``data`` as a float array.
+
+        The array is cached until the people of the cohort change.
+
+        """
+        key = (tuple(bools), tuple(nums))
+        if self._values_cache[0] != key:
+            values = self._data.loc[:, [*bools, *nums]].to_numpy(dtype=float)
+            self._values_cache = key, values
+        return self._values_cache[1]
 
     @functools.cached_property
     def diversity(self):
@@ -72,7 +495,18 @@ class Cohort:
         For more details, see the `util.diversity` function.
 
         """
-        return diversity(data=self.data, bools=self.bools, nums=self.nums)
+        return diversity(data=self._data, bools=self.bools, nums=self.nums)
+
+    @functools.cached_property
+    def schema(self):
+        """Compute the feature schema of the cohort diversity.
+
+        This is a cached property, so it is only computed once and then stored.
+
+        For more details, see the `util.schema` function.
+
+        """
+        return schema(self.diversity)
 
     def diversity_cost(self, cost_fn=None):
         """Compute the diversity cost of the cohort.
@@ -139,6 +573,49 @@ class Cohort:
             }
         ).sum()
 
+    def lower_bound(self, keep_together=None, keep_separate=None, bool_min=None):
+        """Compute a lower bound of the cost of any assignment of the cohort.
+
+        The bound only depends on the diversity of the cohort and the group sizes,
+        and it is the sum of independent bounds of the default cost functions:
+
+        - The fraction of a boolean characteristic in a group of ``s`` people is a
+          multiple of ``1 / s``, so it differs from the cohort fraction by at least
+          the distance to the nearest multiple.
+        - The numerical means and standard deviations can match the cohort, so they
+          are bounded by 0.
+        - The members of a ``keep_together`` list are at best in the largest groups
+          and the members of a ``keep_separate`` list at best spread evenly.
+        - Groups beyond the number of people with a ``bool_min`` characteristic
+          divided by its minimum cannot reach the minimum.
+
+        Parameters
+        ----------
+        keep_together : list of list of str, optional
+            A list of lists of indices in ``data`` that should be kept together.
+        keep_separate : list of list of str, optional
+            A list of list of indices in ``data`` that should be kept separate.
+        bool_min : dict, optional
+            The minimum number of people with the boolean characteristic in the group.
+
+        Returns
+        -------
+        float
+            The lower bound of the diversity cost plus the restriction cost.
+
+        """
+        index = self._data.index
+        bool_min = {col: n for col, n in (bool_min or {}).items() if n > 0}
+
+        return lower_bound(
+            self.min_size,
+            self.max_size,
+            [self.diversity[f"bool_{col}"] for col in self.bools or []],
+            together=_counts(index, keep_together),
+            separate=_counts(index, keep_separate),
+            reach=[self._data[col].sum() // n for col, n in bool_min.items()],
+        )
+
     def overview(self):
         """Compute the overview DataFrame of the cohort.
 
@@ -150,6 +627,9 @@ class Cohort:
         - ``std(<num_name>)``: the standard deviation of the numerical variable in each
           group
 
+        The statistics of all the columns are aggregated in a single ``groupby`` pass,
+        and the diversity costs of all the groups are computed from them at once.
+
         Returns
         -------
         pd.DataFrame
@@ -157,27 +637,111 @@ class Cohort:
             the size, diversity cost, and the boolean and numerical variables.
 
         """
-        series = [
-            self.data.groupby("group").size().rename("size"),
-            self.data.groupby("group")
-            .apply(
-                lambda x: self[x.name].diversity_cost(self.diversity),
-                include_groups=False,
-            )
-            .rename("diversity_cost"),
+        bools, nums = list(self.bools or []), list(self.nums or [])
+        grouped = self.data.groupby("group")
+        size = grouped.size().rename("size")
+
+        # One aggregation pass, with (column, statistic) columns.
+        stats = {col: ["sum"] for col in bools} | {col: ["mean", "std"] for col in nums}
+        agg = grouped[list(stats)].agg(stats) if stats else None
+
+        # Diversity of every group, in the order of the cohort diversity.
+        schema = self.schema
+        group_diversity = np.zeros((len(size), len(schema)))
+        for k, (kind, variable) in enumerate(
+            zip(schema.kind, schema.variable, strict=True)
+        ):
+            if kind == "bool":
+                group_diversity[:, k] = agg[variable, "sum"] / size
+            else:
+                group_diversity[:, k] = agg[variable, kind]
+        cohort_diversity = self.diversity.to_numpy(dtype=float)
+        norm = schema.norm.to_numpy(dtype=np.intp)
+        scale = np.where(norm < 0, 1.0, cohort_diversity[norm])
+        cost = np.sum(np.abs(cohort_diversity - group_diversity) / scale, axis=1)
+
+        series = [size, pd.Series(cost, index=size.index, name="diversity_cost")]
+        series += [agg[col, "sum"].rename(col) for col in bools]
+        series += [
+            agg[col].round(2).rename(lambda stat, col=col: f"{stat}({col})", axis=1)
+            for col in nums
         ]
 
-        if self.bools is not None:
-            for col in self.bools:
-                series.append(self.data.groupby("group")[col].sum().rename(col))
-
-        if self.nums is not None:
-            for col in self.nums:
-                series.append(
-                    self.data.groupby("group")[col]
-                    .agg(["mean", "std"])
-                    .round(2)
-                    .rename(lambda agg: f"{agg}({col})", axis=1)
-                )
-
         return pd.concat(series, axis=1)
+
+
+def _counts(index, lists):
+    """Count the people of ``index`` in each of ``lists`` of index labels."""
+    return [
+        np.count_nonzero(np.unique(index.get_indexer(pd.Index(labels))) >= 0)
+        for labels in lists or []
+    ]
+
+
+def _ranges(groups, n):
+    """Minimum and maximum size of each group of a ``groups`` dictionary.
+
+    Raises
+    ------
+    ValueError
+        If the ranges are invalid or they have no places for ``n`` people.
+
+    """
+    sizes = [
+        size if isinstance(size, tuple) else (size, size) for size in groups.values()
+    ]
+    min_size, max_size = np.array(sizes, dtype=int).reshape(-1, 2).T
+    if (min_size < 0).any() or (min_size > max_size).any():
+        raise ValueError("Group sizes must be non-negative with min <= max.")
+    if not min_size.sum() <= n <= max_size.sum():
+        places = f"{min_size.sum()} to {max_size.sum()}"
+        raise ValueError(f"The groups have {places} places for {n} people.")
+    return min_size, max_size
+
+
+def _refill(codes, min_size, max_size):
+    """Move the fewest people needed for the group sizes to respect their ranges.
+
+    People move out of the groups above their maximum size (or with the most people
+    to spare) into the groups below their minimum size (or with the most free places).
+    The last people of a group move first, so that newcomers move before the others.
+
+    Returns
+    -------
+    np.ndarray
+        The group codes.
+
+    """
+    codes = codes.copy()
+    sizes = np.bincount(codes, minlength=len(min_size))
+    while (sizes < min_size).any() or (sizes > max_size).any():
+        if (sizes > max_size).any():
+            a = (sizes - max_size).argmax()
+            b = (max_size - sizes).argmax()
+        else:
+            b = (min_size - sizes).argmax()
+            a = (sizes - min_size).argmax()
+        codes[np.flatnonzero(codes == a)[-1]] = b
+        sizes[a] -= 1
+        sizes[b] += 1
+    return codes
+
+
+def _balance(n, min_size, max_size):
+    """Split ``n`` people into groups with sizes as equal as the ranges allow.
+
+    Returns
+    -------
+    np.ndarray
+        The size of each group.
+
+    """
+    # The largest level at which the sizes clipped to the ranges fit n people.
+    level = min_size.min()
+    while level < max_size.max() and np.clip(level + 1, min_size, max_size).sum() <= n:
+        level += 1
+
+    sizes = np.clip(level, min_size, max_size)
+    grow = np.flatnonzero(sizes < max_size)[: n - sizes.sum()]
+    sizes[grow] += 1
+    return sizes
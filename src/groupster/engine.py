@@ -0,0 +1,837 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from .stats import untimed
+
+
+class Engine:
+    """Array-backed state of a cohort for incremental cost evaluation.
+
+    The engine compiles the ``bools`` and ``nums`` columns of a cohort into NumPy
+    arrays and keeps per-group running sums, counts, and sums of squares. This allows
+    the cost change of swapping two people to be evaluated in time proportional to the
+    number of features, without touching ``pd.DataFrame`` objects. The costs are the
+    same as the ones computed by `util.diversity_cost` and `util.restriction_cost`.
+
+    The engine works on positions (not index labels) of people in ``cohort.data``.
+    The assignment is only written back to the cohort when ``write`` is called. If the
+    cohort has ranges of group sizes, a person can also ``move`` to another group.
+
+    Parameters
+    ----------
+    cohort : Cohort
+        The cohort to compile.
+    keep_together : list of list of str, optional
+        A list of lists of indices in ``data`` that should be kept together.
+    keep_separate : list of list of str, optional
+        A list of lists of indices in ``data`` that should be kept separate.
+    bool_min : dict, optional
+        The minimum number of people with the boolean characteristic in the group.
+        For example, if we want at least two females in each group, we can set
+        ``bool_min={'female': 2}``.
+    affinity : scipy.sparse array or matrix, optional
+        The affinity of every person for every other person, by position in
+        ``data``. The restriction cost of a group is decreased by the affinities of
+        all ordered pairs of its members, ``affinity[p, q] + affinity[q, p]`` for
+        every pair of members ``p`` and ``q``, so negative affinities keep people
+        apart. This requires ``scipy``.
+
+    """
+
+    def __init__(
+        self,
+        cohort,
+        keep_together=None,
+        keep_separate=None,
+        bool_min=None,
+        affinity=None,
+    ):
+        data = cohort.data
+        diversity = cohort.diversity
+        schema = cohort.schema
+
+        # Groups without members are left out, as their costs are undefined.
+        self.groups, self.codes = np.unique(cohort.codes, return_inverse=True)
+        self.names = cohort.names[self.groups]
+
+        # The range of the size of each group. Moves never leave a group empty.
+        self.min_size = np.maximum(cohort.min_size[self.groups], 1)
+        self.max_size = cohort.max_size[self.groups]
+
+        # Features, in the order of the cohort schema. Numerical columns are centred on
+        # the cohort mean, which keeps the sums of squares numerically stable.
+        is_bool = schema.kind.eq("bool").to_numpy()
+        is_mean = schema.kind.eq("mean").to_numpy()
+        bools = schema.variable[is_bool].to_list()
+        nums = schema.variable[is_mean].to_list()
+
+        self.bool_target = diversity[is_bool].to_numpy(dtype=float)
+        self.num_mean = diversity[is_mean].to_numpy(dtype=float)
+        self.num_std = diversity.loc[[f"num_{col}_std" for col in nums]].to_numpy(
+            dtype=float
+        )
+        self.bool_values = data.loc[:, bools].to_numpy(dtype=float)
+        self.num_values = data.loc[:, nums].to_numpy(dtype=float) - self.num_mean
+        self.num_squares = self.num_values**2
+
+        # Restrictions. Each keep_together and keep_separate list is a constraint,
+        # weighted -1 (together) or +1 (separate). The constraints of each person are
+        # indexed in compressed sparse row format: the constraints of the person at
+        # position p are indices[indptr[p] : indptr[p + 1]].
+        constraints = list(keep_together or []) + list(keep_separate or [])
+        self.weights = np.array(
+            [-1] * len(keep_together or []) + [1] * len(keep_separate or []),
+            dtype=float,
+        )
+        self.indptr, self.indices = _index(data.index, constraints)
+
+        bool_min = bool_min or {}
+        self.min_values = data.loc[:, list(bool_min)].to_numpy(dtype=float)
+        self.min_target = np.array(list(bool_min.values()), dtype=float)
+
+        # Pair affinities, symmetric and without the diagonal, in CSR format.
+        self.affinity = None if affinity is None else _symmetric(affinity, len(data))
+
+        # Context manager timing the sections of the cost evaluation.
+        self.time = untimed
+
+        # Incremented whenever the assignment changes, so that quantities derived
+        # from it can be cached.
+        self.version = 0
+
+        self.refresh()
+
+    @property
+    def n_groups(self):
+        """Number of groups."""
+        return len(self.names)
+
+    @property
+    def n_constraints(self):
+        """Number of keep_together and keep_separate constraints."""
+        return len(self.weights)
+
+    def _sums(self, values):
+        """Sum ``values`` per group."""
+        sums = np.zeros((self.n_groups, values.shape[1]))
+        np.add.at(sums, self.codes, values)
+        return sums
+
+    def _constraints(self, p):
+        """Constraints of people at positions ``p`` (1D array).
+
+        Returns
+        -------
+        np.ndarray
+            For every membership, the index of the person in ``p``.
+        np.ndarray
+            For every membership, the constraint.
+
+        """
+        owner, entry = _rows(self.indptr, p)
+        return owner, self.indices[entry]
+
+    def _affinities(self, p):
+        """Affinities of people at positions ``p`` (1D array).
+
+        Returns
+        -------
+        np.ndarray
+            For every affinity, the index of the person in ``p``.
+        np.ndarray
+            For every affinity, the position of the other person.
+        np.ndarray
+            The affinities.
+
+        """
+        owner, entry = _rows(self.affinity.indptr, p)
+        return owner, self.affinity.indices[entry], self.affinity.data[entry]
+
+    def refresh(self):
+        """Recompute all per-group aggregates and costs from the assignment.
+
+        Aggregates are updated incrementally on every swap, so this is only needed
+        after the assignment is changed directly.
+
+        """
+        self.size = np.bincount(self.codes, minlength=self.n_groups).astype(float)
+        self.bool_sum = self._sums(self.bool_values)
+        self.num_sum = self._sums(self.num_values)
+        self.num_sumsq = self._sums(self.num_squares)
+        self.min_sum = self._sums(self.min_values)
+        self._count_members()
+
+        self.group_diversity_cost = self._diversity_cost(
+            self.size, self.bool_sum, self.num_sum, self.num_sumsq
+        )
+        self.group_restriction_cost = (
+            self._restriction_cost(self.min_sum) + self._affinity_cost()
+        )
+        self.index_members()
+
+    def _count_members(self):
+        """Count the members of each constraint in each group from the assignment.
+
+        A constraint has as many slots as members, the constraint ``c`` the slots
+        ``cptr[c] : cptr[c + 1]``. Every group with members of the constraint has a
+        slot, with its code in ``cgroups`` and the number of members in ``ccounts``,
+        and the other slots are -1 and 0. ``spread`` is the number of groups with
+        members of each constraint. They are updated on every swap and move.
+
+        """
+        members = np.bincount(self.indices, minlength=self.n_constraints)
+        self.cptr = np.concatenate([[0], np.cumsum(members)])
+
+        owner, constraint = self._constraints(np.arange(len(self.codes)))
+        keys, counts = np.unique(
+            constraint * self.n_groups + self.codes[owner], return_counts=True
+        )
+        constraint, group = np.divmod(keys, self.n_groups)
+        self.spread = np.bincount(constraint, minlength=self.n_constraints)
+        rank = np.arange(keys.size) - np.repeat(
+            np.cumsum(self.spread) - self.spread, self.spread
+        )
+
+        self.cgroups = np.full(self.cptr[-1], -1, dtype=np.int32)
+        self.ccounts = np.zeros(self.cptr[-1], dtype=np.int32)
+        self.cgroups[self.cptr[constraint] + rank] = group
+        self.ccounts[self.cptr[constraint] + rank] = counts
+
+    def count(self, g, c):
+        """Count the members of the constraints ``c`` in the groups ``g``.
+
+        Parameters
+        ----------
+        g, c : np.ndarray
+            Codes of groups and indices of constraints, of the same shape.
+
+        Returns
+        -------
+        np.ndarray
+            The number of members of every constraint in its group.
+
+        """
+        owner, entry = _rows(self.cptr, c.ravel())
+        found = self.cgroups[entry] == g.ravel()[owner]
+        counts = np.zeros(c.size, dtype=self.ccounts.dtype)
+        counts[owner[found]] = self.ccounts[entry[found]]
+        return counts.reshape(c.shape)
+
+    def _transfer(self, constraints, a, b):
+        """Count one member of each of ``constraints`` in group ``b`` instead of ``a``.
+
+        The constraints must be distinct and have members in ``a``.
+
+        """
+        if not constraints.size:
+            return
+        owner, entry = _rows(self.cptr, constraints)
+
+        # The slot of a, freed if it has no members left.
+        left = entry[self.cgroups[entry] == a]
+        self.ccounts[left] -= 1
+        empty = self.ccounts[left] == 0
+        self.cgroups[left[empty]] = -1
+        self.spread[constraints[empty]] -= 1
+
+        # The slot of b, or the first free slot if b has no members yet.
+        group = self.cgroups[entry]
+        self.ccounts[entry[group == b]] += 1
+        new = np.ones(len(constraints), dtype=bool)
+        new[owner[group == b]] = False
+        free = (group < 0) & new[owner]
+        added, first = np.unique(owner[free], return_index=True)
+        self.cgroups[entry[free][first]] = b
+        self.ccounts[entry[free][first]] = 1
+        self.spread[constraints[added]] += 1
+
+    def index_members(self, order=None):
+        """Index the members of each group from the assignment.
+
+        Every group has ``capacity`` slots in ``order``, starting at ``start``, in the
+        order of the groups. The positions of its members are stored in the first
+        ``size`` of them and the other slots are -1. ``slot`` is the position of every
+        person in ``order``. They are updated on every swap and move.
+
+        Parameters
+        ----------
+        order : np.ndarray, optional
+            The order of the members within the groups, e.g. saved from a previous
+            run. The default is the order of the positions.
+
+        """
+        # A group has at most the people who are not needed by the other groups.
+        self.capacity = np.minimum(
+            self.max_size, len(self.codes) - self.min_size.sum() + self.min_size
+        )
+        self.start = np.cumsum(self.capacity) - self.capacity
+
+        if order is None:
+            people = np.argsort(self.codes, kind="stable")
+            size = self.size.astype(int)
+            rank = np.arange(len(people)) - np.repeat(np.cumsum(size) - size, size)
+            order = np.full(self.capacity.sum(), -1)
+            order[self.start[self.codes[people]] + rank] = people
+
+        self.order = np.array(order, dtype=np.intp)
+        self.slot = np.empty(len(self.codes), dtype=np.intp)
+        filled = np.flatnonzero(self.order >= 0)
+        self.slot[self.order[filled]] = filled
+        self.version += 1
+
+    def _diversity_cost(self, size, bool_sum, num_sum, num_sumsq):
+        """Diversity cost of groups with the given aggregates.
+
+        Arguments have the group dimension(s) first and the feature dimension last.
+        This reproduces `util.diversity_cost` applied to `util.diversity` of a group.
+
+        """
+        size = size[..., np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = num_sum / size
+            # Sample (ddof=1) standard deviation, as computed by pandas.
+            var = (num_sumsq - num_sum * mean) / (size - 1)
+        std = np.sqrt(np.maximum(var, 0))
+
+        return (
+            np.abs(bool_sum / size - self.bool_target).sum(axis=-1)
+            + (np.abs(mean) / self.num_mean).sum(axis=-1)
+            + (np.abs(std - self.num_std) / self.num_mean).sum(axis=-1)
+        )
+
+    def _restriction_cost(self, min_sum):
+        """Restriction cost of every group with the given ``min_sum``.
+
+        This reproduces `util.restriction_cost`.
+
+        """
+        filled = self.cgroups >= 0
+        constraint = np.repeat(np.arange(self.n_constraints), np.diff(self.cptr))
+        constraint_cost = np.bincount(
+            self.cgroups[filled],
+            weights=self.weights[constraint[filled]] * self.ccounts[filled] ** 2.0,
+            minlength=self.n_groups,
+        )
+        return constraint_cost + self._bool_min_cost(min_sum)
+
+    def _affinity_cost(self):
+        """Affinity part of the restriction cost of every group."""
+        if self.affinity is None:
+            return 0.0
+
+        owner, other, affinity = self._affinities(np.arange(len(self.codes)))
+        same = self.codes[owner] == self.codes[other]
+        # Every pair of members appears twice in the symmetric matrix.
+        return (
+            -np.bincount(
+                self.codes[owner[same]], weights=affinity[same], minlength=self.n_groups
+            )
+            / 2
+        )
+
+    @property
+    def affinity_bound(self):
+        """Lower bound of the affinity part of the restriction cost.
+
+        This is the cost if all pairs with a positive affinity are in the same groups.
+
+        """
+        if self.affinity is None:
+            return 0.0
+        return -self.affinity.data[self.affinity.data > 0].sum() / 2
+
+    def _bool_min_cost(self, min_sum):
+        """Compute the ``bool_min`` part of the restriction cost."""
+        return 10 * (min_sum < self.min_target).sum(axis=-1)
+
+    def _constraint_delta(self, i, j, ab):
+        """Change of the constraint costs of groups ``ab`` if ``i`` and ``j`` swap.
+
+        Only the constraints of the two people are visited, so the time is
+        proportional to the number of their memberships.
+
+        """
+        shape = ab.shape
+        i, j, ab = np.atleast_1d(i), np.atleast_1d(j), ab.reshape(-1, 2)
+        delta = np.zeros(ab.shape)
+
+        owner_i, constraint_i = self._constraints(i)
+        owner_j, constraint_j = self._constraints(j)
+        if owner_i.size or owner_j.size:
+            # The change of the member count of each (candidate, constraint) pair in
+            # the group of i. A constraint shared by i and j does not change.
+            keys, inverse = np.unique(
+                np.concatenate([owner_i, owner_j]) * self.n_constraints
+                + np.concatenate([constraint_i, constraint_j]),
+                return_inverse=True,
+            )
+            change = np.bincount(
+                inverse,
+                weights=np.repeat([-1.0, 1.0], [owner_i.size, owner_j.size]),
+                minlength=keys.size,
+            )
+            owner, constraint = np.divmod(keys, self.n_constraints)
+
+            # (count + change)**2 - count**2 in the group of i and (count - change)**2
+            # - count**2 in the group of j.
+            weight = self.weights[constraint]
+            counts = self.count(
+                ab[owner], np.repeat(constraint[:, np.newaxis], 2, axis=1)
+            )
+            for k, sign in enumerate([1, -1]):
+                count = counts[:, k]
+                delta[:, k] = np.bincount(
+                    owner,
+                    weights=weight * (2 * sign * change * count + change**2),
+                    minlength=len(ab),
+                )
+
+        return delta.reshape(shape)
+
+    def _affinity_delta(self, i, j, ab):
+        """Change of the affinity costs of groups ``ab`` if ``i`` and ``j`` swap.
+
+        Only the rows of the affinity matrix of the two people are visited, so the
+        time is proportional to the number of their affinities.
+
+        """
+        if self.affinity is None:
+            return 0.0
+
+        shape = ab.shape
+        i, j, ab = np.atleast_1d(i), np.atleast_1d(j), ab.reshape(-1, 2)
+
+        # The affinities of p with the members of a and b, and with q.
+        sums = []
+        for p, q in ((i, j), (j, i)):
+            owner, other, affinity = self._affinities(p)
+            code = self.codes[other]
+            sums.append(
+                [
+                    np.bincount(owner, weights=affinity * mask, minlength=len(ab))
+                    for mask in (
+                        code == ab[owner, 0],
+                        code == ab[owner, 1],
+                        other == q[owner],
+                    )
+                ]
+            )
+        (i_a, i_b, ij), (j_a, j_b, _) = sums
+
+        # a loses i and gains j (apart from i), and b loses j and gains i.
+        delta = np.stack([i_a - j_a + ij, j_b - i_b + ij], axis=-1)
+        return delta.reshape(shape)
+
+    def _move_affinity_delta(self, i, ab):
+        """Change of the affinity costs of groups ``ab`` if ``i`` moves from a to b."""
+        if self.affinity is None:
+            return 0.0
+
+        shape = ab.shape
+        ab = ab.reshape(-1, 2)
+        owner, other, affinity = self._affinities(np.atleast_1d(i))
+        code = self.codes[other]
+        delta = np.stack(
+            [
+                np.bincount(
+                    owner, weights=affinity * (code == ab[owner, 0]), minlength=len(ab)
+                ),
+                -np.bincount(
+                    owner, weights=affinity * (code == ab[owner, 1]), minlength=len(ab)
+                ),
+            ],
+            axis=-1,
+        )
+        return delta.reshape(shape)
+
+    def _move_constraint_delta(self, i, ab):
+        """Change of the constraint costs of groups ``ab`` if ``i`` moves from a to b.
+
+        Every constraint of ``i`` has one member less in a and one more in b.
+
+        """
+        shape = ab.shape
+        ab = ab.reshape(-1, 2)
+        owner, constraint = self._constraints(np.atleast_1d(i))
+
+        weight = self.weights[constraint]
+        count = self.count(ab[owner], np.repeat(constraint[:, np.newaxis], 2, axis=1))
+        delta = np.stack(
+            [
+                np.bincount(
+                    owner, weights=weight * (1 - 2 * count[:, 0]), minlength=len(ab)
+                ),
+                np.bincount(
+                    owner, weights=weight * (1 + 2 * count[:, 1]), minlength=len(ab)
+                ),
+            ],
+            axis=-1,
+        )
+        return delta.reshape(shape)
+
+    @property
+    def features(self):
+        """Constant arrays of the engine, in the order used by `kernel.run`."""
+        return (
+            self.bool_values,
+            self.bool_target,
+            self.num_values,
+            self.num_squares,
+            self.num_mean,
+            self.num_std,
+            self.min_values,
+            self.min_target,
+            self.indptr,
+            self.indices,
+            self.weights,
+            self.cptr,
+        )
+
+    @property
+    def state(self):
+        """Arrays of the engine modified by swaps, in the order used by `kernel.run`."""
+        return (
+            self.codes,
+            self.size,
+            self.bool_sum,
+            self.num_sum,
+            self.num_sumsq,
+            self.min_sum,
+            self.cgroups,
+            self.ccounts,
+            self.spread,
+            self.group_diversity_cost,
+            self.group_restriction_cost,
+        )
+
+    @property
+    def diversity_cost(self):
+        """Diversity cost of the cohort."""
+        return self.group_diversity_cost.sum()
+
+    @property
+    def restriction_cost(self):
+        """Restriction cost of the cohort."""
+        return self.group_restriction_cost.sum()
+
+    @property
+    def cost(self):
+        """Total cost of the cohort."""
+        return self.diversity_cost + self.restriction_cost
+
+    def _swapped(self, i, j):
+        """Compute aggregates and costs of the groups of ``i`` and ``j`` after a swap.
+
+        ``i`` and ``j`` can be integers or 1D arrays of the same shape. The second to
+        last dimension of the aggregates (last dimension of the costs) has size 2: the
+        first element refers to the current group of ``i`` and the second to the
+        current group of ``j``.
+
+        """
+        ab = np.stack([self.codes[i], self.codes[j]], axis=-1)
+        sign = np.array([[1.0], [-1.0]])
+
+        def moved(sums, values):
+            return sums[ab] + sign * (values[j] - values[i])[..., np.newaxis, :]
+
+        with self.time("diversity"):
+            bool_sum = moved(self.bool_sum, self.bool_values)
+            num_sum = moved(self.num_sum, self.num_values)
+            num_sumsq = moved(self.num_sumsq, self.num_squares)
+            diversity = self._diversity_cost(
+                self.size[ab], bool_sum, num_sum, num_sumsq
+            )
+
+        with self.time("restriction"):
+            min_sum = moved(self.min_sum, self.min_values)
+            restriction = (
+                self.group_restriction_cost[ab]
+                + self._constraint_delta(i, j, ab)
+                + self._affinity_delta(i, j, ab)
+                + self._bool_min_cost(min_sum)
+                - self._bool_min_cost(self.min_sum[ab])
+            )
+
+        return ab, (bool_sum, num_sum, num_sumsq, min_sum), diversity, restriction
+
+    def delta(self, i, j):
+        """Change of the total cost if people at positions ``i`` and ``j`` swap groups.
+
+        The cost changes of many candidate swaps can be evaluated at once by passing
+        arrays of positions. All candidates are evaluated independently, relative to
+        the current assignment.
+
+        Parameters
+        ----------
+        i, j : int or np.ndarray
+            Positions of two people in different groups.
+
+        Returns
+        -------
+        float or np.ndarray
+            The cost after the swap minus the cost before the swap.
+
+        """
+        ab, _, diversity, restriction = self._swapped(i, j)
+        return (
+            diversity.sum(axis=-1)
+            + restriction.sum(axis=-1)
+            - self.group_diversity_cost[ab].sum(axis=-1)
+            - self.group_restriction_cost[ab].sum(axis=-1)
+        )
+
+    def swap(self, i, j):
+        """Swap the groups of people at positions ``i`` and ``j``.
+
+        Parameters
+        ----------
+        i, j : int
+            Positions of two people in different groups.
+
+        """
+        ab, sums, diversity, restriction = self._swapped(i, j)
+
+        self.bool_sum[ab], self.num_sum[ab], self.num_sumsq[ab], self.min_sum[ab] = sums
+        self.group_diversity_cost[ab] = diversity
+        self.group_restriction_cost[ab] = restriction
+
+        a, b = ab
+        self._transfer(self.indices[self.indptr[i] : self.indptr[i + 1]], a, b)
+        self._transfer(self.indices[self.indptr[j] : self.indptr[j + 1]], b, a)
+
+        self.codes[i], self.codes[j] = self.codes[j], self.codes[i]
+        self.order[self.slot[i]], self.order[self.slot[j]] = j, i
+        self.slot[i], self.slot[j] = self.slot[j], self.slot[i]
+        self.version += 1
+
+    def _moved(self, i, b):
+        """Compute sizes, aggregates, and costs of the groups if ``i`` moves to ``b``.
+
+        This is the same as ``_swapped`` for a move of the people at positions ``i``
+        from their group to the groups with codes ``b``. The first element of the
+        second to last dimension refers to the current group of ``i`` and the second
+        to ``b``.
+
+        """
+        ab = np.stack([self.codes[i], b], axis=-1)
+        sign = np.array([[-1.0], [1.0]])
+
+        def moved(sums, values):
+            return sums[ab] + sign * values[i][..., np.newaxis, :]
+
+        size = self.size[ab] + sign[:, 0]
+        with self.time("diversity"):
+            bool_sum = moved(self.bool_sum, self.bool_values)
+            num_sum = moved(self.num_sum, self.num_values)
+            num_sumsq = moved(self.num_sumsq, self.num_squares)
+            diversity = self._diversity_cost(size, bool_sum, num_sum, num_sumsq)
+
+        with self.time("restriction"):
+            min_sum = moved(self.min_sum, self.min_values)
+            restriction = (
+                self.group_restriction_cost[ab]
+                + self._move_constraint_delta(i, ab)
+                + self._move_affinity_delta(i, ab)
+                + self._bool_min_cost(min_sum)
+                - self._bool_min_cost(self.min_sum[ab])
+            )
+
+        return (
+            ab,
+            (size, bool_sum, num_sum, num_sumsq, min_sum),
+            diversity,
+            restriction,
+        )
+
+    def delta_move(self, i, b):
+        """Change of the total cost if the person at position ``i`` moves to ``b``.
+
+        Like ``delta``, many candidate moves can be evaluated at once by passing
+        arrays.
+
+        Parameters
+        ----------
+        i : int or np.ndarray
+            Positions of people.
+        b : int or np.ndarray
+            Codes of groups other than the groups of ``i``.
+
+        Returns
+        -------
+        float or np.ndarray
+            The cost after the move minus the cost before the move.
+
+        """
+        ab, _, diversity, restriction = self._moved(i, b)
+        return (
+            diversity.sum(axis=-1)
+            + restriction.sum(axis=-1)
+            - self.group_diversity_cost[ab].sum(axis=-1)
+            - self.group_restriction_cost[ab].sum(axis=-1)
+        )
+
+    def move(self, i, b):
+        """Move the person at position ``i`` to the group with code ``b``.
+
+        The sizes of the groups are not checked against their ranges.
+
+        Parameters
+        ----------
+        i : int
+            Position of a person.
+        b : int
+            Code of a group other than the group of ``i``.
+
+        """
+        ab, (size, *sums), diversity, restriction = self._moved(i, b)
+
+        self.size[ab] = size
+        self.bool_sum[ab], self.num_sum[ab], self.num_sumsq[ab], self.min_sum[ab] = sums
+        self.group_diversity_cost[ab] = diversity
+        self.group_restriction_cost[ab] = restriction
+
+        a = ab[0]
+        self._transfer(self.indices[self.indptr[i] : self.indptr[i + 1]], a, b)
+        self.codes[i] = b
+
+        # The last member of a takes the slot of i, and i the first free slot of b.
+        last = self.start[a] + int(size[0])
+        self.order[self.slot[i]] = self.order[last]
+        self.slot[self.order[last]] = self.slot[i]
+        self.order[last] = -1
+        self.slot[i] = self.start[b] + int(size[1]) - 1
+        self.order[self.slot[i]] = i
+        self.version += 1
+
+    def take(self, positions):
+        """Extract the engine of a subset of people.
+
+        The subset engine has the same cost targets (the diversity of the whole
+        cohort), and only the members of the constraints within the subset are
+        counted. Its ``groups`` are the cohort codes of the groups of the subset.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            The positions of the people in the subset.
+
+        Returns
+        -------
+        Engine
+            The engine of the subset.
+
+        """
+        engine = copy.copy(self)
+
+        groups, engine.codes = np.unique(self.codes[positions], return_inverse=True)
+        engine.groups, engine.names = self.groups[groups], self.names[groups]
+        engine.min_size, engine.max_size = self.min_size[groups], self.max_size[groups]
+
+        engine.bool_values = self.bool_values[positions]
+        engine.num_values = self.num_values[positions]
+        engine.num_squares = self.num_squares[positions]
+        engine.min_values = self.min_values[positions]
+
+        _, engine.indices = self._constraints(positions)
+        size = self.indptr[positions + 1] - self.indptr[positions]
+        engine.indptr = np.concatenate([[0], np.cumsum(size)])
+        if self.affinity is not None:
+            engine.affinity = self.affinity[positions][:, positions].tocsr()
+
+        engine.refresh()
+        return engine
+
+    def write(self, cohort):
+        """Write the assignment back to the ``codes`` of the cohort.
+
+        Parameters
+        ----------
+        cohort : Cohort
+            The cohort the engine was compiled from.
+
+        """
+        cohort.codes = self.groups[self.codes]
+
+
+def _rows(indptr, p):
+    """Entries of the rows ``p`` (1D array) of a compressed sparse row format.
+
+    Returns
+    -------
+    np.ndarray
+        For every entry, the index of its row in ``p``.
+    np.ndarray
+        For every entry, its position in the arrays of the format.
+
+    """
+    start = indptr[p]
+    size = indptr[p + 1] - start
+    owner = np.repeat(np.arange(len(p)), size)
+    offset = np.arange(size.sum()) - np.repeat(np.cumsum(size) - size, size)
+    return owner, start[owner] + offset
+
+
+def _symmetric(affinity, n):
+    """Symmetrise an affinity matrix of ``n`` people and drop its diagonal.
+
+    Returns
+    -------
+    scipy.sparse.csr_array
+        The matrix ``affinity + affinity.T`` without the diagonal.
+
+    Raises
+    ------
+    ValueError
+        If the matrix is not ``n`` by ``n``.
+
+    """
+    try:
+        from scipy import sparse  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError("Affinity matrices require scipy.") from e
+
+    if affinity.shape != (n, n):
+        raise ValueError(f"The affinity matrix must be {n} by {n}.")
+
+    pairs = sparse.coo_array(affinity)
+    pairs = (pairs + pairs.T).tocoo()
+    off = pairs.row != pairs.col
+    symmetric = sparse.csr_array(
+        (pairs.data[off].astype(float), (pairs.row[off], pairs.col[off])),
+        shape=(n, n),
+    )
+    symmetric.sum_duplicates()
+    symmetric.eliminate_zeros()
+    return symmetric
+
+
+def _index(index, constraints):
+    """Index the constraints of each person in compressed sparse row format.
+
+    Parameters
+    ----------
+    index : pd.Index
+        The index of the cohort data.
+    constraints : list of list of str
+        The index labels of the people in each constraint. Labels which are not in
+        ``index`` are ignored, as are repeated labels.
+
+    Returns
+    -------
+    np.ndarray
+        Index pointer of length ``len(index) + 1``.
+    np.ndarray
+        The constraints of all people, ordered by position.
+
+    """
+    positions = [np.unique(index.get_indexer(pd.Index(i))) for i in constraints]
+    person = np.concatenate([p[p >= 0] for p in positions] + [np.zeros(0, dtype=int)])
+    constraint = np.repeat(
+        np.arange(len(constraints)), [np.count_nonzero(p >= 0) for p in positions]
+    )
+
+    order = np.argsort(person, kind="stable")
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(person, minlength=len(index)))])
+    return indptr, constraint[order]
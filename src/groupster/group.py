@@ -1,4 +1,4 @@
-from .util import diversity, diversity_cost, restriction_cost
+from .util import diversity, diversity_cost, diversity_values, restriction_cost
 
 
 class Group:
@@ -7,6 +7,12 @@ class Group:
     This class is used to represent a group of individuals in a cohort. It contains
     methods to compute the diversity of the group and costs of the group.
 
+    A group extracted from a cohort (``cohort[name]``) is a view of the positions of
+    its members in the cohort: ``data`` is only built when it is accessed, and the
+    diversity and the default diversity cost are computed from the columns of the
+    cohort and cached until the assignment of the cohort changes (see
+    ``Cohort.version``).
+
     Parameters
     ----------
     data : pd.DataFrame
@@ -19,17 +25,88 @@ class Group:
     """
 
     def __init__(self, data, bools=None, nums=None):
+        self._cohort = None
         self.data = data
         self.bools = bools
         self.nums = nums
 
+    @classmethod
+    def _view(cls, cohort, code):
+        """Create a view of the group with code ``code`` of ``cohort``."""
+        group = cls.__new__(cls)
+        group._cohort, group._code = cohort, code
+        group._cache = {}
+        group._version = None
+        group.bools = cohort.bools
+        group.nums = cohort.nums
+        return group
+
+    @property
+    def data(self):
+        """The group data.
+
+        For a view of a cohort, it is built from the cohort data when it is accessed
+        after a change of the assignment. Assigning data detaches the group from the
+        cohort.
+
+        """
+        if self._cohort is None:
+            return self._data
+        return self._cached("data", self._build_data)
+
+    @data.setter
+    def data(self, data):
+        self._cohort = None
+        self._data = data
+
+    @property
+    def positions(self):
+        """The positions of the members in the cohort data, for a view of a cohort."""
+        if self._cohort is None:
+            raise AttributeError("The group is not a view of a cohort.")
+        return self._cached("positions", self._build_positions)
+
+    @property
+    def _columns(self):
+        """The ``bools`` and ``nums`` columns, as part of the keys of the cache."""
+        return tuple(self.bools or []), tuple(self.nums or [])
+
+    def _cached(self, key, build):
+        """Return the cached ``key``, built again after the assignment changed."""
+        if self._version != self._cohort.version:
+            self._cache.clear()
+            self._version = self._cohort.version
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def _build_positions(self):
+        """Get the positions of the members, in ascending order."""
+        return self._cohort.members(self._cohort.names[self._code])
+
+    def _build_data(self):
+        """Build the data of the members, with the ``group`` column."""
+        return self._cohort._data.iloc[self.positions].assign(
+            group=self._cohort.names[self._code]
+        )
+
+    def _build_diversity(self):
+        """Compute the diversity of the members from the columns of the cohort."""
+        bools, nums = list(self.bools or []), list(self.nums or [])
+        values = self._cohort._values(bools, nums)[self.positions]
+        return diversity_values(values, bools, nums)
+
     @property
     def diversity(self):
         """Compute the diversity of the group.
 
+        For a view of a cohort, the diversity is cached until the assignment changes.
+
         For more details, see the `util.diversity` function.
         """
-        return diversity(data=self.data, bools=self.bools, nums=self.nums)
+        if self._cohort is None:
+            return diversity(data=self.data, bools=self.bools, nums=self.nums)
+        return self._cached(("diversity", *self._columns), self._build_diversity)
 
     def diversity_cost(self, cohort_diversity, cost_fn=None):
         """Compute the diversity cost of the group.
@@ -38,7 +115,8 @@ class Group:
         diversity. The cost is computed using the ``cost_fn`` function.
 
         The default cost function is `util.diversity_cost`. For details on the default
-        cost function, see the `util.diversity_cost` function.
+        cost function, see the `util.diversity_cost` function. For a view of a cohort,
+        the default cost is cached until the assignment changes.
 
         Parameters
         ----------
@@ -53,6 +131,14 @@ class Group:
             The diversity cost of the group.
 
         """
+        if cost_fn is None and self._cohort is not None:
+            key = ("diversity_cost", *self._columns)
+            target, cost = self._cached(key, lambda: (None, None))
+            if target is not cohort_diversity:
+                cost = diversity_cost(cohort_diversity, self.diversity)
+                self._cache[key] = cohort_diversity, cost
+            return cost
+
         if cost_fn is None:
             cost_fn = diversity_cost
 
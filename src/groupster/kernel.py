@@ -0,0 +1,293 @@
+"""Compiled swap loop for the default cost functions.
+
+The functions in this module are written in the subset of Python supported by
+``numba``. If ``numba`` is installed, they are compiled when this module is imported
+and ``available`` is ``True``. Otherwise, they remain plain Python functions operating
+on the arrays of an ``Engine``, which are correct but slow, and ``Solver`` uses the
+NumPy engine instead.
+
+"""
+
+import math
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+available = numba is not None
+
+
+def _diversity_cost(size, bool_sum, num_sum, num_sumsq, bool_target, num_mean, num_std):
+    """Compute the diversity cost of a group from its aggregates."""
+    cost = 0.0
+    for f in range(bool_sum.size):
+        cost += abs(bool_sum[f] / size - bool_target[f])
+    for f in range(num_sum.size):
+        mean = num_sum[f] / size
+        # Sample (ddof=1) standard deviation, as computed by pandas.
+        std = math.sqrt(max((num_sumsq[f] - num_sum[f] * mean) / (size - 1), 0.0))
+        cost += abs(mean) / num_mean[f] + abs(std - num_std[f]) / num_mean[f]
+    return cost
+
+
+def _bool_min_cost(min_sum, min_target):
+    """Compute the ``bool_min`` part of the restriction cost of a group."""
+    cost = 0.0
+    for m in range(min_sum.size):
+        if min_sum[m] < min_target[m]:
+            cost += 10.0
+    return cost
+
+
+def _contains(array, value):
+    """Check whether ``value`` is in the (short) 1D ``array``."""
+    for element in array:
+        if element == value:
+            return True
+    return False
+
+
+def _count(g, c, cptr, cgroups, ccounts):
+    """Count the members of the constraint ``c`` in the group ``g``."""
+    for k in range(cptr[c], cptr[c + 1]):
+        if cgroups[k] == g:
+            return ccounts[k]
+    return 0
+
+
+def _transfer(c, a, b, cptr, cgroups, ccounts, spread):
+    """Count one member of the constraint ``c`` in group ``b`` instead of ``a``."""
+    found = False
+    free = -1
+    for k in range(cptr[c], cptr[c + 1]):
+        if cgroups[k] == a:
+            ccounts[k] -= 1
+            if ccounts[k] == 0:
+                cgroups[k] = -1
+                spread[c] -= 1
+        elif cgroups[k] == b:
+            ccounts[k] += 1
+            found = True
+        if cgroups[k] < 0 and free < 0:
+            free = k
+    if not found:
+        cgroups[free] = b
+        ccounts[free] = 1
+        spread[c] += 1
+
+
+def _constraint_delta(i, j, a, b, indptr, indices, weights, cptr, cgroups, ccounts):
+    """Compute the change of the constraint costs of groups ``a`` and ``b``.
+
+    The constraints shared by ``i`` and ``j`` do not change.
+
+    """
+    constraints_i = indices[indptr[i] : indptr[i + 1]]
+    constraints_j = indices[indptr[j] : indptr[j + 1]]
+
+    delta_a = 0.0
+    delta_b = 0.0
+    for c in constraints_i:
+        if not _contains(constraints_j, c):
+            # One member less in a and one more in b.
+            delta_a += weights[c] * (1 - 2 * _count(a, c, cptr, cgroups, ccounts))
+            delta_b += weights[c] * (1 + 2 * _count(b, c, cptr, cgroups, ccounts))
+    for c in constraints_j:
+        if not _contains(constraints_i, c):
+            # One member more in a and one less in b.
+            delta_a += weights[c] * (1 + 2 * _count(a, c, cptr, cgroups, ccounts))
+            delta_b += weights[c] * (1 - 2 * _count(b, c, cptr, cgroups, ccounts))
+
+    return delta_a, delta_b
+
+
+def run(
+    features,
+    state,
+    best_codes,
+    costs,
+    start,
+    n,
+    total,
+    t_start,
+    t_end,
+    linear,
+    seed,
+):
+    """Perform ``n`` steps of greedy or simulated annealing swaps.
+
+    Parameters
+    ----------
+    features : tuple
+        The constant arrays of the engine: ``bool_values``, ``bool_target``,
+        ``num_values``, ``num_squares``, ``num_mean``, ``num_std``, ``min_values``,
+        ``min_target``, ``indptr``, ``indices``, ``weights``, and ``cptr``.
+    state : tuple
+        The arrays of the engine modified by the swaps: ``codes``, ``size``,
+        ``bool_sum``, ``num_sum``, ``num_sumsq``, ``min_sum``, ``cgroups``,
+        ``ccounts``, ``spread``, ``group_diversity_cost``, and
+        ``group_restriction_cost``.
+    best_codes : np.ndarray
+        The assignment is copied to this array before a swap leaves the best
+        assignment found so far.
+    costs : np.ndarray
+        The current and the best cost, updated in place.
+    start : int
+        The number of steps performed before, used by the temperature schedule.
+    n : int
+        The number of steps to perform.
+    total : int
+        The total number of steps of the run, used by the temperature schedule.
+    t_start, t_end : float
+        The temperatures at the first and the last step of the run. If ``t_start`` is
+        0, only swaps decreasing the cost are accepted.
+    linear : bool
+        Whether the temperature decreases linearly (otherwise exponentially).
+    seed : int
+        The seed of the random number generator.
+
+    Returns
+    -------
+    int
+        The number of accepted swaps.
+
+    """
+    (
+        bool_values,
+        bool_target,
+        num_values,
+        num_squares,
+        num_mean,
+        num_std,
+        min_values,
+        min_target,
+        indptr,
+        indices,
+        weights,
+        cptr,
+    ) = features
+    (
+        codes,
+        size,
+        bool_sum,
+        num_sum,
+        num_sumsq,
+        min_sum,
+        cgroups,
+        ccounts,
+        spread,
+        group_diversity_cost,
+        group_restriction_cost,
+    ) = state
+
+    np.random.seed(seed)
+
+    # Aggregates of the two groups after a swap.
+    bool_a, bool_b = np.empty(bool_sum.shape[1]), np.empty(bool_sum.shape[1])
+    num_a, num_b = np.empty(num_sum.shape[1]), np.empty(num_sum.shape[1])
+    sq_a, sq_b = np.empty(num_sum.shape[1]), np.empty(num_sum.shape[1])
+    min_a, min_b = np.empty(min_sum.shape[1]), np.empty(min_sum.shape[1])
+
+    cost, best_cost = costs[0], costs[1]
+    accepted = 0
+    for step in range(start, start + n):
+        # Select two people at random from different groups.
+        i = np.random.randint(0, codes.size)
+        j = np.random.randint(0, codes.size)
+        while codes[i] == codes[j]:
+            i = np.random.randint(0, codes.size)
+            j = np.random.randint(0, codes.size)
+        a, b = codes[i], codes[j]
+
+        bool_a[:] = bool_sum[a] - bool_values[i] + bool_values[j]
+        bool_b[:] = bool_sum[b] + bool_values[i] - bool_values[j]
+        num_a[:] = num_sum[a] - num_values[i] + num_values[j]
+        num_b[:] = num_sum[b] + num_values[i] - num_values[j]
+        sq_a[:] = num_sumsq[a] - num_squares[i] + num_squares[j]
+        sq_b[:] = num_sumsq[b] + num_squares[i] - num_squares[j]
+        min_a[:] = min_sum[a] - min_values[i] + min_values[j]
+        min_b[:] = min_sum[b] + min_values[i] - min_values[j]
+
+        diversity_a = _diversity_cost(
+            size[a], bool_a, num_a, sq_a, bool_target, num_mean, num_std
+        )
+        diversity_b = _diversity_cost(
+            size[b], bool_b, num_b, sq_b, bool_target, num_mean, num_std
+        )
+        constraint_a, constraint_b = _constraint_delta(
+            i, j, a, b, indptr, indices, weights, cptr, cgroups, ccounts
+        )
+        restriction_a = (
+            group_restriction_cost[a]
+            + constraint_a
+            + _bool_min_cost(min_a, min_target)
+            - _bool_min_cost(min_sum[a], min_target)
+        )
+        restriction_b = (
+            group_restriction_cost[b]
+            + constraint_b
+            + _bool_min_cost(min_b, min_target)
+            - _bool_min_cost(min_sum[b], min_target)
+        )
+
+        delta = (
+            diversity_a
+            + diversity_b
+            + restriction_a
+            + restriction_b
+            - group_diversity_cost[a]
+            - group_diversity_cost[b]
+            - group_restriction_cost[a]
+            - group_restriction_cost[b]
+        )
+
+        if delta < 0:
+            accept = True
+        elif t_start > 0:
+            fraction = step / max(total - 1, 1)
+            if linear:
+                temperature = t_start + (t_end - t_start) * fraction
+            else:
+                temperature = t_start * (t_end / t_start) ** fraction
+            accept = temperature > 0 and np.random.random() < math.exp(
+                -delta / temperature
+            )
+        else:
+            accept = False
+
+        if accept:
+            if delta >= 0 and cost == best_cost:
+                best_codes[:] = codes
+
+            bool_sum[a], bool_sum[b] = bool_a, bool_b
+            num_sum[a], num_sum[b] = num_a, num_b
+            num_sumsq[a], num_sumsq[b] = sq_a, sq_b
+            min_sum[a], min_sum[b] = min_a, min_b
+            for c in indices[indptr[i] : indptr[i + 1]]:
+                _transfer(c, a, b, cptr, cgroups, ccounts, spread)
+            for c in indices[indptr[j] : indptr[j + 1]]:
+                _transfer(c, b, a, cptr, cgroups, ccounts, spread)
+            group_diversity_cost[a], group_diversity_cost[b] = diversity_a, diversity_b
+            group_restriction_cost[a] = restriction_a
+            group_restriction_cost[b] = restriction_b
+            codes[i], codes[j] = b, a
+
+            cost += delta
+            best_cost = min(best_cost, cost)
+            accepted += 1
+
+    costs[0], costs[1] = cost, best_cost
+    return accepted
+
+
+if available:
+    _diversity_cost = numba.njit(cache=True, error_model="numpy")(_diversity_cost)
+    _bool_min_cost = numba.njit(cache=True)(_bool_min_cost)
+    _contains = numba.njit(cache=True)(_contains)
+    _count = numba.njit(cache=True)(_count)
+    _transfer = numba.njit(cache=True)(_transfer)
+    _constraint_delta = numba.njit(cache=True)(_constraint_delta)
+    run = numba.njit(cache=True, error_model="numpy")(run)
@@ -0,0 +1,225 @@
+"""Mixed-integer programming formulation of the cost of a cohort.
+
+The assignment of the people of a compiled cohort to groups of fixed sizes is
+formulated as a mixed-integer linear program and solved by HiGHS through
+``scipy.optimize.milp``. The absolute deviations of the diversity cost are linearised
+with auxiliary variables. The standard deviation of a numerical column is nonlinear
+in the assignment, so it is replaced by the deviation of the second moment about the
+cohort mean, scaled to first order around the cohort standard deviation. The
+restrictions are formulated exactly: ``keep_separate`` counts squared by tangent cuts,
+``keep_together`` counts squared by pairs of members in the same group, and
+``bool_min`` by an indicator per group.
+
+"""
+
+import numpy as np
+
+
+class _Program:
+    """Sparse constraints and objective of a mixed-integer program under assembly."""
+
+    def __init__(self):
+        self.n_vars = self.n_rows = 0
+        # Constant term of the objective.
+        self.offset = 0.0
+        # Objective and bounds of the variables.
+        self.cost, self.integrality, self.upper = [], [], []
+        # Sparse coefficients and bounds of the rows.
+        self.rows, self.cols, self.vals = [], [], []
+        self.row_lower, self.row_upper = [], []
+
+    def variables(self, shape, cost=0.0, integer=False, upper=np.inf):
+        """Add variables of ``shape`` and return their indices."""
+        size = int(np.prod(shape))
+        index = self.n_vars + np.arange(size).reshape(shape)
+        self.n_vars += size
+        self.cost.append(np.broadcast_to(cost, size).astype(float))
+        self.integrality.append(np.full(size, int(integer)))
+        self.upper.append(np.full(size, upper, dtype=float))
+        return index
+
+    def constrain(self, cols, vals, lower=-np.inf, upper=np.inf):
+        """Add rows ``lower <= sum(vals * x[cols]) <= upper``.
+
+        ``cols`` and ``vals`` have the rows in the first dimension and the terms of
+        each row in the last dimension.
+
+        """
+        cols, vals = np.broadcast_arrays(cols, vals)
+        cols = cols.reshape(-1, cols.shape[-1])
+        vals = vals.reshape(-1, cols.shape[-1])
+        rows = self.n_rows + np.arange(len(cols))
+        self.n_rows += len(cols)
+
+        self.rows.append(np.repeat(rows, cols.shape[1]))
+        self.cols.append(cols.ravel())
+        self.vals.append(vals.ravel().astype(float))
+        self.row_lower.append(np.broadcast_to(np.ravel(lower), len(cols)).astype(float))
+        self.row_upper.append(np.broadcast_to(np.ravel(upper), len(cols)).astype(float))
+
+    def solve(self, time_limit, gap):
+        """Solve the program with HiGHS."""
+        from scipy.optimize import Bounds, LinearConstraint, milp  # noqa: PLC0415
+        from scipy.sparse import coo_array  # noqa: PLC0415
+
+        matrix = coo_array(
+            (
+                np.concatenate(self.vals),
+                (np.concatenate(self.rows), np.concatenate(self.cols)),
+            ),
+            shape=(self.n_rows, self.n_vars),
+        ).tocsr()
+
+        return milp(
+            np.concatenate(self.cost),
+            integrality=np.concatenate(self.integrality),
+            bounds=Bounds(0, np.concatenate(self.upper)),
+            constraints=LinearConstraint(
+                matrix, np.concatenate(self.row_lower), np.concatenate(self.row_upper)
+            ),
+            options={"time_limit": time_limit, "mip_rel_gap": gap, "disp": False},
+        )
+
+
+def solve(engine, time_limit=60.0, gap=1e-4):
+    """Find an assignment of a compiled cohort by mixed-integer programming.
+
+    This function requires ``scipy``.
+
+    Parameters
+    ----------
+    engine : Engine
+        The compiled cohort. The sizes of its groups are kept.
+    time_limit : float, optional
+        The time limit of the solver in seconds. The default is 60.
+    gap : float, optional
+        The relative gap between the objective and its bound at which the solver
+        stops. The default is 1e-4.
+
+    Returns
+    -------
+    np.ndarray or None
+        The group code of each person, or ``None`` if no assignment was found
+        within the time limit.
+    scipy.optimize.OptimizeResult
+        The result of ``scipy.optimize.milp``. Its objective ``fun`` and its lower
+        bound ``mip_dual_bound`` are the linearised cost.
+
+    """
+    try:
+        import scipy.optimize  # noqa: F401, PLC0415
+    except ImportError as e:
+        raise ImportError("Mixed-integer programming requires scipy.") from e
+
+    program = _Program()
+
+    # x[p, g] is 1 if the person at position p is in group g.
+    x = program.variables((len(engine.codes), engine.n_groups), integer=True, upper=1)
+    program.constrain(x, 1, lower=1, upper=1)
+    program.constrain(x.T, 1, lower=engine.size, upper=engine.size)
+
+    # Diversity. The numerical values of the engine are centred on the cohort mean.
+    num_std = np.where(engine.num_std > 0, engine.num_std, 1)
+    second_moment = engine.num_std**2 * (len(engine.codes) - 1) / len(engine.codes)
+    _deviation(program, x, engine.size, engine.bool_values, engine.bool_target, 1.0)
+    _deviation(program, x, engine.size, engine.num_values, 0.0, engine.num_mean)
+    _deviation(
+        program,
+        x,
+        engine.size,
+        engine.num_squares,
+        second_moment,
+        2 * num_std * engine.num_mean,
+    )
+
+    _constraints(program, x, engine)
+    _bool_min(program, x, engine)
+
+    result = program.solve(time_limit, gap)
+    for key in ("fun", "mip_dual_bound"):
+        if result.get(key) is not None:
+            result[key] += program.offset
+    if result.x is None:
+        return None, result
+
+    return result.x[x].argmax(axis=1), result
+
+
+def _deviation(program, x, size, values, target, scale):  # noqa: PLR0913, PLR0917
+    """Add ``|sum(values * x[:, g]) / size[g] - target| / scale`` to the objective."""
+    if not values.shape[1]:
+        return
+
+    shape = (len(size), values.shape[1])
+    d = program.variables(shape, cost=np.broadcast_to(1 / scale, shape).ravel())
+    # Terms of the rows of every (group, feature) pair: d and the x of the group.
+    cols = np.concatenate(
+        [
+            d[..., np.newaxis],
+            np.broadcast_to(x.T[:, np.newaxis, :], (*shape, len(values))),
+        ],
+        axis=-1,
+    )
+    vals = values.T / size[:, np.newaxis, np.newaxis]
+    ones = np.ones((*shape, 1))
+    target = np.broadcast_to(target, shape)
+
+    program.constrain(cols, np.concatenate([ones, -vals], axis=-1), lower=-target)
+    program.constrain(cols, np.concatenate([ones, vals], axis=-1), lower=target)
+
+
+def _constraints(program, x, engine):
+    """Add the ``keep_together`` and ``keep_separate`` costs to the objective."""
+    order = np.argsort(engine.indices, kind="stable")
+    owner = np.repeat(np.arange(len(engine.codes)), np.diff(engine.indptr))[order]
+    members = np.split(
+        owner, np.cumsum(np.bincount(engine.indices, minlength=engine.n_constraints))
+    )[:-1]
+
+    for weight, people in zip(engine.weights, members, strict=True):
+        m = len(people)
+        if m < 2:
+            # A single member is always alone in its group: count**2 = m.
+            program.offset += weight * m
+            continue
+
+        if weight > 0:
+            # z[g] >= count**2, by the tangents of k**2 at k = 0, ..., m - 1.
+            z = program.variables(engine.n_groups, cost=weight)
+            j = np.arange(m)[:, np.newaxis]
+            for g in range(engine.n_groups):
+                program.constrain(
+                    np.hstack([np.full((m, 1), z[g]), np.tile(x[people, g], (m, 1))]),
+                    np.hstack([np.ones((m, 1)), -np.repeat(2 * j + 1, m, axis=1)]),
+                    lower=-j[:, 0] * (j[:, 0] + 1),
+                )
+        else:
+            # count**2 = m + 2 * (pairs of members in the same group).
+            program.offset += weight * m
+            p, q = np.triu_indices(m, k=1)
+            w = program.variables((len(p), engine.n_groups), cost=2 * weight, upper=1)
+            for first in (people[p], people[q]):
+                program.constrain(np.stack([w, x[first]], axis=-1), [1, -1], upper=0)
+
+
+def _bool_min(program, x, engine):
+    """Add the ``bool_min`` costs to the objective."""
+    if not engine.min_values.shape[1]:
+        return
+
+    # u[g, k] is 1 if group g has fewer than min_target[k] people with bool k.
+    shape = (engine.n_groups, engine.min_values.shape[1])
+    u = program.variables(shape, cost=10, integer=True, upper=1)
+    target = np.broadcast_to(engine.min_target, shape)
+    terms = np.broadcast_to(x.T[:, np.newaxis, :], (*shape, len(engine.codes)))
+    program.constrain(
+        np.concatenate([u[..., np.newaxis], terms], axis=-1),
+        np.concatenate(
+            [
+                target[..., np.newaxis],
+                np.broadcast_to(engine.min_values.T, terms.shape),
+            ],
+            axis=-1,
+        ),
+        lower=target,
+    )
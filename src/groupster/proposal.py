@@ -0,0 +1,299 @@
+import numpy as np
+import pandas as pd
+
+#: Kinds of proposals.
+KINDS = ("uniform", "cost", "attribute", "together", "move")
+
+#: Relative frequencies of the kinds of proposals of ``Proposals('targeted')``.
+TARGETED = {
+    "uniform": 0.3,
+    "cost": 0.3,
+    "attribute": 0.2,
+    "together": 0.1,
+    "move": 0.1,
+}
+
+
+class Proposals:
+    """Proposal of candidate swaps and moves on a compiled cohort.
+
+    Every candidate swap is a pair of people from different groups, drawn by one of
+    the following kinds of proposals:
+
+    - ``'uniform'``: the first person is drawn uniformly and the second person
+      uniformly from the other groups.
+    - ``'cost'``: the first person is drawn from a group chosen with probability
+      proportional to its cost above the lowest group cost, and the second person
+      uniformly from the other groups.
+    - ``'attribute'``: a group is chosen as for ``'cost'``. Among ``sample`` of its
+      members, the one whose characteristics move the group furthest from the
+      diversity of the cohort is swapped with the one among ``sample`` people from
+      other groups who moves it back the most.
+    - ``'together'``: a member of a split ``keep_together`` constraint is swapped with
+      a random member of the group containing most of the constraint.
+    - ``'move'``: a random member of a group above its minimum size moves to a random
+      group below its maximum size. The second element of the pair is the code of
+      the group. If no group size can change, uniform swaps are proposed instead.
+
+    The numbers of proposed and accepted swaps of each kind are counted, and
+    available as ``stats``.
+
+    Parameters
+    ----------
+    weights : dict, optional
+        The relative frequencies of the kinds of proposals. The default is
+        ``{'uniform': 1}``.
+    sample : int, optional
+        The number of people examined by ``'attribute'`` proposals. The default is 8.
+
+    """
+
+    def __init__(self, weights=None, sample=8):
+        weights = {"uniform": 1.0} if weights is None else dict(weights)
+        if unknown := set(weights) - set(KINDS):
+            raise ValueError(f"Unknown proposal kinds {sorted(unknown)}.")
+
+        self.weights = weights
+        self.sample = sample
+
+    @property
+    def targeted(self):
+        """Whether proposals other than ``'uniform'`` are used."""
+        return any(
+            weight > 0 for kind, weight in self.weights.items() if kind != "uniform"
+        )
+
+    def reset(self, size, engine=None):
+        """Prepare the proposals for a new run.
+
+        Parameters
+        ----------
+        size : np.ndarray
+            The number of people in each group.
+        engine : Engine, optional
+            The compiled cohort. It is required by the targeted proposals.
+
+        """
+        self.reset_sizes(size)
+
+        # The engine and its version for which the cumulative excess costs of the
+        # groups were computed.
+        self._excess = (None, -1, None)
+
+        self.proposed = np.zeros(len(KINDS), dtype=int)
+        self.accepted = np.zeros(len(KINDS), dtype=int)
+
+        kinds = [KINDS.index(kind) for kind in self.weights]
+        weights = np.array(list(self.weights.values()), dtype=float)
+        self._kinds, self._p = np.array(kinds), weights / weights.sum()
+
+        if engine is not None and self.targeted:
+            self._features = np.hstack(
+                [engine.bool_values, engine.num_values / engine.num_mean]
+            )
+
+            # The members of each constraint, aligned with the slots of the engine.
+            owner = np.repeat(np.arange(len(engine.codes)), np.diff(engine.indptr))
+            self._people = owner[np.argsort(engine.indices, kind="stable")]
+
+    def reset_sizes(self, size):
+        """Update the number of people in each group, used by ``other``."""
+        self.size = np.asarray(size, dtype=np.intp)
+        self.end = np.cumsum(self.size)
+        self.start = self.end - self.size
+
+    def count(self, kind):
+        """Count proposed swaps of the kinds ``kind`` (indices in ``KINDS``)."""
+        self.proposed += np.bincount(kind, minlength=len(KINDS))
+
+    def record(self, kind, accepted):
+        """Count a swap of ``kind`` (index in ``KINDS``) as accepted or rejected."""
+        self.accepted[kind] += accepted
+
+    @property
+    def stats(self):
+        """Numbers of proposed and accepted swaps and the acceptance rate by kind."""
+        stats = pd.DataFrame(
+            {"proposed": self.proposed, "accepted": self.accepted},
+            index=pd.Index(KINDS, name="kind"),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return stats.assign(acceptance_rate=stats.accepted / stats.proposed)
+
+    def other(self, a, rng):
+        """Draw groups with probability proportional to their sizes, except ``a``.
+
+        Parameters
+        ----------
+        a : np.ndarray
+            The excluded group of each draw.
+        rng : np.random.Generator
+            The random number generator.
+
+        Returns
+        -------
+        np.ndarray
+            The groups.
+
+        """
+        # A uniform place among the people outside a, skipping the places of a.
+        place = rng.integers(self.end[-1] - self.size[a])
+        place += self.size[a] * (place >= self.start[a])
+        return np.searchsorted(self.end, place, side="right")
+
+    def _member(self, engine, groups, rng):
+        """Draw a random member of each of ``groups``."""
+        size = engine.size[groups].astype(np.intp)
+        return engine.order[engine.start[groups] + rng.integers(size)]
+
+    def _costly(self, engine, k, rng):
+        """Draw ``k`` groups with probability proportional to their excess cost."""
+        cached, version, excess = self._excess
+        if cached is not engine or version != engine.version:
+            cost = engine.group_diversity_cost + engine.group_restriction_cost
+            excess = np.cumsum(cost - cost.min())
+            self._excess = (engine, engine.version, excess)
+        if excess[-1] <= 0:
+            return rng.integers(len(excess), size=k)
+        return np.searchsorted(excess, rng.random(k) * excess[-1], side="right")
+
+    def propose(self, engine, k, rng):
+        """Propose ``k`` candidate swaps on a compiled cohort.
+
+        Parameters
+        ----------
+        engine : Engine
+            The compiled cohort.
+        k : int
+            The number of candidate swaps.
+        rng : np.random.Generator
+            The random number generator.
+
+        Returns
+        -------
+        np.ndarray
+            Positions of the first person of each pair.
+        np.ndarray
+            Positions of the second person of each pair, or codes of the groups of
+            ``'move'`` proposals.
+        np.ndarray
+            The kind of each pair (index in ``KINDS``).
+
+        """
+        if len(self._kinds) == 1:
+            kind = np.full(k, self._kinds[0])
+        else:
+            kind = self._kinds[rng.choice(len(self._kinds), size=k, p=self._p)]
+        i, j = np.empty(k, dtype=np.intp), np.empty(k, dtype=np.intp)
+
+        if self.weights.get("move", 0) > 0:
+            # Moves change the sizes of the groups, which are used by ``other``.
+            self.reset_sizes(engine.size)
+            if (
+                not (engine.size > engine.min_size).any()
+                or not (engine.size < engine.max_size).any()
+            ):
+                kind[kind == KINDS.index("move")] = KINDS.index("uniform")
+
+        for code, propose in enumerate(
+            [self._uniform, self._cost, self._attribute, self._together, self._move]
+        ):
+            selected = kind == code
+            if selected.any():
+                i[selected], j[selected] = propose(engine, selected.sum(), rng)
+
+        return i, j, kind
+
+    def _uniform(self, engine, k, rng):
+        """Propose ``k`` uniform pairs of people from different groups."""
+        i = rng.integers(len(engine.codes), size=k)
+        j = self._member(engine, self.other(engine.codes[i], rng), rng)
+        return i, j
+
+    def _cost(self, engine, k, rng):
+        """Propose ``k`` pairs with the first person in a costly group."""
+        a = self._costly(engine, k, rng)
+        return self._member(engine, a, rng), self._member(
+            engine, self.other(a, rng), rng
+        )
+
+    def _attribute(self, engine, k, rng):
+        """Propose ``k`` pairs moving costly groups towards the cohort diversity."""
+        a = self._costly(engine, k, rng)
+        size = engine.size[a, np.newaxis]
+        deviation = np.hstack(
+            [
+                engine.bool_sum[a] / size - engine.bool_target,
+                engine.num_sum[a] / size / engine.num_mean,
+            ]
+        )
+
+        a = np.repeat(a, self.sample)
+        inside = self._member(engine, a, rng).reshape(k, self.sample)
+        outside = self._member(engine, self.other(a, rng), rng).reshape(k, self.sample)
+
+        def score(people):
+            return np.einsum("ksf,kf->ks", self._features[people], deviation)
+
+        return (
+            inside[np.arange(k), score(inside).argmax(axis=1)],
+            outside[np.arange(k), score(outside).argmin(axis=1)],
+        )
+
+    def _together(self, engine, k, rng):
+        """Propose ``k`` pairs pulling members of split constraints together."""
+        split = np.flatnonzero((engine.weights < 0) & (engine.spread > 1))
+        if not split.size:
+            return self._uniform(engine, k, rng)
+
+        c = split[rng.integers(split.size, size=k)]
+        g = engine.cgroups[_largest(engine.cptr, engine.ccounts, c)]
+        size = engine.cptr[c + 1] - engine.cptr[c]
+        i = self._people[engine.cptr[c] + rng.integers(size)]
+        return i, self._member(engine, g, rng)
+
+    def _move(self, engine, k, rng):
+        """Propose ``k`` moves of people to groups with free places."""
+        donors = np.flatnonzero(engine.size > engine.min_size)
+        targets = np.flatnonzero(engine.size < engine.max_size)
+        i = self._member(engine, donors[rng.integers(donors.size, size=k)], rng)
+        return i, targets[rng.integers(targets.size, size=k)]
+
+
+def _largest(cptr, counts, c):
+    """Slots with the largest ``counts`` of the constraints ``c`` (1D array)."""
+    size = cptr[c + 1] - cptr[c]
+    owner = np.repeat(np.arange(len(c)), size)
+    entry = (
+        cptr[c][owner] + np.arange(size.sum()) - np.repeat(np.cumsum(size) - size, size)
+    )
+    order = np.lexsort((-counts[entry], owner))
+    return entry[order[np.cumsum(size) - size]]
+
+
+def get_proposals(proposals):
+    """Get a proposals object.
+
+    Parameters
+    ----------
+    proposals : str, dict, or Proposals, optional
+        ``'uniform'`` (or ``None``) for uniform proposals, ``'targeted'`` for the
+        mixture ``TARGETED`` of all kinds of proposals, a dictionary of the relative
+        frequencies of the kinds, or a ``Proposals`` object.
+
+    Returns
+    -------
+    Proposals
+        The proposals object.
+
+    """
+    if proposals is None or proposals == "uniform":
+        return Proposals()
+    elif proposals == "targeted":
+        return Proposals(TARGETED)
+    elif isinstance(proposals, dict):
+        return Proposals(proposals)
+    elif isinstance(proposals, str):
+        raise ValueError(f"Unknown proposals {proposals!r}.")
+    else:
+        return proposals
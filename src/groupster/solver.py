@@ -1,9 +1,45 @@
+import concurrent.futures
+import copy
+import functools
+import json
+import multiprocessing
+import os
+import pathlib
+import time
+
+import numpy as np
+import pandas as pd
 from tqdm import tqdm
 
+from . import kernel, mip, util
+from .engine import Engine
+from .proposal import KINDS, get_proposals
+from .stats import SolverStats
+from .strategy import Greedy, SimulatedAnnealing, Tabu, get_strategy
+
+# The kind of the proposals moving a single person.
+_MOVE = KINDS.index("move")
+
+# The number of proposals without a valid pair after which a run stops.
+_ATTEMPTS = 100
+
+# The attributes of the strategies changed during a run, saved by checkpoints.
+_STRATEGY_STATE = ("step", "recent", "history")
+
+#: Events for which hooks can be added to ``Solver``.
+HOOKS = ("on_step", "on_accept", "on_report")
+
 
 class Solver:
     """A solver class to minimise the cost of a cohort.
 
+    When the default cost functions are used, the solver compiles the cohort into an
+    array-backed ``Engine`` and evaluates each swap incrementally. Custom cost
+    functions are evaluated on ``Group`` objects after every swap. The costs of the
+    groups are cached between steps, so only the two groups changed by a swap are
+    evaluated. The numbers of cache hits and misses of the last run are available as
+    ``cache_hits`` and ``cache_misses``.
+
     Parameters
     ----------
     keep_together : list of list of str, optional
@@ -20,36 +56,180 @@ class Solver:
     restriction_cost_fn : callable, optional
         A function to compute the restriction cost of a group. The default is
         `util.restriction_cost`.
+    strategy : str or object, optional
+        The search strategy deciding which swaps are accepted. It can be the name of a
+        strategy (``'greedy'``, ``'annealing'``, ``'tabu'``, or ``'late_acceptance'``)
+        or a strategy object, such as ``SimulatedAnnealing(t_start=0.1)``. The default
+        is ``'greedy'``, which only accepts swaps decreasing the cost.
+    batch : int, optional
+        The number of candidate swaps proposed and evaluated at once in every step.
+        Only used with the default cost functions. The default is 1.
+    batch_mode : str, optional
+        The order in which the candidate swaps of a batch are considered: ``'best'``
+        (default) starts from the lowest cost change and ``'first'`` uses the order
+        in which the swaps were proposed.
+    backend : str, optional
+        How the steps are performed with the default cost functions: ``'numpy'`` uses
+        the array-backed ``Engine`` from Python, ``'numba'`` runs the whole swap loop
+        in a compiled kernel, and ``'auto'`` (default) uses the compiled kernel if
+        ``numba`` is installed and it supports the strategy (greedy or simulated
+        annealing with a named schedule) and ``batch=1``.
+    proposals : str, dict, or Proposals, optional
+        How candidate swaps are proposed with the default cost functions:
+        ``'uniform'`` (default) draws pairs of people from different groups uniformly
+        and ``'targeted'`` mixes uniform pairs with pairs targeting costly groups,
+        characteristics, and split ``keep_together`` constraints. A dictionary of the
+        relative frequencies of the kinds of proposals or a ``Proposals`` object can
+        also be passed. With ranges of group sizes, ``{'move': ...}`` also proposes
+        moves of single people to other groups. The numbers of proposed and accepted
+        swaps by kind are available as ``proposals.stats``.
+    seed : int, np.random.SeedSequence, or np.random.Generator, optional
+        The seed of the random number generator ``rng`` of the solver, from which
+        all random choices of the runs are drawn. With a fixed seed (and a cohort
+        created with a fixed seed), the same calls give the same assignments. The
+        default is a fresh random seed.
+    hooks : dict, optional
+        Functions called during ``solve``, by event (see ``add_hook``).
+    profile : bool, optional
+        Whether to time the sections of the steps in ``stats`` (see ``SolverStats``).
+        The default is False.
+    affinity : scipy.sparse array or matrix, optional
+        Soft pairwise preferences, as a sparse matrix of weights keyed by the
+        positions of people in ``data`` (e.g. a negative weight for every pair of last
+        term's teammates). The restriction cost of a group is decreased by
+        ``affinity[p, q] + affinity[q, p]`` for every pair of its members ``p`` and
+        ``q``. The change of this cost by a swap is evaluated from the rows of the
+        two people only. This requires ``scipy`` (the ``affinity`` extra) and the
+        default cost functions, and the steps are performed in Python.
 
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         keep_together=None,
         keep_separate=None,
         bool_min=None,
         diversity_cost_fn=None,
         restriction_cost_fn=None,
+        *,
+        strategy=None,
+        batch=1,
+        batch_mode="best",
+        backend="auto",
+        proposals=None,
+        seed=None,
+        hooks=None,
+        profile=False,
+        affinity=None,
     ):
+        if batch_mode not in ("best", "first"):
+            raise ValueError(f"Unknown batch mode {batch_mode!r}.")
+        if backend not in ("auto", "numpy", "numba"):
+            raise ValueError(f"Unknown backend {backend!r}.")
+        if backend == "numba" and not kernel.available:
+            raise ImportError("The numba backend requires numba to be installed.")
+
         self.keep_together = keep_together
         self.keep_separate = keep_separate
         self.bool_min = bool_min
+        self.affinity = affinity
 
         self.diversity_cost_fn = diversity_cost_fn
         self.restriction_cost_fn = restriction_cost_fn
+        if affinity is not None:
+            if not self.uses_engine:
+                raise ValueError(
+                    "Affinity matrices require the default cost functions."
+                )
+            try:
+                import scipy.sparse  # noqa: F401, PLC0415
+            except ImportError as e:
+                raise ImportError("Affinity matrices require scipy.") from e
+
+        self.strategy = get_strategy(strategy)
+        self.batch = batch
+        self.batch_mode = batch_mode
+        self.backend = backend
+        self.proposals = get_proposals(proposals)
 
         self._cached_cost = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.rng = np.random.default_rng(seed)
+        # The lower bound is computed by ``_bound`` on first use (see ``lower_bound``).
+        self._lower_bound, self._bound = -np.inf, None
+        # Bound on the people moved away from their groups (see ``repair``).
+        self._budget = None
+
+        self.hooks = {event: [] for event in HOOKS}
+        for event, hook in (hooks or {}).items():
+            for function in hook if isinstance(hook, list | tuple) else [hook]:
+                self.add_hook(event, function)
+        self.stats = SolverStats(profile=profile)
+
+    def add_hook(self, event, hook):
+        """Add a function called during ``solve``.
+
+        The events and the arguments of the functions are:
+
+        - ``'on_step'``: ``hook(solver, step, accepted)`` after every step, with the
+          number of steps performed and the number of swaps accepted in the step.
+        - ``'on_accept'``: ``hook(solver, i, j, delta)`` after every accepted swap of
+          the people at positions ``i`` and ``j`` (``j`` is the group code of a
+          move), with the cost change ``delta``.
+        - ``'on_report'``: ``hook(solver, step)`` every ``report`` steps.
+
+        The ``'on_step'`` and ``'on_accept'`` hooks are not supported by the compiled
+        kernel, so the steps are performed in Python if any is added. Hooks are not
+        copied with the solver, so they are not called by the chains of
+        ``solve_parallel`` and ``solve_multilevel``.
+
+        Parameters
+        ----------
+        event : str
+            The event, one of ``HOOKS``.
+        hook : callable
+            The function.
+
+        """
+        if event not in HOOKS:
+            raise ValueError(f"Unknown event {event!r}.")
+        self.hooks[event].append(hook)
+
+    def __getstate__(self):
+        """Copy the solver without its hooks, which may not be picklable."""
+        state = self.__dict__.copy()
+        state["hooks"] = {event: [] for event in HOOKS}
+        return state
+
+    def _call(self, event, *args):
+        """Call the hooks of ``event`` with the solver and ``args``."""
+        for hook in self.hooks[event]:
+            hook(self, *args)
+
+    @property
+    def uses_engine(self):
+        """Whether the costs can be evaluated by the array-backed ``Engine``.
+
+        This is the case when neither ``diversity_cost_fn`` nor ``restriction_cost_fn``
+        is specified.
 
-    def _cost(self, group, cohort, use_cache=False):
+        """
+        return self.diversity_cost_fn is None and self.restriction_cost_fn is None
+
+    def _cost(self, name, cohort, use_cache=False):
         """Compute the cost of a group.
 
         The cost is computed as the sum of the diversity cost and the restriction cost.
-        The cost is cached to avoid recomputing it.
+        With ``use_cache=True``, the cost is looked up in the per-group cache and only
+        computed (and cached) on a miss. The cache is kept up to date by ``_step`` when
+        a swap is accepted and the hits and misses are counted in ``cache_hits`` and
+        ``cache_misses``.
 
         Parameters
         ----------
-        group : Group
-            The group to compute the cost for.
+        name : str
+            The name of the group to compute the cost for.
         cohort : Cohort
             The cohort used to compute the diversity cost.
         use_cache : bool, optional
@@ -60,34 +240,83 @@ class Solver:
         float
             The cost of the group.
         """
-        group_name = group.data.group.iloc[0]
+        if use_cache:
+            if name in self._cached_cost:
+                self.cache_hits += 1
+                return self._cached_cost[name]
+
+            self.cache_misses += 1
 
-        if not use_cache:
+        with self.stats.time("diversity"):
+            group = cohort[name]
             cost = group.diversity_cost(
                 cohort_diversity=cohort.diversity, cost_fn=self.diversity_cost_fn
-            ) + group.restriction_cost(
+            )
+        with self.stats.time("restriction"):
+            cost += group.restriction_cost(
                 keep_together=self.keep_together,
                 keep_separate=self.keep_separate,
                 bool_min=self.bool_min,
                 cost_fn=self.restriction_cost_fn,
             )
 
-            self._cached_cost[group_name] = cost
+        if use_cache:
+            self._cached_cost[name] = cost
 
-            return cost
+        return cost
 
-        if group_name not in self._cached_cost:
-            return self._cost(group, cohort, use_cache=False)
+    def _delta(self, cohort, i, j):
+        """Compute the change of the cost if people ``i`` and ``j`` swap groups.
 
-        else:
-            return self._cached_cost[group_name]
+        Returns
+        -------
+        float
+            The cost after the swap minus the cost before the swap.
+        dict
+            The costs of the two groups after the swap.
+
+        """
+        a, b = cohort.names.take(cohort.codes[[i, j]])
+
+        # Cost before the swap. It is known from the previous steps.
+        cost_before = self._cost(a, cohort, use_cache=True) + self._cost(
+            b, cohort, use_cache=True
+        )
+
+        # Cost after the swap. Only these two groups are evaluated.
+        with self.stats.time("mutate"):
+            cohort.swap(i, j)
+        costs_after = {a: self._cost(a, cohort), b: self._cost(b, cohort)}
+        with self.stats.time("mutate"):
+            cohort.revert(i, j)
+
+        return sum(costs_after.values()) - cost_before, costs_after
+
+    def _keep_best(self, delta, snapshot):
+        """Store the current assignment before a swap leaves the best one found.
+
+        ``self._best`` is ``None`` while the current assignment is the best one found
+        so far, so the (expensive) ``snapshot`` is only taken when a swap that does not
+        decrease the cost is accepted at the best assignment.
+
+        """
+        if delta >= 0 and self._best is None:
+            self._best = snapshot()
+
+    def _update_cost(self, delta):
+        """Add the cost change of an accepted swap to the running cost."""
+        self.cost += delta
+        if self.cost < self._best_cost:
+            self._best_cost = self.cost
+            self._best = None
 
     def _step(self, cohort):
         """Perform a single step of the algorithm.
 
-        This method selects two people at random from different groups and swaps their
-        groups. If the cost of the new groups is lower than the cost of the old groups,
-        the swap is accepted. Otherwise, the swap is rejected.
+        This method selects ``strategy.candidates`` pairs of people at random from
+        different groups and evaluates the cost change of swapping their groups. The
+        strategy decides whether the best of the candidate swaps is accepted. Otherwise,
+        the swap is rejected.
 
         Parameters
         ----------
@@ -99,42 +328,429 @@ class Solver:
         bool
             Whether the swap was accepted or not.
         """
-        # Select two people at random from different groups.
-        while True:
-            [(_, a), (_, b)] = cohort.data.sample(n=2, replace=False).iterrows()
-            if a.group != b.group:
-                break
+        codes = cohort.codes
+        candidates = []
+        for _ in range(self.strategy.candidates):
+            # Select two people at random from different groups.
+            with self.stats.time("propose"):
+                while True:
+                    i = self.rng.integers(len(codes))
+                    [b] = self.proposals.other(codes[[i]], self.rng)
+                    members = cohort.members(cohort.names[b])
+                    j = members[self.rng.integers(len(members))]
+                    if self.strategy.allows(i, j):
+                        break
+
+            candidates.append((*self._delta(cohort, i, j), i, j))
+
+        delta, costs_after, i, j = min(candidates, key=lambda candidate: candidate[0])
+
+        accepted = self.strategy.accept(delta, self.cost)
+        if accepted:
+            self._keep_best(delta, codes.copy)
+            with self.stats.time("mutate"):
+                cohort.swap(i, j)
+            self._cached_cost.update(costs_after)
+            self._update_cost(delta)
+            self._call("on_accept", i, j, delta)
+
+        self.proposals.count(np.zeros(len(candidates), dtype=int))
+        self.proposals.record(0, accepted)
+        self.strategy.update(i, j, accepted, self.cost)
+        return accepted
 
-        # Cost before the swap.
-        cost_before = self._cost(cohort[a.group], cohort, use_cache=False) + self._cost(
-            cohort[b.group], cohort, use_cache=False
+    def _propose(self, engine, k):
+        """Propose up to ``k`` candidate pairs of people from different groups.
+
+        The pairs are proposed by ``proposals``. Pairs from the same group, moves
+        leaving a group size outside its range, and pairs not allowed by the strategy
+        are discarded. The proposal is repeated until at least one pair remains, at
+        most ``_ATTEMPTS`` times.
+
+        Returns
+        -------
+        tuple or None
+            ``None`` if no pair remained after ``_ATTEMPTS`` proposals. Otherwise, the
+            positions of the first person of each pair, the positions of the second
+            person of each pair (or the group codes of moves), the kind of proposal of
+            each pair, and the identifiers of both people of the discarded pairs, as
+            passed to the strategy.
+
+        """
+        for _ in range(_ATTEMPTS):
+            i, j, kind = self.proposals.propose(engine, k, self.rng)
+            move = kind == _MOVE
+            other = np.where(move, i, j)
+            a, b = engine.codes[i], np.where(move, j, engine.codes[other])
+            valid = (
+                (a != b)
+                & (~move | (engine.size[a] > engine.min_size[a]))
+                & (~move | (engine.size[b] < engine.max_size[b]))
+                & self.strategy.allows(i, other)
+            )
+            if self._budget is not None:
+                valid &= self._budget.allows(engine, i, j, move)
+            if valid.any():
+                self.proposals.count(kind[valid])
+                return i[valid], j[valid], kind[valid], (i[~valid], other[~valid])
+
+        return None
+
+    def _spend(self, engine, i, j, move):
+        """Check whether an accepted swap fits the budget of ``repair`` and spend it.
+
+        Earlier swaps of the same batch may have used up the budget.
+
+        """
+        if self._budget is None:
+            return True
+        return self._budget.spend(engine, i, j, move)
+
+    def _order(self, deltas):
+        """Order in which the candidates with cost changes ``deltas`` are considered.
+
+        Only the best candidate is considered if the strategy chooses among the
+        candidates, and only the candidates decreasing the cost if the strategy
+        accepts no other swaps.
+
+        """
+        if self.strategy.candidates > 1:
+            # The strategy chooses among the candidates, so only the best one is used.
+            order = np.array([np.argmin(deltas)])
+        elif self.batch_mode == "best":
+            order = np.argsort(deltas, kind="stable")
+        else:
+            order = np.arange(len(deltas))
+
+        if self.strategy.improving:
+            order = order[deltas[order] < 0]
+
+        return order
+
+    def _engine_step(self, engine):
+        """Perform a single step of the algorithm on a compiled cohort.
+
+        This is equivalent to ``_step``, but the people are selected by their positions
+        and the cost changes of all candidate swaps are evaluated at once by the
+        engine. With ``batch > 1``, a batch of candidate swaps is proposed and every
+        swap accepted by the strategy is applied, as long as it does not involve a
+        group changed by an earlier swap of the same batch. The candidates are
+        considered from the lowest cost change (``batch_mode='best'``) or in the order
+        they were proposed (``batch_mode='first'``).
+
+        Parameters
+        ----------
+        engine : Engine
+            The compiled cohort to solve.
+
+        Returns
+        -------
+        int
+            The number of accepted swaps.
+        """
+        with self.stats.time("propose"):
+            proposal = self._propose(engine, max(self.batch, self.strategy.candidates))
+        if proposal is None:
+            # No swap can be made, e.g. within the budget of ``repair``.
+            self.stop_reason = "exhausted"
+            return 0
+
+        i, j, kind, discarded = proposal
+        move = kind == _MOVE
+        deltas = np.empty(len(i))
+        if not move.all():
+            deltas[~move] = engine.delta(i[~move], j[~move])
+        if move.any():
+            deltas[move] = engine.delta_move(i[move], j[move])
+
+        accepted = 0
+        changed = set()
+        for k in self._order(deltas):
+            other = i[k] if move[k] else j[k]
+            groups = {engine.codes[i[k]], j[k] if move[k] else engine.codes[j[k]]}
+            # The cost change may have been evaluated for groups which have changed
+            # since, in which case the swap is rejected.
+            swap = (
+                changed.isdisjoint(groups)
+                and self.strategy.accept(deltas[k], self.cost)
+                and self._spend(engine, i[k], j[k], move[k])
+            )
+            if swap:
+                self._keep_best(deltas[k], engine.codes.copy)
+                with self.stats.time("mutate"):
+                    if move[k]:
+                        engine.move(i[k], j[k])
+                    else:
+                        engine.swap(i[k], j[k])
+                self._update_cost(deltas[k])
+                self._call("on_accept", i[k], j[k], deltas[k])
+                changed |= groups
+                accepted += 1
+
+            self.proposals.record(kind[k], swap)
+            self.strategy.update(i[k], other, swap, self.cost)
+
+        if self.strategy.candidates == 1 and not self.strategy.improving:
+            # The run of the strategy lasts ``batch`` decisions per step (see
+            # ``_reset``), so the discarded pairs count as rejected swaps.
+            for i_k, other in zip(*discarded, strict=True):
+                self.strategy.update(i_k, other, False, self.cost)
+
+        return accepted
+
+    def _uses_kernel(self):
+        """Check whether the steps are performed by the compiled kernel.
+
+        The kernel supports the default cost functions with the greedy or the
+        simulated annealing (with a named schedule) strategy, ``batch=1``, uniform
+        proposals, and no affinity matrix.
+
+        """
+        supported = (
+            self.uses_engine
+            and self.batch == 1
+            and not self.proposals.targeted
+            and not self.hooks["on_step"]
+            and not self.hooks["on_accept"]
+            and self._budget is None
+            and self.affinity is None
+            and (
+                type(self.strategy) is Greedy
+                or (
+                    type(self.strategy) is SimulatedAnnealing
+                    and isinstance(self.strategy.schedule, str)
+                )
+            )
         )
 
-        # Swap the groups of two people.
-        cohort.data.loc[a.name, "group"] = b.group
-        cohort.data.loc[b.name, "group"] = a.group
+        if self.backend == "numba" and not supported:
+            raise ValueError(
+                "The numba backend supports only the default cost functions with the "
+                "greedy or simulated annealing strategy, batch=1, uniform proposals, "
+                "no on_step or on_accept hooks, and no affinity matrix."
+            )
+
+        return self.backend != "numpy" and kernel.available and supported
+
+    def _kernel_steps(self, engine, start, n, total):
+        """Perform ``n`` steps on a compiled cohort in the compiled kernel.
+
+        Parameters
+        ----------
+        engine : Engine
+            The compiled cohort to solve.
+        start : int
+            The number of steps performed before.
+        n : int
+            The number of steps to perform.
+        total : int
+            The total number of steps of the run.
+
+        Returns
+        -------
+        int
+            The number of accepted swaps.
+
+        """
+        if isinstance(self.strategy, SimulatedAnnealing):
+            t_start, t_end = self.strategy.t_start, self.strategy.t_end
+            linear = self.strategy.schedule == "linear"
+        else:
+            t_start, t_end, linear = 0.0, 0.0, False
+
+        if self._best is None:
+            best_codes = engine.codes.copy()
+        else:
+            best_codes = self._best
 
-        # Cost after the swap.
-        cost_after = self._cost(cohort[a.group], cohort, use_cache=False) + self._cost(
-            cohort[b.group], cohort, use_cache=False
+        costs = np.array([self.cost, self._best_cost])
+        accepted = kernel.run(
+            engine.features,
+            engine.state,
+            best_codes,
+            costs,
+            start,
+            n,
+            total,
+            t_start,
+            t_end,
+            linear,
+            int(self.rng.integers(2**31)),
         )
-        if cost_after < cost_before:
-            # If the cost has decreased, keep the swap.
-            return True
+        self.cost, self._best_cost = costs
+        self._best = best_codes if self.cost > self._best_cost else None
+        engine.index_members()
+
+        return accepted
+
+    def _start(self, cohort, n):
+        """Prepare a run of ``n`` steps.
+
+        The cohort is compiled (if the default cost functions are used), the running
+        cost is initialised, and the strategy is reset.
+
+        Returns
+        -------
+        Engine or None
+            The compiled cohort, or ``None`` if custom cost functions are used.
+
+        """
+        if self.uses_engine:
+            engine = Engine(
+                cohort,
+                keep_together=self.keep_together,
+                keep_separate=self.keep_separate,
+                bool_min=self.bool_min,
+                affinity=self.affinity,
+            )
+            engine.time = self.stats.time
+            if self._budget is not None:
+                self._budget.bind(engine)
+            self.cost = engine.cost
+            self.proposals.reset(engine.size, engine)
+            # The numbers of people of the constraints are read from the engine.
+            members = np.bincount(engine.indices, minlength=engine.n_constraints)
+            target = engine.min_target[engine.min_target > 0]
+            reach = engine.min_values[:, engine.min_target > 0].sum(axis=0) // target
+            self._lower_bound = engine.affinity_bound
+            self._bound = functools.partial(
+                util.lower_bound,
+                cohort.min_size,
+                cohort.max_size,
+                engine.bool_target,
+                together=members[engine.weights < 0],
+                separate=members[engine.weights > 0],
+                reach=reach,
+            )
         else:
-            # If the cost has increased, revert the swap.
-            cohort.data.loc[a.name, "group"] = a.group
-            cohort.data.loc[b.name, "group"] = b.group
-            return False
+            if self.proposals.targeted:
+                raise ValueError(
+                    "Targeted proposals require the default cost functions."
+                )
+
+            engine = None
+            self.proposals.reset(np.bincount(cohort.codes, minlength=len(cohort.names)))
+            self._lower_bound, self._bound = -np.inf, None
+            self._cached_cost = {}
+            self.cache_hits = self.cache_misses = 0
+            self.cost = cohort.diversity_cost(
+                cost_fn=self.diversity_cost_fn
+            ) + cohort.restriction_cost(
+                keep_together=self.keep_together,
+                keep_separate=self.keep_separate,
+                bool_min=self.bool_min,
+                cost_fn=self.restriction_cost_fn,
+            )
+
+        self._reset(n, size=len(cohort.data))
+
+        return engine
+
+    def _reset(self, n, size):
+        """Reset the strategy and the best assignment for a run of ``n`` steps."""
+        if self.uses_engine and self.strategy.candidates == 1:
+            # The strategy decides on every swap of a batch.
+            n *= self.batch
 
-    def solve(self, cohort, n):
+        self.strategy.reset(cost=self.cost, n=n, size=size, rng=self.rng)
+        self._best, self._best_cost = None, self.cost
+
+    def _restore(self, engine):
+        """Restore the best assignment on the engine if the strategy left it."""
+        if self._best is not None:
+            engine.codes = self._best
+            engine.refresh()
+            self.cost = self._best_cost
+
+    def _finish(self, cohort, engine):
+        """Finish a run by writing the best assignment found to ``cohort.data``."""
+        if engine is not None:
+            self._restore(engine)
+            engine.write(cohort)
+        elif self._best is not None:
+            cohort.codes = self._best
+            self._cached_cost = {}
+            self.cost = self._best_cost
+
+    def _run(self, engine, n):
+        """Run ``n`` steps on a compiled cohort without progress reporting.
+
+        The run stops early if no valid swap can be proposed (see ``_propose``).
+
+        Parameters
+        ----------
+        engine : Engine
+            The compiled cohort to solve.
+        n : int
+            The number of steps to perform.
+
+        Returns
+        -------
+        int
+            The number of accepted swaps.
+
+        """
+        self.cost = engine.cost
+        self.proposals.reset(engine.size, engine)
+        self._reset(n, size=len(engine.codes))
+        self.stop_reason = "steps"
+
+        accepted = 0
+        for _ in range(n):
+            accepted += self._engine_step(engine)
+            if self.stop_reason != "steps":
+                break
+
+        self._restore(engine)
+        return accepted
+
+    def solve(  # noqa: PLR0913
+        self,
+        cohort,
+        n,
+        report=None,
+        progress=True,
+        checkpoint=None,
+        *,
+        patience=None,
+        target=None,
+        tol=None,
+        time_limit=None,
+    ):
         """Solve the cohort by minimising the cost.
 
         This method performs a number of steps to minimise the cost of the cohort. The
         number of steps is specified by the ``n`` parameter. Each step is performed by
-        ``_step`` method.
+        ``_engine_step`` (default cost functions) or ``_step`` (custom cost functions)
+        method. The final assignment is written to ``cohort.data``. If the strategy
+        accepts swaps increasing the cost, the best assignment found during the run is
+        kept.
+
+        The cost of the cohort is computed once at the start and then updated with the
+        cost change of every accepted swap, so it is always available as ``cost``. The
+        progress bar shows the cost and the acceptance rate (accepted swaps per step)
+        every ``report`` steps.
+
+        With the default cost functions, ``lower_bound`` is a lower bound of the cost
+        (see ``Cohort.lower_bound``) and ``gap`` is the difference between the best
+        cost found and the bound, which is also shown by the progress bar.
+
+        The run stops before ``n`` steps if the best cost has not decreased for
+        ``patience`` steps, the cost reaches ``target`` or comes within ``tol`` of the
+        lower bound, or the run takes longer than ``time_limit`` seconds. The criteria
+        are checked after every step, or after every ``report`` steps in the compiled
+        kernel. The number of steps performed and the reason the run stopped
+        (``'steps'``, ``'patience'``, ``'target'``, ``'bound'``, or ``'time_limit'``)
+        are available as ``steps`` and ``stop_reason``. With the default cost
+        functions, the run also stops (``'exhausted'``) if no valid swap is found in
+        many consecutive proposals, for example when the budget of ``repair`` allows
+        none.
 
-        The Progress bar updates the cost and acceptance rate every 10% of the steps.
+        If ``checkpoint`` is given, the state of the run is saved to that file every
+        ``report`` steps, and an interrupted run can be continued with ``resume``.
+
+        The statistics of the run are available as ``stats`` (see ``SolverStats``),
+        and the hooks of the solver are called during the run (see ``add_hook``).
 
         Parameters
         ----------
@@ -142,42 +758,903 @@ class Solver:
             The cohort to solve.
         n : int
             The number of steps to perform.
+        report : int, optional
+            The number of steps between progress bar updates. The default is 10% of
+            the steps.
+        progress : bool, optional
+            Whether to show the progress bar. If ``False``, ``tqdm`` is not used at
+            all, which is useful for batch runs. The default is True.
+        checkpoint : str or pathlib.Path, optional
+            The ``.npz`` file to save the state of the run to.
+        patience : int, optional
+            The number of steps without a decrease of the best cost after which the
+            run stops.
+        target : float, optional
+            The cost at or below which the run stops.
+        tol : float, optional
+            The gap to the lower bound at or below which the run stops.
+        time_limit : float, optional
+            The wall-clock time in seconds after which the run stops.
+
+        """
+        engine = self._start(cohort, n)
+        self._stopping(patience, target, tol, time_limit)
+        self._solve(cohort, engine, n, 0, report, progress, checkpoint)
+
+    def resume(  # noqa: PLR0913
+        self,
+        cohort,
+        path,
+        report=None,
+        progress=True,
+        *,
+        patience=None,
+        target=None,
+        tol=None,
+        time_limit=None,
+    ):
+        """Continue a run of ``solve`` from a checkpoint.
+
+        The assignment, the running and the best cost, the state of the random number
+        generator and of the strategy, and the step counter are restored from the
+        checkpoint, so the run continues exactly where it was interrupted. The solver
+        must be created with the same parameters as the one which saved the checkpoint,
+        and ``cohort`` must have the same data. The checkpoint is updated every
+        ``report`` steps. The stopping criteria apply to the continued part of the run
+        (see ``solve``).
+
+        Parameters
+        ----------
+        cohort : Cohort
+            The cohort to solve.
+        path : str or pathlib.Path
+            The checkpoint file written by ``solve``.
+        report : int, optional
+            The number of steps between progress bar updates and checkpoints. The
+            default is 10% of the steps of the run.
+        progress : bool, optional
+            Whether to show the progress bar. The default is True.
+        patience, target, tol, time_limit : optional
+            The stopping criteria (see ``solve``).
 
         """
-        progress_bar = tqdm(range(n), desc="Solving")
-        progress_bar.set_postfix(
+        with np.load(path) as checkpoint:
+            state = dict(checkpoint)
+
+        n, start = (int(value) for value in state["steps"])
+        cohort.codes = state["codes"]
+        engine = self._start(cohort, n)
+        if engine is not None:
+            engine.index_members(state["order"])
+
+        self.cost, self._best_cost = state["costs"]
+        self._best = state["best"] if state["has_best"] else None
+        self.rng.bit_generator.state = json.loads(state["rng"].item())
+        for key in _STRATEGY_STATE:
+            if f"strategy_{key}" not in state:
+                continue
+            value = state[f"strategy_{key}"]
+            if value.ndim:
+                # A list or a deque, e.g. the recency list of tabu search.
+                getattr(self.strategy, key).clear()
+                getattr(self.strategy, key).extend(value.tolist())
+            else:
+                setattr(self.strategy, key, value.item())
+
+        self._stopping(patience, target, tol, time_limit, start=start)
+        self._solve(cohort, engine, n, start, report, progress, path)
+
+    def repair(  # noqa: PLR0913
+        self,
+        cohort,
+        n,
+        max_moves,
+        *,
+        free=None,
+        report=None,
+        progress=True,
+        patience=None,
+        target=None,
+        tol=None,
+        time_limit=None,
+    ):
+        """Repair the assignment of a cohort by moving few people.
+
+        This is ``solve`` warm-started from the current assignment, where at most
+        ``max_moves`` people (other than the ``free`` people) can be in a group other
+        than their current group at any step. It is meant for small changes of the
+        cohort, such as people added or removed with ``Cohort.add_people`` and
+        ``Cohort.remove_people``: the newcomers are placed and the diversity restored
+        with a bounded disruption of everyone else. After the repair, ``cohort.added``
+        is cleared.
+
+        This method requires the default cost functions, and the steps are performed
+        in Python.
+
+        Parameters
+        ----------
+        cohort : Cohort
+            The cohort to repair.
+        n : int
+            The number of steps to perform.
+        max_moves : int
+            The largest number of people, other than the ``free`` people, moved away
+            from their current group.
+        free : list-like, optional
+            The indices of the people who can move without counting towards
+            ``max_moves``. The default is ``cohort.added``.
+        report, progress, patience, target, tol, time_limit : optional
+            See ``solve``.
+
+        Returns
+        -------
+        pd.Index
+            The indices of the people, other than the ``free`` people, who changed
+            groups.
+
+        """
+        if not self.uses_engine:
+            raise ValueError("Repairing requires the default cost functions.")
+
+        free = cohort.added if free is None else pd.Index(free)
+        home = np.where(cohort.data.index.isin(free), -1, cohort.codes)
+        self._budget = _Budget(home, max_moves)
+        try:
+            self.solve(
+                cohort,
+                n,
+                report,
+                progress,
+                patience=patience,
+                target=target,
+                tol=tol,
+                time_limit=time_limit,
+            )
+        finally:
+            self._budget = None
+
+        cohort.added = cohort.added[:0]
+        return cohort.data.index[(home >= 0) & (cohort.codes != home)]
+
+    @property
+    def lower_bound(self):
+        """Lower bound of the cost of the cohort of the last run.
+
+        With the default cost functions, this is ``Cohort.lower_bound`` plus the
+        lowest affinity cost. It is computed from the compiled constraints when it
+        is first needed, e.g. by the ``tol`` criterion. With custom cost functions,
+        it is ``-inf``.
+
+        """
+        if self._bound is not None:
+            self._lower_bound += self._bound()
+            self._bound = None
+        return self._lower_bound
+
+    @property
+    def gap(self):
+        """Difference between the best cost found and ``lower_bound``.
+
+        After a run, this is the difference between ``cost`` and ``lower_bound``.
+
+        """
+        return self._best_cost - self.lower_bound
+
+    def _stopping(self, patience, target, tol, time_limit, start=0):
+        """Set the stopping criteria of a run continuing after ``start`` steps."""
+        self._criteria = {
+            key: value
+            for key, value in {
+                "patience": patience,
+                "target": target,
+                "bound": tol,
+                "time_limit": time_limit,
+            }.items()
+            if value is not None
+        }
+        self._deadline = time.perf_counter() + (time_limit or 0)
+        self._improved = start, self._best_cost
+        self.steps, self.stop_reason = start, "steps"
+
+    def _stopped(self, step):
+        """Check the stopping criteria after ``step`` steps of the run.
+
+        Returns
+        -------
+        bool
+            Whether the run stops. The reason is stored in ``stop_reason``.
+
+        """
+        if self._best_cost < self._improved[1]:
+            self._improved = step, self._best_cost
+
+        checks = {
+            "target": lambda target: self.cost <= target,
+            "bound": lambda tol: self.gap <= tol,
+            "patience": lambda patience: step - self._improved[0] >= patience,
+            "time_limit": lambda _: time.perf_counter() >= self._deadline,
+        }
+        for reason, value in self._criteria.items():
+            if checks[reason](value):
+                self.stop_reason = reason
+                return True
+
+        return False
+
+    def _steps(self, step, start, n):
+        """Perform up to ``n`` steps with ``step`` until a stopping criterion is met.
+
+        The cost after every step is recorded in ``stats`` and the ``'on_step'``
+        hooks are called.
+
+        Returns
+        -------
+        int
+            The number of accepted swaps.
+        int
+            The number of steps performed.
+
+        """
+        accepted = 0
+        for k in range(start + 1, start + n + 1):
+            accepted_k = step()
+            accepted += accepted_k
+            self.stats.record(k, self.cost, accepted_k)
+            self._call("on_step", k, accepted_k)
+            if self.stop_reason != "steps" or (self._criteria and self._stopped(k)):
+                return accepted, k - start
+
+        return accepted, n
+
+    def _solve(self, cohort, engine, n, start, report, progress, checkpoint):  # noqa: PLR0913, PLR0917
+        """Perform steps ``start`` to ``n`` of a run prepared by ``_start``."""
+        if report is None:
+            report = max(n // 10, 1)
+
+        if progress:
+            progress_bar = tqdm(total=n, initial=start, desc="Solving")
+            progress_bar.set_postfix({"cost": "pending", "acceptance_rate": "pending"})
+
+        use_kernel = self._uses_kernel()
+        self.stats.reset(n, self.cost)
+
+        # The steps are performed in chunks of ``report`` steps.
+        chunk = start
+        while chunk < n and self.stop_reason == "steps":
+            steps = min(report, n - chunk)
+            if use_kernel:
+                with self.stats.time("kernel"):
+                    accepted = self._kernel_steps(engine, chunk, steps, n)
+                self.stats.record(chunk + steps, self.cost, accepted, steps=steps)
+                if self._criteria:
+                    self._stopped(chunk + steps)
+            elif engine is not None:
+                accepted, steps = self._steps(
+                    functools.partial(self._engine_step, engine), chunk, steps
+                )
+            else:
+                accepted, steps = self._steps(
+                    functools.partial(self._step, cohort), chunk, steps
+                )
+            chunk += steps
+            self.steps = chunk
+            self._call("on_report", chunk)
+
+            if checkpoint is not None:
+                self._checkpoint(checkpoint, cohort, engine, n, chunk)
+
+            if progress:
+                progress_bar.update(steps)
+                postfix = {"cost": self.cost, "acceptance_rate": accepted / steps}
+                if np.isfinite(self.lower_bound):
+                    postfix["gap"] = self.gap
+                progress_bar.set_postfix(postfix)
+
+        if progress:
+            progress_bar.close()
+
+        self.stats.finish()
+        self._finish(cohort, engine)
+
+    def _checkpoint(self, path, cohort, engine, n, step):
+        """Save the state of a run after ``step`` of ``n`` steps to ``path``.
+
+        The file is written next to ``path`` and then renamed, so an interrupted write
+        leaves the previous checkpoint intact. Only plain arrays are saved, so the file
+        is loaded without pickle: the strategy is rebuilt by ``_start`` and only its
+        ``_STRATEGY_STATE`` attributes are restored.
+
+        """
+        codes = cohort.codes if engine is None else engine.groups[engine.codes]
+        strategy = {
+            f"strategy_{key}": np.asarray(value)
+            for key, value in vars(self.strategy).items()
+            if key in _STRATEGY_STATE
+        }
+
+        path = pathlib.Path(path)
+        partial = path.with_name(f"{path.name}.partial")
+        with open(partial, "wb") as f:
+            np.savez(
+                f,
+                codes=codes,
+                order=np.zeros(0) if engine is None else engine.order,
+                best=codes if self._best is None else self._best,
+                has_best=self._best is not None,
+                costs=np.array([self.cost, self._best_cost]),
+                steps=np.array([n, step]),
+                rng=json.dumps(self.rng.bit_generator.state),
+                **strategy,
+            )
+        os.replace(partial, path)
+
+    def solve_mip(self, cohort, time_limit=60.0, gap=1e-4):
+        """Solve the cohort as a mixed-integer program.
+
+        The cost is formulated as a mixed-integer linear program (see `mip`) and
+        solved by HiGHS through ``scipy.optimize.milp`` within ``time_limit``
+        seconds. This is practical for cohorts of up to a few hundred people. The
+        standard deviations of the ``nums`` columns enter the program through a
+        linear approximation, so the assignment found is evaluated with the exact
+        cost and only written to ``cohort.data`` if it costs less than the current
+        assignment. The current assignment thus acts as the incumbent of the run.
+
+        This method requires ``scipy``, the default cost functions, and fixed group
+        sizes, and it does not support ``affinity``.
+
+        Parameters
+        ----------
+        cohort : Cohort
+            The cohort to solve.
+        time_limit : float, optional
+            The time limit of the solver in seconds. The default is 60.
+        gap : float, optional
+            The relative gap between the linearised cost and its lower bound at which
+            the solver stops. The default is 1e-4.
+
+        Returns
+        -------
+        pd.Series
+            The ``status`` and ``message`` of the solver, the linearised cost
+            (``objective``) and its lower bound (``bound``), and the exact cost of the
+            initial assignment and of the assignment found (``initial_cost`` and
+            ``final_cost``, NaN if none was found).
+
+        """
+        if not self.uses_engine:
+            raise ValueError("MIP solving requires the default cost functions.")
+        if (cohort.min_size != cohort.max_size).any():
+            raise ValueError("MIP solving requires fixed group sizes.")
+        if self.affinity is not None:
+            raise ValueError("MIP solving does not support affinity matrices.")
+
+        engine = Engine(
+            cohort,
+            keep_together=self.keep_together,
+            keep_separate=self.keep_separate,
+            bool_min=self.bool_min,
+            affinity=self.affinity,
+        )
+        initial = engine.cost
+
+        codes, result = mip.solve(engine, time_limit=time_limit, gap=gap)
+        final = np.nan
+        if codes is not None:
+            best = engine.codes
+            engine.codes = codes
+            engine.refresh()
+            final = engine.cost
+            if final >= initial:
+                engine.codes = best
+                engine.refresh()
+
+        engine.write(cohort)
+        self.cost = engine.cost
+
+        return pd.Series(
             {
-                "Cost": "pending",
-                "Acceptance rate": "pending",
+                "status": result.status,
+                "message": result.message,
+                "objective": result.get("fun", np.nan),
+                "bound": result.get("mip_dual_bound", np.nan),
+                "initial_cost": initial,
+                "final_cost": final,
             }
         )
 
-        accepted = 0
-        for i in progress_bar:
-            accepted += self._step(cohort)
-
-            if i % (n // 10) == 0:
-                if i > 0:
-                    diversity_cost = cohort.diversity_cost(
-                        cost_fn=self.diversity_cost_fn
-                    )
-                    restriction_cost = cohort.restriction_cost(
-                        keep_together=self.keep_together,
-                        keep_separate=self.keep_separate,
-                        bool_min=self.bool_min,
-                        cost_fn=self.restriction_cost_fn,
-                    )
-                    acceptance_rate = accepted / (n // 10)
-                else:
-                    diversity_cost = "pending"
-                    restriction_cost = "pending"
-                    acceptance_rate = "pending"
-
-                progress_bar.set_postfix(
-                    {
-                        "diversity_cost": diversity_cost,
-                        "restriction_cost": restriction_cost,
-                        "acceptance_rate": acceptance_rate,
-                    }
-                )
-                accepted = 0
+    def _seed_sequence(self, seed):
+        """Seed sequence from which independent streams are spawned.
+
+        Without ``seed``, the entropy is drawn from ``rng``, so the streams are
+        reproducible with the seed of the solver.
+
+        """
+        if seed is None:
+            seed = self.rng.integers(2**63)
+        return np.random.SeedSequence(seed)
+
+    def solve_parallel(  # noqa: PLR0913
+        self, cohort, n, restarts, workers=None, seed=None, *, progress=True
+    ):
+        """Solve the cohort by running independent chains in a process pool.
+
+        Each chain starts from a random assignment with the same group sizes and
+        performs ``n`` steps (see ``solve``). The chains only exchange the compiled
+        array state of the cohort with the worker processes, not the cohort data. The
+        best assignment is written to ``cohort.data``. The result is deterministic
+        for a given ``seed``, regardless of the number of workers.
+
+        This method requires the default cost functions.
+
+        Parameters
+        ----------
+        cohort : Cohort
+            The cohort to solve.
+        n : int
+            The number of steps to perform in each chain.
+        restarts : int
+            The number of independent chains.
+        workers : int, optional
+            The number of worker processes. If ``None``, the number of CPUs is used. If
+            1, the chains are run in the current process.
+        seed : int, optional
+            The seed from which the random number generators of the chains are spawned.
+            The default is drawn from ``rng``.
+        progress : bool, optional
+            Whether to show a progress bar of the completed chains. The default is True.
+
+        Returns
+        -------
+        pd.Series
+            The best assignment, i.e. the ``group`` column of ``cohort.data``.
+        pd.DataFrame
+            The statistics of each chain, indexed by chain number, with columns
+            ``initial_cost``, ``final_cost``, ``acceptance_rate``, and ``best``.
+
+        """
+        if not self.uses_engine:
+            raise ValueError("Parallel solving requires the default cost functions.")
+
+        engine = Engine(
+            cohort,
+            keep_together=self.keep_together,
+            keep_separate=self.keep_separate,
+            bool_min=self.bool_min,
+            affinity=self.affinity,
+        )
+        seeds = self._seed_sequence(seed).spawn(restarts)
+        chains = functools.partial(_solve_chain, self, n, engine)
+        results = _map(chains, seeds, workers=workers, progress=progress)
+
+        stats = pd.DataFrame([result for _, result in results]).rename_axis("chain")
+        best = stats.final_cost.idxmin()
+        stats = stats.assign(best=stats.index == best)
+
+        engine.codes = results[best][0]
+        engine.refresh()
+        engine.write(cohort)
+        self.cost = engine.cost
+
+        return cohort.data.group.copy(), stats
+
+    def solve_multilevel(  # noqa: PLR0913
+        self, cohort, n, blocks, workers=None, seed=None, *, progress=True
+    ):
+        """Solve a large cohort by solving blocks of groups in parallel.
+
+        The groups are split into ``blocks`` blocks of consecutive groups, and people
+        are dealt to the blocks so that the diversity of every block is close to the
+        diversity of the cohort. Every block is then solved independently for ``n``
+        steps, relative to the diversity of the cohort. Finally, the groups are split
+        into ``blocks`` blocks of interleaved groups, each containing groups from all
+        the first blocks, and the blocks are solved again for ``n`` steps, so that
+        people move across the boundaries of the first blocks.
+
+        The swaps within a small block are much more likely to decrease the cost than
+        random swaps in a cohort with thousands of groups, and the blocks are solved
+        in a process pool. The result is deterministic for a given ``seed``,
+        regardless of the number of workers. This method requires the default cost
+        functions. Constraints are only taken into account within blocks, and the
+        tenure of tabu search is shortened for blocks too small for it.
+
+        Parameters
+        ----------
+        cohort : Cohort
+            The cohort to solve.
+        n : int
+            The number of steps to perform in each block and phase.
+        blocks : int
+            The number of blocks.
+        workers : int, optional
+            The number of worker processes. If ``None``, the number of CPUs is used. If
+            1, the blocks are solved in the current process.
+        seed : int, optional
+            The seed of the partition and of the random number generators of the
+            blocks. The default is drawn from ``rng``.
+        progress : bool, optional
+            Whether to show a progress bar of the solved blocks. The default is True.
+
+        Returns
+        -------
+        pd.Series
+            The assignment, i.e. the ``group`` column of ``cohort.data``.
+        pd.DataFrame
+            The statistics of each block, indexed by phase (``'partition'`` or
+            ``'refine'``) and block number, with columns ``initial_cost``,
+            ``final_cost``, and ``acceptance_rate``.
+
+        """
+        if not self.uses_engine:
+            raise ValueError("Multilevel solving requires the default cost functions.")
+
+        engine = Engine(
+            cohort,
+            keep_together=self.keep_together,
+            keep_separate=self.keep_separate,
+            bool_min=self.bool_min,
+            affinity=self.affinity,
+        )
+        blocks = min(blocks, engine.n_groups)
+        phases = {
+            "partition": np.arange(engine.n_groups) * blocks // engine.n_groups,
+            "refine": np.arange(engine.n_groups) % blocks,
+        }
+        seed = self._seed_sequence(seed)
+
+        engine.codes = _partition(
+            engine, phases["partition"], np.random.default_rng(seed.spawn(1)[0])
+        )
+
+        stats = {}
+        for phase, block_of_group in phases.items():
+            block = block_of_group[engine.codes]
+            order = np.argsort(block, kind="stable")
+            members = np.split(order, np.cumsum(np.bincount(block))[:-1])
+
+            engines = [engine.take(positions) for positions in members]
+            results = _map(
+                functools.partial(_solve_block, self, n),
+                engines,
+                seed.spawn(blocks),
+                workers=workers,
+                progress=progress,
+                desc=f"Solving ({phase})",
+            )
+
+            for b, (positions, (codes, result)) in enumerate(
+                zip(members, results, strict=True)
+            ):
+                groups = np.searchsorted(engine.groups, engines[b].groups)
+                engine.codes[positions] = groups[codes]
+                stats[phase, b] = result
+
+        engine.refresh()
+        engine.write(cohort)
+        self.cost = engine.cost
+
+        stats = pd.DataFrame.from_dict(stats, orient="index")
+        stats.index = stats.index.set_names(["phase", "block"])
+        return cohort.data.group.copy(), stats
+
+
+def solve_many(  # noqa: PLR0913
+    cohorts, solver, n, workers=None, seed=None, *, progress=True, callback=None
+):
+    """Solve many independent cohorts in a process pool.
+
+    Every cohort is compiled once in the current process, and only its compiled
+    array state is exchanged with the worker processes. Each cohort is solved for
+    ``n`` steps from its current assignment, as by ``Solver._run``, without a progress
+    bar per cohort. The cohorts are scheduled from the largest to the smallest, so
+    that the small cohorts fill the workers at the end of the batch. The assignment
+    of each cohort is written to its ``data`` as soon as it is solved. The result is
+    deterministic for a given ``seed``, regardless of the number of workers.
+
+    This function requires the default cost functions and no ``affinity`` matrix,
+    whose positions would differ between cohorts.
+
+    Parameters
+    ----------
+    cohorts : dict or list of Cohort
+        The cohorts to solve, by name. A list is named by position.
+    solver : Solver
+        The solver. It is copied for each cohort, so it is not modified.
+    n : int
+        The number of steps to perform for each cohort.
+    workers : int, optional
+        The number of worker processes. If ``None``, the number of CPUs is used. If
+        1, the cohorts are solved in the current process.
+    seed : int, optional
+        The seed from which the random number generators of the cohorts are spawned.
+        The default is drawn from ``solver.rng``.
+    progress : bool, optional
+        Whether to show a progress bar of the solved cohorts. The default is True.
+    callback : callable, optional
+        Called as ``callback(name, cohort, stats)`` as soon as each cohort is solved,
+        in the order of completion, with the statistics of the cohort as a dict.
+
+    Returns
+    -------
+    pd.DataFrame
+        The overviews of the cohorts (see ``Cohort.overview``), indexed by cohort
+        name and group.
+    pd.DataFrame
+        The statistics of each cohort, indexed by cohort name, with columns
+        ``initial_cost``, ``final_cost``, and ``acceptance_rate``.
+
+    """
+    if not solver.uses_engine:
+        raise ValueError("Batch solving requires the default cost functions.")
+    if solver.affinity is not None:
+        raise ValueError("Batch solving does not support affinity matrices.")
+
+    if not isinstance(cohorts, dict):
+        cohorts = dict(enumerate(cohorts))
+    names = list(cohorts)
+    engines = [
+        Engine(
+            cohorts[name],
+            keep_together=solver.keep_together,
+            keep_separate=solver.keep_separate,
+            bool_min=solver.bool_min,
+        )
+        for name in names
+    ]
+    seeds = solver._seed_sequence(seed).spawn(len(names))
+
+    # Largest first: the longest tasks start early and the short ones balance the
+    # load of the workers at the end.
+    schedule = sorted(range(len(names)), key=lambda c: -len(engines[c].codes))
+    results = _imap_unordered(
+        functools.partial(_solve_chain, solver, n, restart=False),
+        [engines[c] for c in schedule],
+        [seeds[c] for c in schedule],
+        workers=workers,
+        progress=progress,
+    )
+
+    stats = {}
+    for s, (codes, result) in results:
+        name = names[schedule[s]]
+        engine = engines[schedule[s]]
+        engine.codes = codes
+        engine.refresh()
+        engine.write(cohorts[name])
+        stats[name] = result
+        if callback is not None:
+            callback(name, cohorts[name], result)
+
+    overview = pd.concat(
+        {name: cohorts[name].overview() for name in names}, names=["cohort"]
+    )
+    stats = pd.DataFrame.from_dict(
+        {name: stats[name] for name in names}, orient="index"
+    ).rename_axis("cohort")
+    return overview, stats
+
+
+def _imap_unordered(function, *iterables, workers=None, progress=True, desc="Solving"):
+    """Map ``function`` over ``iterables`` in a process pool, in order of completion.
+
+    If ``workers`` is 1, the function is called in the current process, in order.
+
+    Yields
+    ------
+    int
+        The position of the arguments in ``iterables``.
+    object
+        The result.
+
+    """
+    if workers == 1:
+        results = enumerate(map(function, *iterables))
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        futures = {
+            executor.submit(function, *args): i
+            for i, args in enumerate(zip(*iterables, strict=True))
+        }
+        results = (
+            (futures[future], future.result())
+            for future in concurrent.futures.as_completed(futures)
+        )
+
+    if progress:
+        results = tqdm(results, total=len(iterables[0]), desc=desc)
+
+    try:
+        yield from results
+    finally:
+        if workers != 1:
+            executor.shutdown(cancel_futures=True)
+
+
+def _map(function, *iterables, workers=None, progress=True, desc="Solving"):
+    """Map ``function`` over ``iterables`` in a process pool.
+
+    If ``workers`` is 1, the function is called in the current process.
+
+    Returns
+    -------
+    list
+        The results, in the order of ``iterables``.
+
+    """
+    if workers == 1:
+        results = map(function, *iterables)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        results = executor.map(function, *iterables)
+
+    if progress:
+        results = tqdm(results, total=len(iterables[0]), desc=desc)
+
+    try:
+        return list(results)
+    finally:
+        if workers != 1:
+            executor.shutdown()
+
+
+def _solve_chain(solver, n, engine, seed, *, restart=True):
+    """Run a single chain of ``Solver.solve_parallel`` in a worker process.
+
+    Parameters
+    ----------
+    solver : Solver
+        The solver. It is copied, so that chains are independent.
+    n : int
+        The number of steps to perform.
+    engine : Engine
+        The compiled cohort. It is copied, so that chains are independent.
+    seed : np.random.SeedSequence
+        The seed of the chain.
+    restart : bool, optional
+        Whether the chain starts from a random assignment with the same group sizes
+        (otherwise, from the assignment of ``engine``). The default is True.
+
+    Returns
+    -------
+    np.ndarray
+        The group codes of the best assignment found by the chain.
+    dict
+        The statistics of the chain.
+
+    """
+    solver = copy.deepcopy(solver)
+    engine = copy.deepcopy(engine)
+    solver.rng = np.random.default_rng(seed)
+
+    if restart:
+        # Sorting first makes the starting point independent of the current
+        # assignment.
+        engine.codes = solver.rng.permutation(np.sort(engine.codes))
+        engine.refresh()
+    initial_cost = engine.cost
+
+    accepted = solver._run(engine, n)
+
+    return engine.codes, {
+        "initial_cost": initial_cost,
+        "final_cost": solver.cost,
+        "acceptance_rate": accepted / n,
+    }
+
+
+def _solve_block(solver, n, engine, seed):
+    """Solve a block of ``Solver.solve_multilevel`` in a worker process.
+
+    This is ``_solve_chain`` from the assignment of the block. The tenure of tabu
+    search is shortened to the longest one the block allows (see ``Tabu.reset``).
+
+    """
+    if isinstance(solver.strategy, Tabu):
+        tenure = min(solver.strategy.tenure, max(len(engine.codes) // 2 - 1, 0))
+        solver = copy.copy(solver)
+        solver.strategy = copy.copy(solver.strategy)
+        solver.strategy.tenure = tenure
+
+    return _solve_chain(solver, n, engine, seed, restart=False)
+
+
+class _Budget:
+    """Bound on the number of people away from their home groups during ``repair``.
+
+    Parameters
+    ----------
+    home : np.ndarray
+        The code of the home group of each person (position in ``Cohort.names``), or
+        -1 for the people who are free to move.
+    limit : int
+        The largest number of people away from their home groups.
+
+    """
+
+    def __init__(self, home, limit):
+        self.home = home
+        self.limit = limit
+        self.used = 0
+
+    def bind(self, engine):
+        """Translate the home groups to the group codes of ``engine``."""
+        self._home = np.full(len(self.home), -1)
+        known = self.home >= 0
+        self._home[known] = np.searchsorted(engine.groups, self.home[known])
+        self.used = self.count(engine)
+
+    def _away(self, p, codes):
+        """Whether the people at positions ``p`` in groups ``codes`` are away."""
+        return ((self._home[p] >= 0) & (self._home[p] != codes)).astype(int)
+
+    def count(self, engine):
+        """Count the people away from their home groups."""
+        return int(self._away(np.arange(len(self._home)), engine.codes).sum())
+
+    def _change(self, engine, i, j, move):
+        """Change of the number of people away by swaps (or moves)."""
+        other = np.where(move, i, j)
+        a, b = engine.codes[i], np.where(move, j, engine.codes[other])
+        change = self._away(i, b) - self._away(i, a)
+        return change + np.where(move, 0, self._away(other, a) - self._away(other, b))
+
+    def allows(self, engine, i, j, move):
+        """Check which swaps (or moves) keep the people away within the limit."""
+        return self.used + self._change(engine, i, j, move) <= self.limit
+
+    def spend(self, engine, i, j, move):
+        """Count a swap (or move) which is about to be applied, if it is allowed."""
+        change = self._change(engine, np.array([i]), np.array([j]), np.array([move]))
+        if self.used + change[0] > self.limit:
+            return False
+        self.used += int(change[0])
+        return True
+
+
+def _partition(engine, block_of_group, rng):
+    """Assign people to groups so that every block of groups is balanced.
+
+    People are sorted by their boolean characteristics and then by the sum of their
+    standardised numerical values, and dealt to the blocks in proportion to the sizes
+    of the blocks. Within each block, people are assigned to its groups at random.
+
+    Parameters
+    ----------
+    engine : Engine
+        The compiled cohort.
+    block_of_group : np.ndarray
+        The block of each group.
+    rng : np.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    np.ndarray
+        The group code of each person.
+
+    """
+    n_people, n_blocks = len(engine.codes), block_of_group.max() + 1
+
+    num_std = np.where(engine.num_std > 0, engine.num_std, 1)
+    score = (engine.num_values / num_std).sum(axis=1)
+    order = np.lexsort((rng.random(n_people), score, *engine.bool_values.T[::-1]))
+
+    # Every block has ``capacity`` evenly spaced slots in the sequence of dealt people.
+    capacity = np.bincount(block_of_group, weights=engine.size, minlength=n_blocks)
+    capacity = capacity.astype(int)
+    slots = np.concatenate([(np.arange(c) + 0.5) / c for c in capacity])
+    block = np.empty(n_people, dtype=np.intp)
+    block[order] = np.repeat(np.arange(n_blocks), capacity)[
+        np.argsort(slots, kind="stable")
+    ]
+
+    groups = np.argsort(block_of_group, kind="stable")
+    places = np.repeat(groups, engine.size[groups].astype(int))
+    places = places[np.lexsort((rng.random(n_people), block_of_group[places]))]
+
+    codes = np.empty(n_people, dtype=np.intp)
+    codes[np.argsort(block, kind="stable")] = places
+    return codes
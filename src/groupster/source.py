@@ -0,0 +1,212 @@
+"""Chunked loading of cohorts from files.
+
+Large cohort files are read in chunks, keeping only the index and the ``bools`` and
+``nums`` columns in compact dtypes. The diversity of the cohort is accumulated chunk by
+chunk, and the remaining columns stay in the file, accessible through a ``Source``.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from .util import merge_moments, sample_std
+
+
+class Source:
+    """Lazy handle to the columns of a cohort file which are not loaded.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The path of the file.
+    format : str
+        The format of the file, ``'csv'`` or ``'parquet'``.
+    index_col : str
+        The name of the index column.
+    columns : list of str
+        The names of the columns which are not loaded.
+    read_kwargs : dict, optional
+        Additional keyword arguments passed to ``pd.read_csv``.
+
+    """
+
+    def __init__(self, path, format, index_col, columns, read_kwargs=None):
+        self.path = path
+        self.format = format
+        self.index_col = index_col
+        self.columns = columns
+        self.read_kwargs = read_kwargs or {}
+
+    def load(self, columns=None):
+        """Read columns from the file.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            The names of the columns to read. The default is all columns which are not
+            loaded.
+
+        Returns
+        -------
+        pd.DataFrame
+            The columns, indexed by the index column.
+
+        """
+        columns = self.columns if columns is None else list(columns)
+        if self.format == "csv":
+            return pd.read_csv(
+                self.path,
+                usecols=[self.index_col, *columns],
+                index_col=self.index_col,
+                **self.read_kwargs,
+            )
+        else:
+            return pd.read_parquet(self.path, columns=[self.index_col, *columns])
+
+
+def read_csv(path, bools=None, nums=None, index_col=0, chunksize=100_000, **kwargs):
+    """Read the ``bools`` and ``nums`` columns of a CSV file in chunks.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The path of the CSV file.
+    bools : list of str, optional
+        The names of the boolean columns.
+    nums : list of str, optional
+        The names of the numerical columns.
+    index_col : int or str, optional
+        The position or the name of the index column. The default is 0.
+    chunksize : int, optional
+        The number of rows per chunk. The default is 100,000.
+    **kwargs
+        Additional keyword arguments passed to ``pd.read_csv``.
+
+    Returns
+    -------
+    pd.DataFrame
+        The index and the ``bools`` and ``nums`` columns.
+    pd.Series
+        The diversity of the data (see `util.diversity`).
+    Source
+        The handle to the remaining columns.
+
+    """
+    header = pd.read_csv(path, nrows=0, **kwargs).columns
+    if isinstance(index_col, int):
+        index_col = header[index_col]
+
+    bools, nums = list(bools or []), list(nums or [])
+    chunks = pd.read_csv(
+        path,
+        usecols=[index_col, *bools, *nums],
+        index_col=index_col,
+        chunksize=chunksize,
+        **kwargs,
+    )
+    data, diversity = ingest(chunks, bools=bools, nums=nums)
+
+    columns = [col for col in header if col not in {index_col, *bools, *nums}]
+    return data, diversity, Source(path, "csv", index_col, columns, kwargs)
+
+
+def read_parquet(path, bools=None, nums=None, index_col=None, chunksize=100_000):
+    """Read the ``bools`` and ``nums`` columns of a Parquet file in chunks.
+
+    This function requires ``pyarrow``.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The path of the Parquet file.
+    bools : list of str, optional
+        The names of the boolean columns.
+    nums : list of str, optional
+        The names of the numerical columns.
+    index_col : str, optional
+        The name of the index column. The default is the (single) index stored by
+        pandas in the file.
+    chunksize : int, optional
+        The number of rows per chunk. The default is 100,000.
+
+    Returns
+    -------
+    pd.DataFrame
+        The index and the ``bools`` and ``nums`` columns.
+    pd.Series
+        The diversity of the data (see `util.diversity`).
+    Source
+        The handle to the remaining columns.
+
+    """
+    try:
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow.") from e
+
+    file = pq.ParquetFile(path)
+    if index_col is None:
+        [index_col] = file.schema_arrow.pandas_metadata["index_columns"]
+
+    bools, nums = list(bools or []), list(nums or [])
+    chunks = (
+        batch.to_pandas().set_index(index_col)
+        for batch in file.iter_batches(
+            batch_size=chunksize, columns=[index_col, *bools, *nums]
+        )
+    )
+    data, diversity = ingest(chunks, bools=bools, nums=nums)
+
+    columns = [
+        col for col in file.schema_arrow.names if col not in {index_col, *bools, *nums}
+    ]
+    return data, diversity, Source(path, "parquet", index_col, columns)
+
+
+def ingest(chunks, bools, nums):
+    """Concatenate chunks of cohort data and compute their diversity.
+
+    The ``bools`` columns are stored as ``bool`` and the ``nums`` columns as
+    ``float32``. The mean and the sample standard deviation of each column are merged
+    chunk by chunk (Chan et al.) in double precision, from the stored values.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The chunks of the data, indexed by the index column.
+    bools : list of str
+        The names of the boolean columns.
+    nums : list of str
+        The names of the numerical columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        The concatenated chunks.
+    pd.Series
+        The diversity of the data (see `util.diversity`).
+
+    """
+    columns = [*bools, *nums]
+    dtypes = dict.fromkeys(bools, bool) | dict.fromkeys(nums, np.float32)
+
+    frames = []
+    count, mean, m2 = 0, np.zeros(len(columns)), np.zeros(len(columns))
+    for chunk in chunks:
+        frame = chunk.loc[:, columns].astype(dtypes)
+        frames.append(frame)
+
+        count, mean, m2 = merge_moments(count, mean, m2, frame.to_numpy(dtype=float))
+
+    data = pd.concat(frames) if frames else pd.DataFrame(columns=columns)
+    std = sample_std(count, m2)
+
+    k = len(bools)
+    diversity = pd.Series(
+        {f"bool_{col}": mean[c] for c, col in enumerate(bools)}
+        | {f"num_{col}_mean": mean[k + c] for c, col in enumerate(nums)}
+        | {f"num_{col}_std": std[k + c] for c, col in enumerate(nums)},
+        dtype=float,
+    )
+
+    return data, diversity
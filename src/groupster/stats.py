@@ -0,0 +1,166 @@
+import contextlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+#: Sections of the steps timed by ``SolverStats(profile=True)``.
+SECTIONS = ("propose", "diversity", "restriction", "mutate", "kernel")
+
+_UNTIMED = contextlib.nullcontext()
+
+
+def untimed(name):
+    """Return a context manager which does not time the section ``name``."""
+    return _UNTIMED
+
+
+class SolverStats:
+    """Statistics of a run of ``Solver.solve``.
+
+    The numbers of steps and accepted swaps, the wall-clock time, and the cost after
+    every step (the cost trajectory) are recorded. With ``profile=True``, the time
+    spent in each of ``SECTIONS`` is also recorded: proposing candidate swaps,
+    evaluating the diversity and the restriction costs, and changing the assignment.
+    In the compiled kernel, all the time of the steps is spent in ``'kernel'`` and
+    the cost is only recorded at the end of every ``report`` steps.
+
+    Nested sections are timed exclusively, so the times of the sections add up to at
+    most the time of the run.
+
+    Parameters
+    ----------
+    profile : bool, optional
+        Whether to time the sections of the steps. The default is False.
+
+    """
+
+    def __init__(self, profile=False):
+        self.profile = profile
+        self.reset(0, np.nan)
+
+    def reset(self, n, cost):
+        """Prepare the statistics for a run of ``n`` steps from ``cost``."""
+        self.initial_cost = cost
+        self.steps = 0
+        self.accepted = 0
+        self.trajectory = np.full(n, np.nan, dtype=np.float32)
+        self.times = dict.fromkeys(SECTIONS, 0.0)
+        self._sections = []
+        self._start = time.perf_counter()
+        self._end = None
+
+    def finish(self):
+        """Stop the clock of the run."""
+        self._end = time.perf_counter()
+
+    def record(self, step, cost, accepted, steps=1):
+        """Record the cost after ``step`` and the swaps accepted in the last steps."""
+        self.trajectory[step - 1] = cost
+        self.steps += steps
+        self.accepted += accepted
+
+    def time(self, name):
+        """Return a context manager timing the section ``name`` if profiling."""
+        return _Section(self, name) if self.profile else _UNTIMED
+
+    @property
+    def elapsed(self):
+        """Wall-clock time of the run in seconds."""
+        end = time.perf_counter() if self._end is None else self._end
+        return end - self._start
+
+    @property
+    def steps_per_second(self):
+        """Number of steps per second."""
+        return self.steps / self.elapsed if self.elapsed > 0 else np.nan
+
+    @property
+    def acceptance_rate(self):
+        """Number of accepted swaps per step.
+
+        With ``batch=1``, this is the fraction of steps with an accepted swap. With
+        larger batches, several swaps can be accepted in a step, so it can exceed 1.
+
+        """
+        return self.accepted / self.steps if self.steps else np.nan
+
+    def summary(self):
+        """Summarise the run.
+
+        Returns
+        -------
+        pd.Series
+            The numbers of ``steps`` and ``accepted`` swaps, the ``acceptance_rate``
+            (accepted swaps per step), the ``elapsed`` time, ``steps_per_second``, the
+            ``initial_cost`` and ``final_cost``, and the time of every section as
+            ``time_<section>``.
+
+        """
+        costs = self.trajectory[np.isfinite(self.trajectory)]
+        return pd.Series(
+            {
+                "steps": self.steps,
+                "accepted": self.accepted,
+                "acceptance_rate": self.acceptance_rate,
+                "elapsed": self.elapsed,
+                "steps_per_second": self.steps_per_second,
+                "initial_cost": self.initial_cost,
+                "final_cost": costs[-1] if costs.size else self.initial_cost,
+            }
+            | {f"time_{section}": value for section, value in self.times.items()},
+            dtype=float,
+        )
+
+    def to_frame(self):
+        """Return the cost trajectory as ``pd.DataFrame`` indexed by step."""
+        steps = np.flatnonzero(np.isfinite(self.trajectory)) + 1
+        return pd.DataFrame(
+            {"cost": self.trajectory[steps - 1]},
+            index=pd.Index(steps, name="step"),
+        )
+
+    def to_json(self):
+        """Return the summary and the cost trajectory as a JSON string."""
+        trajectory = self.to_frame()
+        summary = self.summary()
+        return json.dumps(
+            {
+                "summary": {
+                    key: None if np.isnan(value) else float(value)
+                    for key, value in summary.items()
+                },
+                "trajectory": {
+                    "step": trajectory.index.to_list(),
+                    "cost": trajectory.cost.astype(float).to_list(),
+                },
+            }
+        )
+
+
+class _Section:
+    """Context manager adding its time to a section of ``SolverStats``."""
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def _add(self, now):
+        self.stats.times[self.name] += now - self.begin
+
+    def __enter__(self):
+        now = time.perf_counter()
+        if self.stats._sections:
+            # The enclosing section is paused.
+            self.stats._sections[-1]._add(now)
+        self.stats._sections.append(self)
+        self.begin = now
+        return self
+
+    def __exit__(self, *exc):
+        now = time.perf_counter()
+        self._add(now)
+        self.stats._sections.pop()
+        if self.stats._sections:
+            self.stats._sections[-1].begin = now
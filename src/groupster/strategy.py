@@ -0,0 +1,273 @@
+import collections
+import math
+
+import numpy as np
+
+
+class Greedy:
+    """Greedy hill-climbing strategy.
+
+    A swap is accepted only if it decreases the cost. This is the default strategy of
+    ``Solver``.
+
+    """
+
+    #: Number of candidate swaps evaluated per step.
+    candidates = 1
+
+    #: Whether only swaps decreasing the cost are accepted.
+    improving = True
+
+    def reset(self, cost, n, size, rng):
+        """Prepare the strategy for a new run.
+
+        Parameters
+        ----------
+        cost : float
+            The cost of the cohort at the start of the run.
+        n : int
+            The number of steps in the run.
+        size : int
+            The number of people in the cohort.
+        rng : np.random.Generator
+            The random number generator of the solver.
+
+        """
+        self.rng = rng
+
+    def allows(self, i, j):
+        """Check whether swapping people ``i`` and ``j`` may be proposed.
+
+        Parameters
+        ----------
+        i, j : hashable or np.ndarray
+            Identifiers of the two people, or arrays of identifiers of many pairs.
+
+        Returns
+        -------
+        bool or np.ndarray
+            Whether the swap is allowed.
+
+        """
+        return True
+
+    def accept(self, delta, cost):
+        """Decide whether a swap is accepted.
+
+        Parameters
+        ----------
+        delta : float
+            The change of the cost caused by the swap.
+        cost : float
+            The cost of the cohort before the swap.
+
+        Returns
+        -------
+        bool
+            Whether the swap is accepted.
+
+        """
+        return delta < 0
+
+    def update(self, i, j, accepted, cost):
+        """Update the strategy after a step.
+
+        Parameters
+        ----------
+        i, j : hashable
+            Identifiers of the two people.
+        accepted : bool
+            Whether the swap was accepted.
+        cost : float
+            The cost of the cohort after the step.
+
+        """
+
+
+class SimulatedAnnealing(Greedy):
+    """Simulated annealing strategy.
+
+    A swap that decreases the cost is always accepted. A swap that increases the cost
+    by ``delta`` is accepted with probability ``exp(-delta / temperature)``. The
+    temperature decreases from ``t_start`` to ``t_end`` over the run according to the
+    ``schedule``.
+
+    Parameters
+    ----------
+    t_start : float, optional
+        The temperature at the first step. The default is 0.05.
+    t_end : float, optional
+        The temperature at the last step. The default is 1e-4.
+    schedule : str or callable, optional
+        How the temperature decreases. It can be ``'exponential'`` (default),
+        ``'linear'``, or a callable mapping the fraction of completed steps (between 0
+        and 1) to a temperature.
+
+    """
+
+    improving = False
+
+    def __init__(self, t_start=0.05, t_end=1e-4, schedule="exponential"):
+        if isinstance(schedule, str) and schedule not in ("exponential", "linear"):
+            raise ValueError(f"Unknown temperature schedule {schedule!r}.")
+
+        self.t_start = t_start
+        self.t_end = t_end
+        self.schedule = schedule
+
+    def temperature(self, fraction):
+        """Compute the temperature after ``fraction`` of the steps.
+
+        Parameters
+        ----------
+        fraction : float
+            The fraction of completed steps, between 0 and 1.
+
+        Returns
+        -------
+        float
+            The temperature.
+
+        """
+        if callable(self.schedule):
+            return self.schedule(fraction)
+        elif self.schedule == "linear":
+            return self.t_start + (self.t_end - self.t_start) * fraction
+        else:
+            return self.t_start * (self.t_end / self.t_start) ** fraction
+
+    def reset(self, cost, n, size, rng):
+        """Reset the step counter."""
+        super().reset(cost, n, size, rng)
+        self.n = n
+        self.step = 0
+
+    def accept(self, delta, cost):
+        """Accept a swap with the Metropolis criterion."""
+        if delta < 0:
+            return True
+
+        temperature = self.temperature(self.step / max(self.n - 1, 1))
+        if temperature <= 0:
+            return False
+
+        return self.rng.random() < math.exp(-delta / temperature)
+
+    def update(self, i, j, accepted, cost):
+        """Advance the temperature schedule."""
+        self.step += 1
+
+
+class Tabu(Greedy):
+    """Tabu search strategy.
+
+    At every step, ``candidates`` swaps are evaluated and the best one is accepted, even
+    if it increases the cost. People who took part in one of the recent swaps are
+    tabu and cannot be swapped again until ``tenure`` other people have been swapped.
+
+    Parameters
+    ----------
+    tenure : int, optional
+        The length of the recency list of swapped people. The default is 10.
+    candidates : int, optional
+        The number of candidate swaps evaluated at every step. The default is 20.
+
+    """
+
+    improving = False
+
+    def __init__(self, tenure=10, candidates=20):
+        self.tenure = tenure
+        self.candidates = candidates
+
+    def reset(self, cost, n, size, rng):
+        """Clear the recency list."""
+        if self.tenure >= size // 2:
+            raise ValueError(
+                f"Tabu tenure {self.tenure} is too long for a cohort of {size} people."
+            )
+
+        super().reset(cost, n, size, rng)
+        self.recent = collections.deque(maxlen=self.tenure)
+
+    def allows(self, i, j):
+        """Check that neither person is tabu."""
+        recent = list(self.recent)
+        return ~np.isin(i, recent) & ~np.isin(j, recent)
+
+    def accept(self, delta, cost):
+        """Accept the best candidate swap."""
+        return True
+
+    def update(self, i, j, accepted, cost):
+        """Add the swapped people to the recency list."""
+        if accepted:
+            self.recent.extend([i, j])
+
+
+class LateAcceptance(Greedy):
+    """Late acceptance hill-climbing strategy.
+
+    A swap is accepted if the new cost is not higher than the current cost or the cost
+    ``length`` steps ago.
+
+    Parameters
+    ----------
+    length : int, optional
+        The length of the cost history. The default is 100.
+
+    """
+
+    improving = False
+
+    def __init__(self, length=100):
+        self.length = length
+
+    def reset(self, cost, n, size, rng):
+        """Fill the cost history with the initial cost."""
+        super().reset(cost, n, size, rng)
+        self.history = [cost] * self.length
+        self.step = 0
+
+    def accept(self, delta, cost):
+        """Compare the new cost with the current cost and the cost history."""
+        return delta <= 0 or cost + delta <= self.history[self.step % self.length]
+
+    def update(self, i, j, accepted, cost):
+        """Record the current cost in the cost history."""
+        self.history[self.step % self.length] = cost
+        self.step += 1
+
+
+STRATEGIES = {
+    "greedy": Greedy,
+    "annealing": SimulatedAnnealing,
+    "tabu": Tabu,
+    "late_acceptance": LateAcceptance,
+}
+
+
+def get_strategy(strategy):
+    """Get a strategy object.
+
+    Parameters
+    ----------
+    strategy : str or object, optional
+        The name of a strategy (``'greedy'``, ``'annealing'``, ``'tabu'``, or
+        ``'late_acceptance'``) or a strategy object. If ``None``, the greedy strategy is
+        used.
+
+    Returns
+    -------
+    object
+        The strategy object.
+
+    """
+    if strategy is None:
+        return Greedy()
+    elif isinstance(strategy, str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}.")
+        return STRATEGIES[strategy]()
+    else:
+        return strategy
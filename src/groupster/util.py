@@ -1,5 +1,7 @@
+import functools
 import re
 
+import numpy as np
 import pandas as pd
 
 
@@ -29,27 +31,230 @@ def diversity(data, bools=None, nums=None):
         and the value is the mean or standard deviation of the variable.
 
     """
-    bool_mean = (
-        {f"bool_{col}": data.loc[:, col].mean() for col in bools}
-        if bools is not None
-        else {}
+    bools, nums = list(bools or []), list(nums or [])
+    values = data.loc[:, [*bools, *nums]].to_numpy(dtype=float)
+    return diversity_values(values, bools, nums)
+
+
+def diversity_values(values, bools=None, nums=None):
+    """Compute the diversity of the rows of an array.
+
+    This is `util.diversity` of the ``bools`` and ``nums`` columns of a DataFrame,
+    converted to a float array. As in pandas, missing values are skipped, the mean of
+    no values is NaN, and the standard deviation of fewer than two values is NaN.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The ``bools`` columns followed by the ``nums`` columns (2D).
+    bools : list of str, optional
+        The names of the boolean variables.
+    nums : list of str, optional
+        The names of the numerical variables.
+
+    Returns
+    -------
+    pd.Series
+        The diversity, in the format of `util.diversity`.
+
+    """
+    bools, nums = list(bools or []), list(nums or [])
+    k = len(bools)
+
+    present = ~np.isnan(values)
+    count = present.sum(axis=0)
+    mean = np.full(values.shape[1], np.nan)
+    np.divide(
+        np.where(present, values, 0).sum(axis=0), count, out=mean, where=count > 0
+    )
+    m2 = (np.where(present, values - mean, 0)[:, k:] ** 2).sum(axis=0)
+    std = sample_std(count[k:], m2)
+
+    return pd.Series(
+        {f"bool_{col}": mean[c] for c, col in enumerate(bools)}
+        | {f"num_{col}_mean": mean[k + c] for c, col in enumerate(nums)}
+        | {f"num_{col}_std": std[c] for c, col in enumerate(nums)},
+        dtype=float,
+    )
+
+
+def update_diversity(diversity, count, data, bools=None, nums=None, *, remove=False):  # noqa: PLR0913
+    """Update the diversity of ``count`` people when ``data`` joins or leaves them.
+
+    The means and the sample standard deviations are merged (or unmerged) with the
+    moments of ``data`` (Chan et al.), so the people who stay are not read again.
+
+    Parameters
+    ----------
+    diversity : pd.Series
+        The diversity of the ``count`` people (see `util.diversity`).
+    count : int
+        The number of people before the update.
+    data : pd.DataFrame
+        The people who join or leave.
+    bools : list of str, optional
+        The names of the boolean variables.
+    nums : list of str, optional
+        The names of the numerical variables.
+    remove : bool, optional
+        Whether ``data`` leaves (otherwise, joins) the people. The default is False.
+
+    Returns
+    -------
+    pd.Series
+        The updated diversity, with the same index as ``diversity``.
+
+    """
+    bools, nums = list(bools or []), list(nums or [])
+    if data.empty:
+        return diversity.copy()
+
+    k = len(bools)
+    mean = diversity.loc[
+        [f"bool_{col}" for col in bools] + [f"num_{col}_mean" for col in nums]
+    ].to_numpy(dtype=float)
+    std = diversity.loc[[f"num_{col}_std" for col in nums]].to_numpy(dtype=float)
+    m2 = np.zeros(len(mean))
+    if count > 1:
+        m2[k:] = std**2 * (count - 1)
+
+    values = data.loc[:, [*bools, *nums]].to_numpy(dtype=float)
+    total, mean, m2 = merge_moments(count, mean, m2, values, remove=remove)
+    std = sample_std(total, m2[k:])
+
+    updated = diversity.astype(float)
+    updated.loc[[f"bool_{col}" for col in bools]] = mean[:k]
+    updated.loc[[f"num_{col}_mean" for col in nums]] = mean[k:]
+    updated.loc[[f"num_{col}_std" for col in nums]] = std
+    return updated
+
+
+def merge_moments(count, mean, m2, values, *, remove=False):
+    """Merge the moments of ``values`` with the moments of ``count`` other rows.
+
+    The means and the sums of squared deviations from the means of the columns are
+    merged (Chan et al.), or unmerged if ``values`` are removed from the rows.
+
+    Parameters
+    ----------
+    count : int
+        The number of rows before the update.
+    mean : np.ndarray
+        The mean of each column of the rows.
+    m2 : np.ndarray
+        The sum of squared deviations from the mean of each column of the rows.
+    values : np.ndarray
+        The rows (2D) that are added or removed.
+    remove : bool, optional
+        Whether ``values`` are removed (otherwise, added). The default is False.
+
+    Returns
+    -------
+    int
+        The number of rows after the update.
+    np.ndarray
+        The mean of each column, NaN if no rows are left.
+    np.ndarray
+        The sum of squared deviations from the mean of each column.
+
+    """
+    other_count = len(values)
+    if other_count == 0:
+        return count, mean, m2
+    other_mean = values.mean(axis=0)
+    other_m2 = ((values - other_mean) ** 2).sum(axis=0)
+
+    if remove:
+        total = count - other_count
+        if total == 0:
+            return 0, np.full_like(mean, np.nan), np.zeros_like(m2)
+        rest = (count * mean - other_count * other_mean) / total
+        difference = other_mean - rest
+        return total, rest, m2 - other_m2 - difference**2 * total * other_count / count
+
+    total = count + other_count
+    difference = other_mean - mean
+    return (
+        total,
+        mean + difference * other_count / total,
+        m2 + other_m2 + difference**2 * count * other_count / total,
     )
 
-    # Means of numerical variables
-    num_mean = (
-        {f"num_{col}_mean": data.loc[:, col].mean() for col in nums}
-        if nums is not None
-        else {}
+
+def sample_std(count, m2):
+    """Compute the sample (ddof=1) standard deviation from ``m2`` of ``count`` rows.
+
+    ``count`` is a number or an array of numbers of rows of each column. As in pandas,
+    the standard deviation of fewer than two rows is NaN.
+
+    """
+    return np.where(
+        count > 1, np.sqrt(np.maximum(m2, 0) / np.maximum(count - 1, 1)), np.nan
     )
 
-    # Standard deviations of numerical variables
-    num_std = (
-        {f"num_{col}_std": data.loc[:, col].std() for col in nums}
-        if nums is not None
-        else {}
+
+def schema(diversity):
+    """Compute the feature schema of a diversity vector.
+
+    The schema describes every entry of the diversity (see `util.diversity`) by its
+    kind and the variable it refers to. It also gives the position of the entry whose
+    value normalises the cost of the entry: the mean of the same numerical variable
+    for ``num_<name>_mean`` and ``num_<name>_std`` entries, and -1 (no normalisation)
+    for ``bool_<name>`` entries.
+
+    The schema only depends on the index of the diversity and it is computed only once
+    for each index.
+
+    Parameters
+    ----------
+    diversity : pd.Series
+        The diversity of a cohort or a group.
+
+    Returns
+    -------
+    pd.DataFrame
+        The schema, indexed by the entries of the diversity, with columns ``kind``
+        (``'bool'``, ``'mean'``, or ``'std'``), ``variable``, and ``norm``.
+
+    Raises
+    ------
+    ValueError
+        If an entry of the diversity is not a boolean or numerical variable.
+
+    """
+    return _schema(tuple(diversity.index)).copy()
+
+
+@functools.lru_cache
+def _schema(labels):
+    """Compute the schema of the diversity with index ``labels``."""
+    kinds, variables = [], []
+    for idx in labels:
+        if match := re.match(r"^bool_(.*)$", idx):
+            kinds.append("bool")
+        elif match := re.match(r"^num_(.*)_mean$", idx):
+            kinds.append("mean")
+        elif match := re.match(r"^num_(.*)_std$", idx):
+            kinds.append("std")
+        else:
+            raise ValueError(f"Cost function does not know how to handle {idx}.")
+        variables.append(match.group(1))
+
+    norm = [
+        -1 if kind == "bool" else labels.index(f"num_{variable}_mean")
+        for kind, variable in zip(kinds, variables, strict=True)
+    ]
+
+    return pd.DataFrame(
+        {"kind": kinds, "variable": variables, "norm": norm},
+        index=pd.Index(labels),
     )
 
-    return pd.Series(bool_mean | num_mean | num_std)
+
+@functools.lru_cache
+def _norm(labels):
+    """Normalising positions of the diversity with index ``labels`` as an array."""
+    return _schema(labels)["norm"].to_numpy()
 
 
 def diversity_cost(cohort_diversity, group_diversity):
@@ -64,6 +269,9 @@ def diversity_cost(cohort_diversity, group_diversity):
     - The absolute difference between the cohort and group diversity standard deviations
       for numerical variables, normalised by the cohort mean for that variable.
 
+    The kind of each variable is looked up in the schema of the cohort diversity (see
+    `util.schema`) and the cost is evaluated as a single vectorised expression.
+
     Parameters
     ----------
     cohort_diversity : pd.Series
@@ -77,26 +285,18 @@ def diversity_cost(cohort_diversity, group_diversity):
         The diversity cost of the group.
 
     """
-    cost = 0
+    labels = tuple(cohort_diversity.index)
+    norm = _norm(labels)
 
-    for idx in cohort_diversity.index:
-        cohort_val = cohort_diversity.loc[idx]
-        group_val = group_diversity.loc[idx]
-
-        if re.match(r"^bool_", idx):
-            cost += abs(cohort_val - group_val)
-        elif re.match(r"^num_.*_mean$", idx):
-            # The difference is normalised by the cohort mean.
-            cost += abs(cohort_val - group_val) / cohort_val
-        elif re.match(r"^num_.*_std$", idx):
-            # The difference is normalised by the cohort mean of the same variable.
-            variable_name = re.match(r"^num_(.*)_std$", idx).group(1)
-            cohort_mean = cohort_diversity.loc[f"num_{variable_name}_mean"]
-            cost += abs(cohort_val - group_val) / cohort_mean
-        else:
-            raise ValueError(f"Cost function does not know how to handle {idx}.")
+    cohort_val = cohort_diversity.to_numpy(dtype=float)
+    if tuple(group_diversity.index) != labels:
+        group_diversity = group_diversity.reindex(cohort_diversity.index)
+    group_val = group_diversity.to_numpy(dtype=float)
 
-    return cost
+    # Boolean variables are not normalised.
+    scale = np.where(norm < 0, 1.0, cohort_val[norm])
+
+    return float(np.sum(np.abs(cohort_val - group_val) / scale))
 
 
 def restriction_cost(data, keep_together=None, keep_separate=None, bool_min=None):
@@ -145,3 +345,58 @@ def restriction_cost(data, keep_together=None, keep_separate=None, bool_min=None
             cost += (data[name].sum() < n) * 10
 
     return cost
+
+
+def lower_bound(  # noqa: PLR0913
+    min_size, max_size, fractions, *, together=(), separate=(), reach=()
+):
+    """Compute a lower bound of the cost of any assignment of a cohort.
+
+    See `Cohort.lower_bound`. The bound is computed from the numbers of people of
+    the constraints only, so it takes no time proportional to the size of the cohort.
+
+    Parameters
+    ----------
+    min_size, max_size : np.ndarray
+        The range of the size of each group.
+    fractions : array-like
+        The fraction of the cohort with each boolean characteristic.
+    together, separate : array-like, optional
+        The number of people in each ``keep_together`` and ``keep_separate`` list.
+    reach : array-like, optional
+        For each ``bool_min`` characteristic, the number of groups that can reach
+        its minimum.
+
+    Returns
+    -------
+    float
+        The lower bound of the diversity cost plus the restriction cost.
+
+    """
+    groups = max_size > 0
+    max_size = max_size[groups]
+    min_size = np.maximum(min_size[groups], 1)
+
+    # Every possible size of every group, padded with its largest size.
+    sizes = np.minimum(
+        min_size[:, np.newaxis] + np.arange((max_size - min_size).max() + 1),
+        max_size[:, np.newaxis],
+    )
+    bound = 0.0
+    for fraction in fractions:
+        target = fraction * sizes
+        bound += (np.abs(target - np.round(target)) / sizes).min(axis=1).sum()
+
+    # The largest groups are filled first.
+    capacity = np.cumsum(np.sort(max_size)[::-1])
+    for m in together:
+        bound -= (np.diff(np.minimum(capacity, m), prepend=0) ** 2).sum()
+
+    for m in separate:
+        q, r = divmod(m, len(max_size))
+        bound += r * (q + 1) ** 2 + (len(max_size) - r) * q**2
+
+    for groups_reached in reach:
+        bound += 10 * max(len(max_size) - groups_reached, 0)
+
+    return float(bound)
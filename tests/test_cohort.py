@@ -2,6 +2,7 @@ import pathlib
 
 import numpy as np
 import pandas as pd
+import pytest
 
 import groupster as gr
 
@@ -20,6 +21,161 @@ class TestInit:
         assert cohort.data.group.nunique() == 5
         assert cohort.data.group.value_counts().to_dict() == groups
 
+    def test_sizes(self):
+        with pytest.raises(ValueError):
+            gr.Cohort(data=data, groups={"g1": 10})
+
+    def test_seed(self):
+        first = gr.Cohort(data=data, groups=groups, seed=42)
+        second = gr.Cohort(data=data, groups=groups, seed=42)
+        other = gr.Cohort(data=data, groups=groups, seed=43)
+
+        assert first.data.group.equals(second.data.group)
+        assert not first.data.group.equals(other.data.group)
+
+    def test_size_ranges(self):
+        cohort = gr.Cohort(data=data, groups={"g1": (5, 20), "g2": 10, "g3": (8, 30)})
+
+        assert cohort.sizes.tolist() == [20, 10, 19]
+        assert cohort.min_size.tolist() == [5, 10, 8]
+        assert cohort.max_size.tolist() == [20, 10, 30]
+
+        with pytest.raises(ValueError):
+            gr.Cohort(data=data, groups={"g1": (5, 20), "g2": (5, 20)})
+        with pytest.raises(ValueError):
+            gr.Cohort(data=data, groups={"g1": (30, 20), "g2": (20, 40)})
+
+    @pytest.mark.parametrize(
+        ("min_size", "max_size", "expected"),
+        [
+            ([10, 10, 10, 10, 9], [10, 10, 10, 10, 9], [10, 10, 10, 10, 9]),
+            ([0, 0, 0], [49, 49, 49], [17, 16, 16]),
+            ([20, 0, 0], [30, 10, 49], [20, 10, 19]),
+            ([1, 1], [1, 48], [1, 48]),
+        ],
+    )
+    def test_balance(self, min_size, max_size, expected):
+        sizes = gr.cohort._balance(49, np.array(min_size), np.array(max_size))
+        assert sizes.tolist() == expected
+
+
+class TestAssignment:
+    def test_codes(self):
+        cohort = gr.Cohort(data=data, groups=groups)
+
+        assert cohort.codes.dtype == np.int32
+        assert not cohort.codes.flags.writeable
+        assert cohort.names.to_list() == list(groups)
+        assert (cohort.names[cohort.codes] == cohort.data.group).all()
+
+        assignment = cohort.assignment
+        assert isinstance(assignment, pd.Categorical)
+        assert (assignment == cohort.data.group.to_numpy()).all()
+
+    def test_members(self):
+        cohort = gr.Cohort(data=data, groups=groups)
+
+        for name, size in groups.items():
+            members = cohort.members(name)
+            assert len(members) == size
+            assert cohort.data.group.iloc[members].eq(name).all()
+
+    def test_swap(self):
+        cohort = gr.Cohort(data=data, groups=groups)
+        initial = cohort.data.group.copy()
+        version = cohort.version
+
+        i = cohort.members("g1")[0]
+        j = cohort.members("g2")[0]
+        cohort.swap(i, j)
+
+        assert cohort.version > version
+        assert cohort.data.group.iloc[i] == "g2"
+        assert cohort.data.group.iloc[j] == "g1"
+        assert j in cohort.members("g1") and i not in cohort.members("g1")
+        assert i in cohort.members("g2") and j not in cohort.members("g2")
+        assert cohort["g1"].data.index.size == 10
+
+        cohort.revert(i, j)
+        assert cohort.data.group.equals(initial)
+        assert i in cohort.members("g1")
+
+    def test_move(self):
+        cohort = gr.Cohort(data=data, groups={"g1": (5, 44), "g2": (5, 44)})
+        sizes = cohort.sizes
+        version = cohort.version
+
+        i = cohort.members("g1")[0]
+        cohort.move(i, 1)
+
+        assert cohort.version > version
+        assert cohort.data.group.iloc[i] == "g2"
+        assert cohort.sizes.tolist() == [sizes[0] - 1, sizes[1] + 1]
+        assert i in cohort.members("g2") and i not in cohort.members("g1")
+        for name in cohort.names:
+            assert cohort.data.group.iloc[cohort.members(name)].eq(name).all()
+
+        cohort.codes = np.repeat([0, 1], [5, 44])
+        with pytest.raises(ValueError, match="fewer"):
+            cohort.move(0, 1)
+        with pytest.raises(ValueError):
+            cohort.codes = np.repeat([0, 1], [4, 45])
+
+    def test_set_codes(self):
+        cohort = gr.Cohort(data=data, groups=groups)
+        codes = np.sort(cohort.codes)
+
+        cohort.codes = codes
+        assert cohort.data.group.iloc[:10].eq("g1").all()
+        assert (cohort.members("g5") == np.arange(40, 49)).all()
+
+
+class TestLoad:
+    @pytest.mark.parametrize("chunksize", [7, 100])
+    def test_from_csv(self, chunksize):
+        cohort = gr.Cohort.from_csv(
+            CWD / "data" / "cohort.csv",
+            groups=groups,
+            bools=["female", "edsml"],
+            nums=["mark"],
+            chunksize=chunksize,
+        )
+
+        assert cohort.data.index.equals(data.index)
+        assert cohort.data.columns.to_list() == ["female", "edsml", "mark", "group"]
+        assert cohort.data.female.dtype == bool
+        assert cohort.data.mark.dtype == np.float32
+        assert cohort.data.group.value_counts().to_dict() == groups
+
+        expected = gr.util.diversity(data, bools=["female", "edsml"], nums=["mark"])
+        assert cohort.diversity.index.equals(expected.index)
+        assert np.allclose(cohort.diversity, expected)
+
+    def test_source(self):
+        cohort = gr.Cohort.from_csv(
+            CWD / "data" / "cohort.csv", groups=groups, bools=["female"]
+        )
+
+        assert cohort.source.columns == ["name", "edsml", "mark"]
+        assert cohort.source.load(["name"]).equals(data.loc[:, ["name"]])
+
+    def test_from_parquet(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        data.to_parquet(tmp_path / "cohort.parquet")
+
+        cohort = gr.Cohort.from_parquet(
+            tmp_path / "cohort.parquet",
+            groups=groups,
+            bools=["female"],
+            nums=["mark"],
+            chunksize=10,
+        )
+
+        assert cohort.data.index.equals(data.index)
+        expected = gr.util.diversity(data, bools=["female"], nums=["mark"])
+        assert np.allclose(cohort.diversity, expected)
+        assert cohort.source.load(["name"]).equals(data.loc[:, ["name"]])
+
 
 class TestGroup:
     def test_getitem(self):
@@ -49,6 +205,130 @@ class TestDiversity:
         assert np.isclose(cohort.diversity.loc["num_mark_mean"], 65.7451)
         assert np.isclose(cohort.diversity.loc["num_mark_std"], 5.38340)
 
+    def test_schema(self):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+
+        schema = cohort.schema
+        assert isinstance(schema, pd.DataFrame)
+        assert schema.index.equals(cohort.diversity.index)
+        assert schema.kind.to_list() == ["bool", "mean", "std"]
+        assert schema.variable.to_list() == ["female", "mark", "mark"]
+        assert schema.norm.to_list() == [-1, 1, 1]
+
+    def test_schema_unknown(self):
+        with pytest.raises(ValueError):
+            gr.util.schema(pd.Series({"unknown": 1.0}))
+
+
+class TestLowerBound:
+    def test_bools(self):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver()
+        solver.solve(cohort, n=2000, progress=False)
+
+        # 13 of 49 are female, so groups of 10 are at least 0.3 - 13/49 apart.
+        female = 13 / 49
+        expected = 4 * (0.3 - female) + abs(2 / 9 - female)
+        assert np.isclose(cohort.lower_bound(), expected)
+        assert cohort.lower_bound() <= cohort.diversity_cost() + 1e-12
+
+    def test_restrictions(self):
+        cohort = gr.Cohort(data=data, groups=groups)
+
+        keep_together = [["ff402", "yjt99", "cr947"]]
+        keep_separate = [data.index[:7].to_list()]
+        assert cohort.lower_bound(keep_together=keep_together) == -9
+        # Seven people in five groups: two pairs and three singles.
+        assert cohort.lower_bound(keep_separate=keep_separate) == 11
+        # 18 edsml students are enough for four groups with 4 of them.
+        assert cohort.lower_bound(bool_min={"edsml": 4}) == 10
+
+    def test_ranges(self):
+        cohort = gr.Cohort(data=data, groups={"g1": (5, 30), "g2": (5, 30)})
+
+        assert cohort.lower_bound(keep_together=[data.index[:40].to_list()]) == -(
+            30**2 + 10**2
+        )
+
+
+class TestChanges:
+    def test_add_people(self):
+        ranges = {name: (8, 10) for name in groups}
+        cohort = gr.Cohort(
+            data=data.iloc[:40], groups=ranges, bools=["female"], nums=["mark"], seed=0
+        )
+        cohort.diversity
+        codes = cohort.codes.copy()
+
+        cohort.add_people(data.iloc[40:])
+
+        assert cohort.data.drop(columns="group").equals(data)
+        assert (cohort.codes[:40] == codes).all()
+        assert cohort.sizes.tolist() == [10, 10, 10, 10, 9]
+        assert cohort.added.equals(data.index[40:])
+        pd.testing.assert_series_equal(
+            cohort.diversity,
+            gr.util.diversity(data, bools=["female"], nums=["mark"]),
+        )
+
+    def test_remove_people(self):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        cohort.diversity
+        group = cohort.data.group.copy()
+        leavers = cohort.data.index[cohort.codes == 0][:3]
+        smaller = {"g1": 9, "g2": 9, "g3": 9, "g4": 9, "g5": 10}
+
+        cohort.remove_people(leavers, groups=smaller)
+
+        remaining = data.drop(leavers)
+        assert cohort.data.index.equals(remaining.index)
+        assert cohort.sizes.tolist() == list(smaller.values())
+        # Only the people filling the places of the leavers move.
+        assert (cohort.data.group != group.drop(leavers)).sum() == 3
+        pd.testing.assert_series_equal(
+            cohort.diversity,
+            gr.util.diversity(remaining, bools=["female"], nums=["mark"]),
+        )
+
+    def test_one_left(self):
+        cohort = gr.Cohort(
+            data=data.iloc[:3], groups={"g1": 3}, bools=["female"], nums=["mark"]
+        )
+        cohort.diversity
+
+        # The standard deviation of a single person is undefined, as in pandas.
+        cohort.remove_people(data.index[:2], groups={"g1": 1})
+        pd.testing.assert_series_equal(
+            cohort.diversity,
+            gr.util.diversity(data.iloc[2:3], bools=["female"], nums=["mark"]),
+        )
+
+        cohort.add_people(data.iloc[3:6], groups={"g1": 4})
+        pd.testing.assert_series_equal(
+            cohort.diversity,
+            gr.util.diversity(data.iloc[2:6], bools=["female"], nums=["mark"]),
+        )
+
+    def test_ranges(self):
+        cohort = gr.Cohort(data=data.iloc[:45], groups=groups | {"g5": 5}, seed=0)
+
+        with pytest.raises(ValueError):
+            cohort.add_people(data.iloc[40:])
+        with pytest.raises(ValueError):
+            cohort.add_people(data.iloc[45:])
+        with pytest.raises(ValueError):
+            cohort.add_people(data.iloc[45:], groups={"g1": 10})
+        with pytest.raises(KeyError):
+            cohort.remove_people(["nobody"])
+
+        cohort.add_people(data.iloc[45:], groups={name: (9, 11) for name in groups})
+        assert len(cohort.data) == len(data)
+        assert (cohort.sizes >= 9).all()
+
+        cohort.remove_people(data.index[:4])
+        assert cohort.sizes.tolist() == [9] * 5
+        assert cohort.added.equals(data.index[45:])
+
 
 class TestOverview:
     def test_overview(self):
@@ -59,3 +339,22 @@ class TestOverview:
         assert isinstance(overview, pd.DataFrame)
         assert overview.shape == (5, 6)
         assert overview.index.name == "group"
+
+    def test_diversity_cost(self):
+        cohort = gr.Cohort(
+            data, groups=groups, bools=["female", "edsml"], nums=["mark"], seed=0
+        )
+        overview = cohort.overview()
+
+        for group in groups:
+            assert np.isclose(
+                overview.diversity_cost[group],
+                cohort[group].diversity_cost(cohort.diversity),
+            )
+        assert (overview["std(mark)"] == overview["std(mark)"].round(2)).all()
+
+    def test_no_columns(self):
+        overview = gr.Cohort(data, groups=groups).overview()
+
+        assert overview.columns.tolist() == ["size", "diversity_cost"]
+        assert (overview.diversity_cost == 0).all()
@@ -0,0 +1,311 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import groupster as gr
+from groupster.engine import Engine
+
+CWD = pathlib.Path(__file__).parent
+
+keep_together = [["ff402", "yjt99", "cr947"], ["jr848", "fs81"]]
+keep_separate = [["yz9097", "ay631", "mpc1253"], ["qbk99", "fxg194"]]
+bool_min = {"edsml": 3}
+
+
+@pytest.fixture(scope="function")
+def cohort():
+    data = pd.read_csv(CWD / "data" / "cohort.csv", index_col="username")
+    groups = {"g1": 10, "g2": 10, "g3": 10, "g4": 10, "g5": 9}
+    return gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+
+
+@pytest.fixture(scope="function")
+def engine(cohort):
+    return Engine(
+        cohort,
+        keep_together=keep_together,
+        keep_separate=keep_separate,
+        bool_min=bool_min,
+    )
+
+
+class TestCosts:
+    def test_group_costs(self, cohort, engine):
+        for code, name in enumerate(engine.names):
+            group = cohort[name]
+            assert np.isclose(
+                engine.group_diversity_cost[code],
+                group.diversity_cost(cohort_diversity=cohort.diversity),
+            )
+            assert np.isclose(
+                engine.group_restriction_cost[code],
+                group.restriction_cost(
+                    keep_together=keep_together,
+                    keep_separate=keep_separate,
+                    bool_min=bool_min,
+                ),
+            )
+
+    def test_cohort_costs(self, cohort, engine):
+        assert np.isclose(engine.diversity_cost, cohort.diversity_cost())
+        assert np.isclose(
+            engine.restriction_cost,
+            cohort.restriction_cost(
+                keep_together=keep_together,
+                keep_separate=keep_separate,
+                bool_min=bool_min,
+            ),
+        )
+
+    def test_many_constraints(self, cohort):
+        rng = np.random.default_rng(0)
+        labels = cohort.data.index.to_list()
+        constraints = [
+            list(rng.choice(labels, size=rng.integers(2, 5))) for _ in range(60)
+        ]
+        keep_together = [*constraints[:30], ["ff402", "ff402", "unknown"]]
+        keep_separate = constraints[30:]
+
+        engine = Engine(
+            cohort, keep_together=keep_together, keep_separate=keep_separate
+        )
+        for _ in range(50):
+            i, j = rng.choice(len(engine.codes), size=2, replace=False)
+            if engine.codes[i] != engine.codes[j]:
+                engine.swap(i, j)
+        engine.write(cohort)
+
+        # The incrementally updated counts agree with the recomputed ones.
+        g, c = np.meshgrid(np.arange(engine.n_groups), np.arange(engine.n_constraints))
+        counts, spread = engine.count(g, c), engine.spread.copy()
+        engine.refresh()
+        assert np.array_equal(engine.count(g, c), counts)
+        assert np.array_equal(engine.spread, spread)
+
+        for code, name in enumerate(engine.names):
+            assert np.isclose(
+                engine.group_restriction_cost[code],
+                cohort[name].restriction_cost(
+                    keep_together=keep_together, keep_separate=keep_separate
+                ),
+            )
+
+
+class TestSwap:
+    def test_delta(self, engine):
+        rng = np.random.default_rng(42)
+        for _ in range(100):
+            i, j = rng.choice(len(engine.codes), size=2, replace=False)
+            if engine.codes[i] == engine.codes[j]:
+                continue
+
+            cost = engine.cost
+            delta = engine.delta(i, j)
+            engine.swap(i, j)
+            assert np.isclose(engine.cost - cost, delta)
+
+        # Incremental aggregates agree with the ones recomputed from scratch.
+        group_cost = engine.group_diversity_cost + engine.group_restriction_cost
+        engine.refresh()
+        assert np.allclose(
+            engine.group_diversity_cost + engine.group_restriction_cost, group_cost
+        )
+
+    def test_delta_batch(self, engine):
+        rng = np.random.default_rng(42)
+        i, j = rng.integers(len(engine.codes), size=(2, 50))
+        valid = engine.codes[i] != engine.codes[j]
+        i, j = i[valid], j[valid]
+
+        deltas = engine.delta(i, j)
+        assert deltas.shape == i.shape
+        assert np.allclose(deltas, [engine.delta(a, b) for a, b in zip(i, j)])
+
+    def test_write(self, cohort, engine):
+        i = 0
+        j = np.flatnonzero(engine.codes != engine.codes[i])[0]
+        a, b = cohort.data.group.iloc[[i, j]]
+
+        engine.swap(i, j)
+        engine.write(cohort)
+
+        assert cohort.data.group.iloc[i] == b
+        assert cohort.data.group.iloc[j] == a
+        assert np.isclose(engine.diversity_cost, cohort.diversity_cost())
+
+
+class TestMove:
+    @pytest.fixture(scope="function")
+    def cohort(self):
+        data = pd.read_csv(CWD / "data" / "cohort.csv", index_col="username")
+        groups = {"g1": (5, 15), "g2": (5, 15), "g3": 10, "g4": (5, 15), "g5": (5, 15)}
+        return gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+
+    def test_delta_move(self, engine):
+        rng = np.random.default_rng(42)
+        for _ in range(100):
+            i, b = rng.integers(len(engine.codes)), rng.integers(engine.n_groups)
+            a = engine.codes[i]
+            if a == b or engine.size[a] <= engine.min_size[a]:
+                continue
+            if engine.size[b] >= engine.max_size[b]:
+                continue
+
+            cost = engine.cost
+            delta = engine.delta_move(i, b)
+            engine.move(i, b)
+            assert np.isclose(engine.cost - cost, delta)
+
+        assert engine.size[2] == 10
+        assert engine.size.sum() == len(engine.codes)
+
+        # The members of each group are indexed in their slots.
+        for g in range(engine.n_groups):
+            start = engine.start[g]
+            members = engine.order[start : start + engine.capacity[g]]
+            assert np.sum(members >= 0) == engine.size[g]
+            assert (engine.codes[members[: int(engine.size[g])]] == g).all()
+        assert (engine.order[engine.slot] == np.arange(len(engine.codes))).all()
+
+        # Incremental aggregates agree with the ones recomputed from scratch.
+        group_cost = engine.group_diversity_cost + engine.group_restriction_cost
+        g, c = np.meshgrid(np.arange(engine.n_groups), np.arange(engine.n_constraints))
+        counts, spread = engine.count(g, c), engine.spread.copy()
+        engine.refresh()
+        assert np.allclose(
+            engine.group_diversity_cost + engine.group_restriction_cost, group_cost
+        )
+        assert np.array_equal(engine.count(g, c), counts)
+        assert np.array_equal(engine.spread, spread)
+
+    def test_delta_move_batch(self, engine):
+        rng = np.random.default_rng(42)
+        i = rng.integers(len(engine.codes), size=50)
+        b = (engine.codes[i] + 1) % engine.n_groups
+
+        deltas = engine.delta_move(i, b)
+        assert deltas.shape == i.shape
+        assert np.allclose(deltas, [engine.delta_move(p, g) for p, g in zip(i, b)])
+
+    def test_write(self, cohort, engine):
+        i = cohort.members("g1")[0]
+        engine.move(i, 1)
+        engine.write(cohort)
+
+        assert cohort.data.group.iloc[i] == "g2"
+        assert np.isclose(engine.diversity_cost, cohort.diversity_cost())
+
+
+class TestTake:
+    def test_take(self, cohort, engine):
+        positions = np.concatenate([cohort.members("g2"), cohort.members("g4")])
+        subset = engine.take(positions)
+
+        assert subset.names.to_list() == ["g2", "g4"]
+        assert subset.n_constraints == engine.n_constraints
+        assert np.allclose(
+            subset.group_diversity_cost, engine.group_diversity_cost[[1, 3]]
+        )
+        assert np.allclose(subset.bool_target, engine.bool_target)
+
+        # Only the members within the subset are counted.
+        labels = set(cohort.data.index[positions])
+        for c, members in enumerate(keep_together + keep_separate):
+            expected = len(labels.intersection(members))
+            assert (
+                subset.count(
+                    np.arange(subset.n_groups), np.full(subset.n_groups, c)
+                ).sum()
+                == expected
+            )
+
+        # The incremental costs agree with the costs recomputed from scratch.
+        subset.swap(0, len(cohort.members("g2")))
+        cost = subset.cost
+        subset.refresh()
+        assert np.isclose(subset.cost, cost)
+
+
+class TestAffinity:
+    @pytest.fixture(scope="function")
+    def affinity(self, cohort):
+        sparse = pytest.importorskip("scipy.sparse")
+        n = len(cohort.data)
+        return sparse.random_array(
+            (n, n),
+            density=0.2,
+            rng=0,
+            data_sampler=lambda size: np.linspace(-1, 1, size),
+        ).tocsr()
+
+    def test_cost(self, cohort, affinity):
+        engine = Engine(cohort, affinity=affinity)
+        plain = Engine(cohort)
+
+        # Minus the affinities of the ordered pairs of different members.
+        dense = affinity.toarray()
+        np.fill_diagonal(dense, 0)
+        expected = [
+            -dense[np.ix_(members, members)].sum()
+            for members in (cohort.members(name) for name in cohort.names)
+        ]
+        assert np.allclose(
+            engine.group_restriction_cost - plain.group_restriction_cost, expected
+        )
+        assert engine.affinity_bound <= engine.restriction_cost
+
+    def test_delta(self, cohort, affinity):
+        engine = Engine(cohort, keep_together=keep_together, affinity=affinity)
+        rng = np.random.default_rng(42)
+        for _ in range(100):
+            i, j = rng.choice(len(engine.codes), size=2, replace=False)
+            if engine.codes[i] == engine.codes[j]:
+                continue
+
+            cost = engine.cost
+            delta = engine.delta(i, j)
+            engine.swap(i, j)
+            assert np.isclose(engine.cost - cost, delta)
+
+        i, j = rng.integers(len(engine.codes), size=(2, 50))
+        valid = engine.codes[i] != engine.codes[j]
+        assert np.allclose(
+            engine.delta(i[valid], j[valid]),
+            [engine.delta(a, b) for a, b in zip(i[valid], j[valid])],
+        )
+
+        group_cost = engine.group_restriction_cost
+        engine.refresh()
+        assert np.allclose(engine.group_restriction_cost, group_cost)
+
+    def test_delta_move(self, cohort, affinity):
+        cohort = gr.Cohort(
+            data=cohort.data, groups={"g1": (5, 30), "g2": (5, 30)}, nums=["mark"]
+        )
+        engine = Engine(cohort, affinity=affinity)
+        rng = np.random.default_rng(42)
+        for _ in range(50):
+            i, b = rng.integers(len(engine.codes)), rng.integers(engine.n_groups)
+            a = engine.codes[i]
+            if a == b or engine.size[a] <= 5 or engine.size[b] >= 30:
+                continue
+
+            cost = engine.cost
+            delta = engine.delta_move(i, b)
+            engine.move(i, b)
+            assert np.isclose(engine.cost - cost, delta)
+
+    def test_take(self, cohort, affinity):
+        engine = Engine(cohort, affinity=affinity)
+        positions = np.concatenate([cohort.members("g2"), cohort.members("g4")])
+        subset = engine.take(positions)
+
+        assert np.allclose(
+            subset.group_restriction_cost, engine.group_restriction_cost[[1, 3]]
+        )
+
+    def test_shape(self, cohort, affinity):
+        with pytest.raises(ValueError):
+            Engine(cohort, affinity=affinity[:10, :10])
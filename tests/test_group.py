@@ -50,6 +50,19 @@ class TestCosts:
             rtol=0.0,
         )
 
+    def test_diversity_cost_order(self):
+        cohort = gr.Cohort(
+            data=data, groups={"g1": len(data)}, bools=["female"], nums=["mark"]
+        )
+        group = gr.Group(data=data.iloc[:10, :], bools=["female"], nums=["mark"])
+
+        # The group diversity is aligned with the cohort diversity.
+        cost = gr.util.diversity_cost(
+            cohort_diversity=cohort.diversity,
+            group_diversity=group.diversity.iloc[::-1],
+        )
+        assert np.isclose(cost, group.diversity_cost(cohort_diversity=cohort.diversity))
+
     def test_restriction_cost(self):
         keep_together = [
             ["aek32", "juf35"],  # satisfied
@@ -78,3 +91,73 @@ class TestCosts:
             ),
             cost,
         )
+
+
+class TestView:
+    def test_view(self):
+        cohort = gr.Cohort(
+            data=data,
+            groups={"g1": 25, "g2": 24},
+            bools=["female"],
+            nums=["mark"],
+            seed=0,
+        )
+        group = cohort["g1"]
+
+        assert group is cohort["g1"]
+        assert (group.positions == np.flatnonzero(cohort.codes == 0)).all()
+        assert group.data.equals(cohort.data[cohort.data.group == "g1"])
+        pd.testing.assert_series_equal(
+            group.diversity,
+            gr.util.diversity(group.data, bools=["female"], nums=["mark"]),
+        )
+        assert np.isclose(
+            group.diversity_cost(cohort.diversity),
+            gr.util.diversity_cost(cohort.diversity, group.diversity),
+        )
+
+    def test_diversity(self):
+        missing = data.assign(mark=data.mark.where(np.arange(len(data)) % 7 > 0))
+        cohort = gr.Cohort(
+            data=missing,
+            groups={"g1": 30, "g2": 18, "g3": 1, "g4": 0},
+            bools=["female", "edsml"],
+            nums=["mark"],
+            seed=0,
+        )
+
+        for name in ["g1", "g2", "g3", "g4"]:
+            group = cohort[name]
+            pd.testing.assert_series_equal(
+                group.diversity,
+                gr.util.diversity(group.data, bools=["female", "edsml"], nums=["mark"]),
+            )
+
+    def test_cache(self):
+        cohort = gr.Cohort(
+            data=data, groups={"g1": 25, "g2": 24}, nums=["mark"], seed=0
+        )
+        group = cohort["g1"]
+        diversity = group.diversity
+        cost = group.diversity_cost(cohort.diversity)
+
+        assert group.diversity is diversity
+        assert group.diversity_cost(cohort.diversity) == cost
+
+        i = group.positions[0]
+        j = cohort["g2"].positions[0]
+        cohort.swap(i, j)
+
+        assert group.diversity is not diversity
+        assert j in group.positions
+        assert data.index[j] in group.data.index
+
+    def test_detach(self):
+        cohort = gr.Cohort(data=data, groups={"g1": 25, "g2": 24}, seed=0)
+        group = cohort["g1"]
+
+        group.data = data.iloc[:3]
+
+        assert len(group.data) == 3
+        assert cohort["g1"] is not group
+        assert len(cohort["g1"].data) == 25
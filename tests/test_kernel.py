@@ -0,0 +1,112 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import groupster as gr
+from groupster import kernel
+from groupster.engine import Engine
+
+CWD = pathlib.Path(__file__).parent
+
+keep_together = [["ff402", "yjt99", "cr947"], ["jr848", "fs81"]]
+keep_separate = [["yz9097", "ay631", "mpc1253"], ["qbk99", "fxg194"]]
+bool_min = {"edsml": 3}
+
+
+@pytest.fixture(scope="function")
+def data():
+    return pd.read_csv(CWD / "data" / "cohort.csv", index_col="username")
+
+
+@pytest.fixture(scope="function")
+def groups():
+    return {"g1": 10, "g2": 10, "g3": 10, "g4": 10, "g5": 9}
+
+
+class TestRun:
+    @pytest.mark.parametrize("t_start", [0.0, 0.05])
+    def test_run(self, data, groups, t_start):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        engine = Engine(
+            cohort,
+            keep_together=keep_together,
+            keep_separate=keep_separate,
+            bool_min=bool_min,
+        )
+
+        initial_cost = engine.cost
+        best_codes = engine.codes.copy()
+        costs = np.array([initial_cost, initial_cost])
+        accepted = kernel.run(
+            engine.features,
+            engine.state,
+            best_codes,
+            costs,
+            0,
+            300,
+            300,
+            t_start,
+            1e-4,
+            False,
+            42,
+        )
+
+        assert 0 < accepted <= 300
+        assert np.isclose(costs[0], engine.cost)
+        assert costs[1] <= costs[0]
+        assert costs[1] <= initial_cost
+
+        # The incrementally updated state agrees with the recomputed one.
+        group_cost = engine.group_diversity_cost + engine.group_restriction_cost
+        g, c = np.meshgrid(np.arange(engine.n_groups), np.arange(engine.n_constraints))
+        counts, spread = engine.count(g, c), engine.spread.copy()
+        engine.refresh()
+        assert np.allclose(
+            engine.group_diversity_cost + engine.group_restriction_cost, group_cost
+        )
+        assert np.array_equal(engine.count(g, c), counts)
+        assert np.array_equal(engine.spread, spread)
+        assert np.bincount(engine.codes).tolist() == list(groups.values())
+
+        if t_start == 0.0:
+            assert costs[0] == costs[1]
+
+
+class TestBackend:
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            gr.Solver(backend="unknown")
+
+    @pytest.mark.skipif(kernel.available, reason="numba is installed")
+    def test_numba_missing(self):
+        with pytest.raises(ImportError):
+            gr.Solver(backend="numba")
+
+    @pytest.mark.skipif(not kernel.available, reason="numba is not installed")
+    def test_numba_unsupported(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(backend="numba", strategy="tabu")
+
+        with pytest.raises(ValueError):
+            solver.solve(cohort=cohort, n=10)
+
+    @pytest.mark.parametrize("backend", ["auto", "numpy"])
+    @pytest.mark.parametrize("strategy", ["greedy", "annealing"])
+    def test_solve(self, data, groups, backend, strategy):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(
+            keep_together=keep_together, backend=backend, strategy=strategy
+        )
+
+        solver.solve(cohort=cohort, n=2000)
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert np.isclose(
+            solver.cost,
+            cohort.diversity_cost()
+            + cohort.restriction_cost(keep_together=keep_together),
+        )
+        for subset in keep_together:
+            assert cohort.data.loc[subset, "group"].value_counts().size == 1
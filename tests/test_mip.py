@@ -0,0 +1,104 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import groupster as gr
+from groupster import mip
+from groupster.engine import Engine
+
+pytest.importorskip("scipy")
+
+CWD = pathlib.Path(__file__).parent
+
+keep_together = [["ff402", "yjt99", "cr947"], ["jr848", "fs81"]]
+keep_separate = [["yz9097", "ay631", "mpc1253"]]
+bool_min = {"edsml": 2}
+
+
+@pytest.fixture(scope="function")
+def data():
+    # A small cohort, which is solved to optimality quickly.
+    data = pd.read_csv(CWD / "data" / "cohort.csv", index_col="username")
+    labels = {label for subset in keep_together + keep_separate for label in subset}
+    return data.loc[data.index.isin(labels) | (np.arange(len(data)) < 12)]
+
+
+@pytest.fixture(scope="function")
+def groups(data):
+    return {"g1": 7, "g2": 7, "g3": len(data) - 14}
+
+
+class TestSolve:
+    def test_restrictions(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["edsml"])
+        engine = Engine(
+            cohort,
+            keep_together=keep_together,
+            keep_separate=keep_separate,
+            bool_min=bool_min,
+        )
+
+        codes, result = mip.solve(engine, time_limit=20)
+
+        # Only the linearised diversity cost differs from the exact cost.
+        engine.codes = codes
+        engine.refresh()
+        assert result.status == 0
+        assert np.bincount(codes).tolist() == list(groups.values())
+        assert np.isclose(result.fun, engine.cost)
+        # Both keep_together lists together (-9 - 4), the keep_separate list apart
+        # (3), and enough edsml students in every group.
+        assert np.isclose(engine.restriction_cost, -10)
+
+    def test_bools(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female", "edsml"])
+        engine = Engine(cohort)
+
+        codes, result = mip.solve(engine, time_limit=20)
+
+        engine.codes = codes
+        engine.refresh()
+        assert np.isclose(result.fun, engine.cost)
+        assert result.mip_dual_bound <= result.fun + 1e-9
+
+
+class TestSolver:
+    def test_solve_mip(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(keep_together=keep_together)
+
+        stats = solver.solve_mip(cohort, time_limit=5)
+
+        assert stats.final_cost <= stats.initial_cost or np.isnan(stats.final_cost)
+        assert cohort.data.group.value_counts().to_dict() == groups
+        assert np.isclose(
+            solver.cost,
+            cohort.diversity_cost()
+            + cohort.restriction_cost(keep_together=keep_together),
+        )
+        assert solver.cost <= stats.initial_cost
+
+    def test_single_member(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(keep_together=[data.index[:1].to_list()])
+
+        stats = solver.solve_mip(cohort, time_limit=5)
+
+        # The constraint costs -1 wherever its only member is.
+        assert np.isclose(stats.objective, stats.final_cost)
+        assert stats.bound <= stats.final_cost + 1e-9
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        with pytest.raises(ValueError):
+            solver.solve_mip(cohort)
+
+    def test_size_ranges(self, data):
+        cohort = gr.Cohort(data=data, groups={"g1": (5, 10), "g2": (5, 15)})
+
+        with pytest.raises(ValueError):
+            gr.Solver().solve_mip(cohort)
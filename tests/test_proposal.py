@@ -0,0 +1,160 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import groupster as gr
+from groupster.engine import Engine
+from groupster.proposal import KINDS
+
+CWD = pathlib.Path(__file__).parent
+
+keep_together = [["ff402", "yjt99", "cr947"], ["jr848", "fs81"]]
+
+
+@pytest.fixture(scope="function")
+def data():
+    return pd.read_csv(CWD / "data" / "cohort.csv", index_col="username")
+
+
+@pytest.fixture(scope="function")
+def groups():
+    return {"g1": 10, "g2": 10, "g3": 10, "g4": 10, "g5": 9}
+
+
+@pytest.fixture(scope="function")
+def engine(data, groups):
+    cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+    return Engine(cohort, keep_together=keep_together)
+
+
+class TestPropose:
+    def test_other(self, engine):
+        proposals = gr.Proposals()
+        proposals.reset(engine.size, engine)
+        rng = np.random.default_rng(0)
+
+        a = rng.integers(engine.n_groups, size=10_000)
+        b = proposals.other(a, rng)
+        assert (a != b).all()
+        assert set(b) == set(range(engine.n_groups))
+
+    @pytest.mark.parametrize("kind", [kind for kind in KINDS if kind != "move"])
+    def test_kinds(self, engine, kind):
+        proposals = gr.Proposals({kind: 1})
+        proposals.reset(engine.size, engine)
+
+        i, j, kinds = proposals.propose(engine, 100, np.random.default_rng(0))
+        assert (kinds == KINDS.index(kind)).all()
+        assert ((i >= 0) & (i < len(engine.codes))).all()
+        if kind != "together":
+            assert (engine.codes[i] != engine.codes[j]).all()
+
+    def test_move(self, data):
+        groups = {"g1": (5, 15), "g2": (5, 15), "g3": 10, "g4": (5, 15), "g5": (5, 15)}
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        engine = Engine(cohort)
+        proposals = gr.Proposals({"move": 1})
+        proposals.reset(engine.size, engine)
+
+        i, b, kinds = proposals.propose(engine, 100, np.random.default_rng(0))
+        assert (kinds == KINDS.index("move")).all()
+        assert (engine.size[engine.codes[i]] > engine.min_size[engine.codes[i]]).all()
+        assert (engine.size[b] < engine.max_size[b]).all()
+        assert 2 not in b
+
+    def test_move_fixed_sizes(self, engine):
+        proposals = gr.Proposals({"move": 1})
+        proposals.reset(engine.size, engine)
+
+        i, j, kinds = proposals.propose(engine, 100, np.random.default_rng(0))
+        assert (kinds == KINDS.index("uniform")).all()
+        assert (engine.codes[i] != engine.codes[j]).all()
+
+    def test_together(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups)
+        cohort.codes = np.sort(cohort.codes)
+        # Two people in the first and third groups, and one in the fifth group.
+        labels = cohort.data.index[[0, 1, 20, 45]].to_list()
+        engine = Engine(cohort, keep_together=[labels])
+        proposals = gr.Proposals({"together": 1})
+        proposals.reset(engine.size, engine)
+
+        i, j, _ = proposals.propose(engine, 100, np.random.default_rng(0))
+        assert np.isin(i, [0, 1, 20, 45]).all()
+        assert (engine.codes[j] == 0).all()
+
+        # Once the constraint is in one group, uniform swaps are proposed instead.
+        engine.swap(20, 2)
+        engine.swap(45, 3)
+        assert engine.spread.tolist() == [1]
+        i, j, _ = proposals.propose(engine, 100, np.random.default_rng(0))
+        assert (engine.codes[i] != engine.codes[j]).all()
+
+    def test_cost_changes(self, engine):
+        proposals = gr.Proposals({"cost": 1})
+        proposals.reset(engine.size, engine)
+        rng = np.random.default_rng(0)
+        proposals.propose(engine, 100, rng)
+
+        # The costs of the groups are read again after every swap.
+        engine.swap(0, np.flatnonzero(engine.codes != engine.codes[0])[0])
+        engine.group_diversity_cost[:] = 0
+        engine.group_restriction_cost[:] = 0
+        engine.group_diversity_cost[3] = 1
+        i, _, _ = proposals.propose(engine, 100, rng)
+        assert (engine.codes[i] == 3).all()
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            gr.Proposals({"unknown": 1})
+
+        with pytest.raises(ValueError):
+            gr.Solver(proposals="unknown")
+
+
+class TestSolve:
+    @pytest.mark.parametrize("batch", [1, 8])
+    def test_targeted(self, data, groups, batch):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(
+            keep_together=keep_together, proposals="targeted", batch=batch
+        )
+
+        solver.solve(cohort=cohort, n=1000, progress=False)
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert np.isclose(
+            solver.cost,
+            cohort.diversity_cost()
+            + cohort.restriction_cost(keep_together=keep_together),
+        )
+        for subset in keep_together:
+            assert cohort.data.loc[subset, "group"].value_counts().size == 1
+
+        stats = solver.proposals.stats
+        assert stats.index.to_list() == list(KINDS)
+        # The sizes are fixed, so no moves are proposed.
+        assert stats.proposed.drop("move").gt(0).all()
+        assert stats.loc["move", "proposed"] == 0
+        assert (stats.accepted <= stats.proposed).all()
+
+    def test_uniform_stats(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        solver.solve(cohort=cohort, n=100, progress=False)
+
+        stats = solver.proposals.stats
+        assert stats.loc["uniform", "proposed"] == 100
+        assert stats.loc["uniform", "accepted"] > 0
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(
+            diversity_cost_fn=gr.util.diversity_cost, proposals="targeted"
+        )
+
+        with pytest.raises(ValueError):
+            solver.solve(cohort=cohort, n=10, progress=False)
@@ -1,5 +1,7 @@
 import pathlib
+import sys
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -127,3 +129,616 @@ class TestAll:
 
         for subset in keep_separate:
             assert cohort.data.loc[subset, "group"].value_counts().size == len(subset)
+
+
+class TestMove:
+    @pytest.mark.parametrize("proposals", [{"uniform": 1, "move": 1}, "targeted"])
+    @pytest.mark.parametrize("batch", [1, 8])
+    def test_size_ranges(self, data, proposals, batch):
+        groups = {"g1": (6, 14), "g2": (6, 14), "g3": 10, "g4": (6, 14), "g5": (6, 14)}
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(
+            keep_together=[["ff402", "yjt99", "cr947"]],
+            proposals=proposals,
+            batch=batch,
+        )
+
+        solver.solve(cohort=cohort, n=500, progress=False)
+
+        sizes = cohort.data.groupby("group").size()
+        assert sizes["g3"] == 10
+        assert sizes.between(6, 14).all()
+        assert np.isclose(
+            solver.cost,
+            cohort.diversity_cost()
+            + cohort.restriction_cost(keep_together=[["ff402", "yjt99", "cr947"]]),
+        )
+        assert solver.proposals.stats.loc["move", "accepted"] > 0
+
+
+class TestStopping:
+    @pytest.mark.parametrize("backend", ["numpy", "auto"])
+    def test_lower_bound(self, data, groups, backend):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(keep_together=[["ff402", "yjt99"]], backend=backend)
+
+        solver.solve(cohort=cohort, n=200, progress=False)
+
+        assert solver.stop_reason == "steps"
+        assert solver.steps == 200
+        assert np.isclose(
+            solver.lower_bound,
+            cohort.lower_bound(keep_together=[["ff402", "yjt99"]]),
+        )
+        assert 0 <= solver.gap == pytest.approx(solver.cost - solver.lower_bound)
+
+    def test_gap(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=0)
+        gaps = []
+        solver = gr.Solver(
+            strategy="annealing",
+            seed=0,
+            hooks={"on_step": lambda solver, *_: gaps.append(solver.gap)},
+        )
+
+        solver.solve(cohort=cohort, n=300, progress=False)
+
+        # The gap is measured from the best cost, which never increases.
+        assert (np.diff(gaps) <= 0).all()
+        assert gaps[-1] == pytest.approx(solver.cost - solver.lower_bound)
+
+    @pytest.mark.parametrize(
+        ("criterion", "reason"),
+        [
+            ({"target": np.inf}, "target"),
+            ({"tol": np.inf}, "bound"),
+            ({"time_limit": 0}, "time_limit"),
+        ],
+    )
+    def test_immediate(self, data, groups, criterion, reason):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(backend="numpy")
+
+        solver.solve(cohort=cohort, n=1000, progress=False, **criterion)
+
+        assert solver.stop_reason == reason
+        assert solver.steps == 1
+
+    def test_patience(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(backend="numpy")
+
+        solver.solve(cohort=cohort, n=100_000, progress=False, patience=50)
+
+        assert solver.stop_reason == "patience"
+        assert solver.steps < 100_000
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        solver.solve(cohort=cohort, n=100, progress=False, patience=5, tol=0)
+
+        assert solver.lower_bound == -np.inf
+        assert solver.stop_reason == "patience"
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+
+
+class TestProgress:
+    def test_few_steps(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver()
+
+        solver.solve(cohort=cohort, n=5)
+
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+
+    def test_report(self, data, groups, capsys):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        solver.solve(cohort=cohort, n=20, report=7)
+        assert "Solving" in capsys.readouterr().err
+
+        solver.solve(cohort=cohort, n=20, report=7, progress=False)
+        assert capsys.readouterr().err == ""
+
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+
+
+class TestCostFn:
+    def test_custom(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(
+            diversity_cost_fn=gr.util.diversity_cost,
+            restriction_cost_fn=gr.util.restriction_cost,
+        )
+        assert not solver.uses_engine
+
+        initial_cost = cohort.diversity_cost()
+        solver.solve(cohort=cohort, n=200)
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert cohort.diversity_cost() <= initial_cost
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+
+        # Each group cost is computed once and then kept up to date.
+        assert solver.cache_misses == len(groups)
+        assert solver.cache_hits == 2 * 200 - len(groups)
+
+
+class TestBatch:
+    @pytest.mark.parametrize("batch_mode", ["best", "first"])
+    @pytest.mark.parametrize("strategy", ["greedy", "annealing"])
+    def test_batch(self, data, groups, batch_mode, strategy):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(strategy=strategy, batch=16, batch_mode=batch_mode)
+
+        initial_cost = cohort.diversity_cost()
+        solver.solve(cohort=cohort, n=200)
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+        assert cohort.diversity_cost() < initial_cost
+        assert cohort.overview().female.between(2, 3).all()
+
+    @pytest.mark.parametrize("batch_mode", ["best", "first"])
+    def test_schedule(self, data, groups, batch_mode):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=1)
+        solver = gr.Solver(
+            strategy="annealing", batch=16, batch_mode=batch_mode, seed=2
+        )
+        solver.solve(cohort=cohort, n=100, progress=False)
+
+        # Every candidate advances the temperature schedule, even if it is skipped.
+        assert solver.strategy.step == solver.strategy.n == 100 * 16
+
+    def test_batch_mode(self):
+        with pytest.raises(ValueError):
+            gr.Solver(batch_mode="unknown")
+
+
+class TestSeed:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"backend": "numpy", "keep_together": [["ff402", "yjt99"]]},
+            {"strategy": "annealing", "proposals": "targeted", "batch": 4},
+            {"strategy": "tabu"},
+            {"diversity_cost_fn": gr.util.diversity_cost},
+        ],
+    )
+    def test_reproducible(self, data, groups, kwargs):
+        assignments = []
+        for _ in range(2):
+            cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=7)
+            gr.Solver(**kwargs, seed=3).solve(cohort, n=100, progress=False)
+            assignments.append(cohort.data.group)
+
+        assert assignments[0].equals(assignments[1])
+
+    def test_generator(self, data, groups):
+        rng = np.random.default_rng(5)
+        cohort = gr.Cohort(data=data, groups=groups, seed=rng)
+        solver = gr.Solver(seed=rng)
+
+        assert solver.rng is rng
+        assert gr.Cohort(data=data, groups=groups, seed=5).codes.tolist() == (
+            cohort.codes.tolist()
+        )
+
+    def test_parallel(self, data, groups):
+        results = []
+        for _ in range(2):
+            cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=7)
+            solver = gr.Solver(seed=3)
+            results.append(
+                solver.solve_parallel(
+                    cohort, n=100, restarts=2, workers=1, progress=False
+                )
+            )
+
+        assert results[0][0].equals(results[1][0])
+        assert results[0][1].equals(results[1][1])
+
+
+class TestHooks:
+    @pytest.mark.parametrize(
+        "kwargs", [{}, {"diversity_cost_fn": gr.util.diversity_cost}]
+    )
+    def test_hooks(self, data, groups, kwargs):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=0)
+        solver = gr.Solver(**kwargs, seed=0)
+        steps, accepted, reports = [], [], []
+        solver.add_hook("on_step", lambda solver, step, accepted: steps.append(step))
+        solver.add_hook("on_accept", lambda *args: accepted.append(args))
+        solver.add_hook("on_report", lambda solver, chunk: reports.append(chunk))
+
+        solver.solve(cohort, n=100, report=25, progress=False)
+
+        assert steps == list(range(1, 101))
+        assert len(accepted) == solver.stats.accepted
+        assert len(reports) == 4
+
+    def test_unknown_event(self):
+        with pytest.raises(ValueError):
+            gr.Solver().add_hook("on_swap", print)
+
+    def test_parallel(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(hooks={"on_step": [lambda *args: None]})
+
+        solver.solve_parallel(cohort, n=50, restarts=2, workers=2, progress=False)
+
+        assert len(solver.hooks["on_step"]) == 1
+
+
+class TestStats:
+    @pytest.mark.parametrize("backend", ["numpy", "auto"])
+    def test_stats(self, data, groups, backend):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(backend=backend, profile=True)
+
+        solver.solve(cohort, n=200, report=50, progress=False)
+        summary = solver.stats.summary()
+
+        assert summary.steps == 200
+        assert 0 < summary.accepted <= 200
+        assert np.isclose(summary.final_cost, cohort.diversity_cost())
+        assert summary.final_cost <= summary.initial_cost
+        assert summary.filter(like="time_").sum() <= summary.elapsed
+        assert (solver.stats.to_frame().cost.diff().dropna() <= 1e-6).all()
+
+    def test_profile(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=0)
+        solver = gr.Solver(backend="numpy", profile=True, seed=0)
+
+        solver.solve(cohort, n=50, progress=False)
+
+        assert len(solver.stats.to_frame()) == 50
+        for section in ("propose", "diversity", "mutate"):
+            assert solver.stats.times[section] > 0
+
+
+class TestRepair:
+    def test_repair(self, data, groups):
+        cohort = gr.Cohort(
+            data=data.iloc[:44],
+            groups={name: (8, 10) for name in groups},
+            bools=["female"],
+            nums=["mark"],
+            seed=0,
+        )
+        solver = gr.Solver(seed=0)
+        solver.solve(cohort, n=2000, progress=False)
+        cohort.add_people(data.iloc[44:])
+        initial = cohort.diversity_cost()
+
+        moved = solver.repair(cohort, n=500, max_moves=4, progress=False)
+
+        assert len(moved) <= 4
+        assert cohort.added.empty
+        assert cohort.diversity_cost() <= initial
+        assert cohort.sizes.sum() == len(data)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"batch": 8},
+            {"proposals": {"uniform": 1, "move": 1}},
+            {"strategy": "annealing"},
+        ],
+    )
+    def test_budget(self, data, kwargs):
+        cohort = gr.Cohort(
+            data=data,
+            groups={"g1": (15, 18), "g2": (15, 18), "g3": (15, 18)},
+            bools=["female"],
+            nums=["mark"],
+            seed=0,
+        )
+        home = cohort.data.group.copy()
+
+        moved = gr.Solver(**kwargs, seed=0).repair(
+            cohort, n=300, max_moves=3, free=data.index[:5], progress=False
+        )
+
+        changed = cohort.data.group != home
+        assert changed.drop(data.index[:5]).sum() == len(moved) <= 3
+        assert not moved.isin(data.index[:5]).any()
+
+    def test_no_moves(self, data, groups):
+        cohort = gr.Cohort(
+            data=data.iloc[:48], groups={**groups, "g5": 8}, bools=["female"], seed=0
+        )
+        cohort.add_people(data.iloc[48:], groups=groups)
+        solver = gr.Solver(seed=0)
+
+        # With fixed group sizes, the newcomer cannot swap without moving someone.
+        moved = solver.repair(cohort, n=50, max_moves=0, progress=False)
+
+        assert moved.empty
+        assert solver.stop_reason == "exhausted"
+        assert solver.steps == 1
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        with pytest.raises(ValueError):
+            solver.repair(cohort, n=10, max_moves=1)
+
+
+class TestAffinity:
+    def test_teammates(self, data, groups):
+        sparse = pytest.importorskip("scipy.sparse")
+        previous = gr.Cohort(data=data, groups=groups, seed=1).codes
+        p, q = np.nonzero(previous[:, np.newaxis] == previous)
+        affinity = sparse.csr_array((-np.ones(len(p)), (p, q)), shape=(49, 49))
+
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=1)
+        solver = gr.Solver(affinity=affinity, seed=0)
+        solver.solve(cohort, n=2000, progress=False)
+
+        repeats = (cohort.codes[p] == cohort.codes[q]) & (p != q)
+        assert repeats.sum() < (len(p) - 49) / 2
+        assert solver.lower_bound <= solver.cost
+
+    def test_together(self, data, groups):
+        sparse = pytest.importorskip("scipy.sparse")
+        affinity = sparse.coo_array(([10.0], ([0], [1])), shape=(49, 49))
+
+        cohort = gr.Cohort(data=data, groups=groups, seed=0)
+        gr.Solver(affinity=affinity, seed=0).solve(cohort, n=500, progress=False)
+
+        assert cohort.codes[0] == cohort.codes[1]
+
+    def test_unsupported(self, data, groups):
+        sparse = pytest.importorskip("scipy.sparse")
+        affinity = sparse.eye_array(49, format="csr")
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+
+        with pytest.raises(ValueError):
+            gr.Solver(diversity_cost_fn=gr.util.diversity_cost, affinity=affinity)
+        with pytest.raises(ValueError):
+            gr.Solver(affinity=affinity).solve_mip(cohort)
+        with pytest.raises(ValueError):
+            gr.solve_many([cohort], gr.Solver(affinity=affinity), n=10)
+
+    def test_no_scipy(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "scipy", None)
+
+        with pytest.raises(ImportError, match="require scipy"):
+            gr.Solver(affinity=np.eye(49))
+
+
+class TestParallel:
+    def test_solve_parallel(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver()
+
+        assignment, stats = solver.solve_parallel(
+            cohort=cohort, n=500, restarts=3, workers=2, seed=42
+        )
+
+        assert assignment.equals(cohort.data.group)
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert stats.shape == (3, 4)
+        assert stats.best.sum() == 1
+        assert stats.loc[stats.best, "final_cost"].item() == stats.final_cost.min()
+        assert np.isclose(stats.final_cost.min(), cohort.diversity_cost())
+        assert (stats.final_cost <= stats.initial_cost).all()
+
+    def test_deterministic(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(strategy="annealing")
+
+        serial, serial_stats = solver.solve_parallel(
+            cohort=cohort, n=300, restarts=2, workers=1, seed=1
+        )
+        parallel, parallel_stats = solver.solve_parallel(
+            cohort=cohort, n=300, restarts=2, workers=2, seed=1
+        )
+
+        assert serial.equals(parallel)
+        assert serial_stats.equals(parallel_stats)
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        with pytest.raises(ValueError):
+            solver.solve_parallel(cohort=cohort, n=10, restarts=2)
+
+
+def make_cohorts(data):
+    return {
+        "small": gr.Cohort(
+            data=data.iloc[:12],
+            groups={"a": 4, "b": 4, "c": 4},
+            bools=["female"],
+            seed=0,
+        ),
+        "large": gr.Cohort(
+            data=data,
+            groups={"a": 17, "b": 16, "c": 16},
+            bools=["female"],
+            nums=["mark"],
+            seed=0,
+        ),
+        "medium": gr.Cohort(
+            data=data.iloc[:30],
+            groups={"a": 10, "b": 10, "c": 10},
+            nums=["mark"],
+            seed=0,
+        ),
+    }
+
+
+class TestSolveMany:
+    @pytest.fixture
+    def cohorts(self, data):
+        return make_cohorts(data)
+
+    def test_solve_many(self, cohorts):
+        solved = []
+        overview, stats = gr.solve_many(
+            cohorts,
+            gr.Solver(),
+            n=300,
+            workers=2,
+            seed=0,
+            progress=False,
+            callback=lambda name, cohort, result: solved.append(name),
+        )
+
+        assert sorted(solved) == sorted(cohorts)
+        assert stats.index.tolist() == list(cohorts)
+        assert (stats.final_cost <= stats.initial_cost).all()
+        assert overview.index.names == ["cohort", "group"]
+        for name, cohort in cohorts.items():
+            pd.testing.assert_frame_equal(
+                overview.loc[name].dropna(axis=1, how="all"),
+                cohort.overview(),
+                check_dtype=False,
+            )
+            assert np.isclose(stats.final_cost[name], cohort.diversity_cost())
+
+    def test_deterministic(self, data):
+        serial = gr.solve_many(
+            make_cohorts(data), gr.Solver(), n=200, workers=1, seed=1, progress=False
+        )
+        parallel = gr.solve_many(
+            make_cohorts(data), gr.Solver(), n=200, workers=2, seed=1, progress=False
+        )
+
+        assert serial[0].equals(parallel[0])
+        assert serial[1].equals(parallel[1])
+
+    def test_list(self, data, groups):
+        cohorts = [
+            gr.Cohort(data=data, groups=groups, bools=["female"]) for _ in range(2)
+        ]
+        overview, stats = gr.solve_many(
+            cohorts, gr.Solver(), n=10, workers=1, progress=False
+        )
+
+        assert stats.index.tolist() == [0, 1]
+        assert overview.index.get_level_values("cohort").unique().tolist() == [0, 1]
+
+    def test_custom_cost_fn(self, cohorts):
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        with pytest.raises(ValueError):
+            gr.solve_many(cohorts, solver, n=10)
+
+
+class TestCheckpoint:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"strategy": "annealing"},
+            {"strategy": gr.SimulatedAnnealing(schedule=lambda f: 0.05 * (1 - f))},
+            {"strategy": "late_acceptance", "backend": "numpy"},
+            {"strategy": "tabu"},
+            {"diversity_cost_fn": gr.util.diversity_cost},
+        ],
+    )
+    def test_resume(self, data, groups, tmp_path, kwargs):
+        n = 400 if "diversity_cost_fn" in kwargs else 2000
+        path = tmp_path / "checkpoint.npz"
+
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        initial = cohort.codes.copy()
+        solver = gr.Solver(**kwargs)
+        solver.rng = np.random.default_rng(1)
+        solver.solve(cohort=cohort, n=n, report=n // 4, progress=False)
+
+        # The interrupted run stops after the second checkpoint.
+        interrupted = gr.Cohort(
+            data=data, groups=groups, bools=["female"], nums=["mark"]
+        )
+        interrupted.codes = initial
+        solver = gr.Solver(**kwargs)
+        solver.rng = np.random.default_rng(1)
+        checkpoint = solver._checkpoint
+
+        def stop(path, cohort, engine, n, step):
+            checkpoint(path, cohort, engine, n, step)
+            if step == n // 2:
+                raise KeyboardInterrupt
+
+        solver._checkpoint = stop
+        with pytest.raises(KeyboardInterrupt):
+            solver.solve(
+                cohort=interrupted, n=n, report=n // 4, progress=False, checkpoint=path
+            )
+
+        resumed = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(**kwargs)
+        solver.resume(cohort=resumed, path=path, report=n // 4, progress=False)
+
+        assert resumed.data.group.equals(cohort.data.group)
+        assert np.isclose(solver.cost, resumed.diversity_cost())
+
+        # The checkpoint is loaded without pickle.
+        with np.load(path, allow_pickle=False) as saved:
+            assert saved["steps"].tolist() == [n, n]
+
+
+class TestMultilevel:
+    def test_solve_multilevel(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(keep_together=[["ff402", "yjt99"]])
+
+        assignment, stats = solver.solve_multilevel(
+            cohort=cohort, n=300, blocks=2, workers=1, seed=0, progress=False
+        )
+
+        assert assignment.equals(cohort.data.group)
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert stats.index.names == ["phase", "block"]
+        assert stats.shape == (4, 3)
+        assert np.isclose(
+            solver.cost,
+            cohort.diversity_cost()
+            + cohort.restriction_cost(keep_together=[["ff402", "yjt99"]]),
+        )
+
+        # The female people are balanced across the blocks by the partition.
+        assert cohort.data.groupby("group").female.sum().between(2, 3).all()
+
+    def test_deterministic(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver()
+
+        serial, serial_stats = solver.solve_multilevel(
+            cohort=cohort, n=200, blocks=2, workers=1, seed=1, progress=False
+        )
+        parallel, parallel_stats = solver.solve_multilevel(
+            cohort=cohort, n=200, blocks=2, workers=2, seed=1, progress=False
+        )
+
+        assert serial.equals(parallel)
+        assert serial_stats.equals(parallel_stats)
+
+    def test_tabu(self, data):
+        groups = {f"g{i}": 5 for i in range(9)} | {"g9": 4}
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], seed=0)
+        solver = gr.Solver(strategy="tabu")
+
+        # Blocks of two groups have fewer than 2 * tenure people.
+        solver.solve_multilevel(
+            cohort=cohort, n=50, blocks=5, workers=1, seed=0, progress=False
+        )
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert solver.strategy.tenure == 10
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(diversity_cost_fn=gr.util.diversity_cost)
+
+        with pytest.raises(ValueError):
+            solver.solve_multilevel(cohort=cohort, n=10, blocks=2)
@@ -0,0 +1,69 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+import groupster as gr
+
+
+class TestSolverStats:
+    def test_record(self):
+        stats = gr.SolverStats()
+        stats.reset(4, 10.0)
+        stats.record(1, 9.0, 1)
+        stats.record(4, 7.0, 1, steps=3)
+        stats.finish()
+
+        assert stats.steps == 4
+        assert stats.acceptance_rate == 0.5
+        assert stats.to_frame().cost.to_dict() == {1: 9.0, 4: 7.0}
+
+        summary = stats.summary()
+        assert summary.initial_cost == 10
+        assert summary.final_cost == 7
+        assert summary.elapsed == stats.elapsed
+        assert summary.time_kernel == 0
+
+    def test_batch(self):
+        stats = gr.SolverStats()
+        stats.reset(2, 10.0)
+        stats.record(1, 9.0, 3)
+        stats.record(2, 8.0, 2)
+
+        # Several swaps of a batch can be accepted in a single step.
+        assert stats.acceptance_rate == 2.5
+
+    def test_unprofiled(self):
+        stats = gr.SolverStats()
+        with stats.time("propose"):
+            time.sleep(0.01)
+
+        assert stats.times["propose"] == 0
+
+    def test_nested(self):
+        stats = gr.SolverStats(profile=True)
+        with stats.time("mutate"):
+            time.sleep(0.01)
+            with stats.time("diversity"):
+                time.sleep(0.02)
+
+        assert stats.times["mutate"] == pytest.approx(0.01, abs=0.009)
+        assert stats.times["diversity"] == pytest.approx(0.02, abs=0.009)
+
+    def test_to_json(self):
+        stats = gr.SolverStats()
+        stats.reset(2, 3.0)
+        stats.record(2, 1.0, 1, steps=2)
+
+        result = json.loads(stats.to_json())
+
+        assert result["summary"]["final_cost"] == 1
+        assert result["trajectory"] == {"step": [2], "cost": [1.0]}
+
+    def test_empty(self):
+        summary = gr.SolverStats().summary()
+
+        assert summary.steps == 0
+        assert np.isnan(summary.acceptance_rate)
+        assert json.loads(gr.SolverStats().to_json())["summary"]["final_cost"] is None
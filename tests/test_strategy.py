@@ -0,0 +1,117 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import groupster as gr
+
+CWD = pathlib.Path(__file__).parent
+
+
+@pytest.fixture(scope="function")
+def data():
+    return pd.read_csv(CWD / "data" / "cohort.csv", index_col="username")
+
+
+@pytest.fixture(scope="function")
+def groups():
+    return {"g1": 10, "g2": 10, "g3": 10, "g4": 10, "g5": 9}
+
+
+class TestAccept:
+    def test_greedy(self):
+        strategy = gr.Greedy()
+        strategy.reset(cost=1.0, n=10, size=49, rng=np.random.default_rng())
+
+        assert strategy.accept(-0.1, 1.0)
+        assert not strategy.accept(0.0, 1.0)
+        assert not strategy.accept(0.1, 1.0)
+
+    def test_annealing(self):
+        strategy = gr.SimulatedAnnealing(t_start=1.0, t_end=0.0, schedule="linear")
+        strategy.reset(cost=1.0, n=11, size=49, rng=np.random.default_rng())
+
+        assert strategy.temperature(0.0) == 1.0
+        assert np.isclose(strategy.temperature(0.5), 0.5)
+        assert strategy.accept(-0.1, 1.0)
+
+        for _ in range(10):
+            strategy.update(0, 1, False, 1.0)
+        assert not strategy.accept(0.1, 1.0)
+
+    def test_annealing_schedule(self):
+        with pytest.raises(ValueError):
+            gr.SimulatedAnnealing(schedule="unknown")
+
+        strategy = gr.SimulatedAnnealing(schedule=lambda fraction: 1e6)
+        strategy.reset(cost=1.0, n=10, size=49, rng=np.random.default_rng())
+        assert strategy.accept(0.1, 1.0)
+
+    def test_tabu(self):
+        strategy = gr.Tabu(tenure=2)
+        strategy.reset(cost=1.0, n=10, size=49, rng=np.random.default_rng())
+
+        assert strategy.accept(0.1, 1.0)
+        strategy.update("a", "b", True, 1.1)
+        assert not strategy.allows("a", "c")
+        assert strategy.allows("c", "d")
+
+        strategy.update("c", "d", True, 1.2)
+        assert strategy.allows("a", "b")
+
+        with pytest.raises(ValueError):
+            gr.Tabu(tenure=30).reset(cost=1.0, n=10, size=49, rng=None)
+
+    def test_late_acceptance(self):
+        strategy = gr.LateAcceptance(length=2)
+        strategy.reset(cost=1.0, n=10, size=49, rng=np.random.default_rng())
+
+        assert strategy.accept(-0.1, 1.0)
+        assert not strategy.accept(0.1, 1.0)
+        assert strategy.accept(0.1, 0.5)  # 0.6 is below the cost 2 steps ago
+
+    def test_get(self):
+        assert isinstance(gr.Solver().strategy, gr.Greedy)
+        assert isinstance(gr.Solver(strategy="tabu").strategy, gr.Tabu)
+
+        with pytest.raises(ValueError):
+            gr.Solver(strategy="unknown")
+
+
+class TestSolve:
+    @pytest.mark.parametrize(
+        "strategy",
+        [
+            "greedy",
+            "annealing",
+            "tabu",
+            "late_acceptance",
+            gr.SimulatedAnnealing(t_start=1.0, t_end=0.1, schedule="linear"),
+        ],
+    )
+    def test_strategy(self, data, groups, strategy):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"], nums=["mark"])
+        solver = gr.Solver(strategy=strategy)
+
+        initial_cost = cohort.diversity_cost()
+        solver.solve(cohort=cohort, n=2000)
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        # The best assignment is kept, even if the final swaps increased the cost.
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+        assert cohort.diversity_cost() < initial_cost
+
+    def test_custom_cost_fn(self, data, groups):
+        cohort = gr.Cohort(data=data, groups=groups, bools=["female"])
+        solver = gr.Solver(
+            diversity_cost_fn=gr.util.diversity_cost,
+            strategy=gr.Tabu(tenure=4, candidates=3),
+        )
+
+        initial_cost = cohort.diversity_cost()
+        solver.solve(cohort=cohort, n=50)
+
+        assert cohort.data.groupby("group").size().to_dict() == groups
+        assert np.isclose(solver.cost, cohort.diversity_cost())
+        assert cohort.diversity_cost() <= initial_cost